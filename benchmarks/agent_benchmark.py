@@ -0,0 +1,169 @@
+# Copyright 2021 TestProject (https://testproject.io)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""Measures the SDK end to end against an in-process fake Agent and stub WebDriver (see benchmarks.fake_agent).
+
+Metrics:
+    session_start_ms: median time to create a driver, starting a development session with the Agent
+    commands_per_sec: driver commands executed per second through the CustomCommandExecutor, with reporting
+    reporting_overhead_us: time added to each driver command by reporting it, compared to reporting disabled
+    queue_drain_ms: time for quit() to send the reports left in the queue after a burst of commands
+    memory_per_command_bytes: memory retained per driver command after --memory-commands commands
+    memory_peak_mb: peak memory allocated while executing --memory-commands commands
+
+With --thresholds, each metric is checked against the limits of a JSON file such as benchmarks/thresholds.json,
+mapping metric names to {"max": value} or {"min": value}. The process exits with status 1 if any limit is exceeded,
+for use as a performance regression check in CI.
+
+Usage:
+    python -m benchmarks.agent_benchmark
+    python -m benchmarks.agent_benchmark --memory-commands 10000 --thresholds benchmarks/thresholds.json
+"""
+
+import argparse
+import json
+import logging
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+from selenium.webdriver.remote.remote_connection import RemoteConnection
+
+from benchmarks.fake_agent import FakeAgent
+from src.testproject.sdk.drivers import webdriver
+
+TOKEN = "benchmark-token"
+
+
+def create_driver(agent: FakeAgent, **kwargs) -> webdriver.Chrome:
+    return webdriver.Chrome(
+        token=TOKEN, agent_url=agent.address, project_name="Benchmarks", job_name="Agent benchmark", **kwargs
+    )
+
+
+def run_commands(driver, count: int) -> float:
+    """Executes driver commands and returns the time spent in seconds"""
+    start_time = time.perf_counter()
+    for _ in range(count):
+        driver.title
+    return time.perf_counter() - start_time
+
+
+def measure_session_start(agent: FakeAgent, sessions: int) -> float:
+    durations = []
+    for _ in range(sessions):
+        start_time = time.perf_counter()
+        driver = create_driver(agent)
+        durations.append(time.perf_counter() - start_time)
+        driver.quit()
+    return statistics.median(durations) * 1000
+
+
+def measure_commands(agent: FakeAgent, commands: int) -> dict:
+    driver = create_driver(agent)
+    try:
+        # Warm up connections and caches
+        run_commands(driver, min(100, commands))
+
+        driver.report().disable_reports(True)
+        unreported = run_commands(driver, commands)
+        driver.report().disable_reports(False)
+        reported = run_commands(driver, commands)
+    finally:
+        start_time = time.perf_counter()
+        driver.quit()
+        drain = time.perf_counter() - start_time
+    return {
+        "commands_per_sec": round(commands / reported, 1),
+        "reporting_overhead_us": round((reported - unreported) / commands * 1e6, 1),
+        "queue_drain_ms": round(drain * 1000, 1),
+    }
+
+
+def measure_memory(agent: FakeAgent, commands: int) -> dict:
+    driver = create_driver(agent)
+    try:
+        run_commands(driver, min(100, commands))
+        tracemalloc.start()
+        baseline, _ = tracemalloc.get_traced_memory()
+        run_commands(driver, commands)
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    finally:
+        driver.quit()
+    return {
+        "memory_per_command_bytes": round((current - baseline) / commands, 1),
+        "memory_peak_mb": round(peak / 2**20, 1),
+    }
+
+
+def check_thresholds(results: dict, thresholds: dict) -> list:
+    """Returns a description of every metric exceeding its threshold"""
+    violations = []
+    for metric, limits in thresholds.items():
+        value = results.get(metric)
+        if value is None:
+            continue
+        if "max" in limits and value > limits["max"]:
+            violations.append(f"{metric} = {value}, above the maximum of {limits['max']}")
+        if "min" in limits and value < limits["min"]:
+            violations.append(f"{metric} = {value}, below the minimum of {limits['min']}")
+    return violations
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sessions", type=int, default=5, help="driver sessions started to measure session start")
+    parser.add_argument("--commands", type=int, default=2000, help="driver commands executed to measure throughput")
+    parser.add_argument(
+        "--memory-commands", type=int, default=100000, help="driver commands executed to measure memory"
+    )
+    parser.add_argument("--thresholds", help="JSON file with the limits each metric must respect")
+    parser.add_argument("--json", help="file to write the results to as JSON")
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    # The SDK version is read from the package metadata, which is missing when running from the source tree
+    os.environ.setdefault("TP_SDK_VERSION", "0.0.0")
+    # Selenium 3 sends commands with the socket default timeout, which recent urllib3 versions reject
+    RemoteConnection.set_timeout(30)
+
+    agent = FakeAgent()
+    try:
+        results = {"session_start_ms": round(measure_session_start(agent, args.sessions), 1)}
+        results.update(measure_commands(agent, args.commands))
+        results.update(measure_memory(agent, args.memory_commands))
+    finally:
+        agent.shutdown()
+
+    for metric, value in results.items():
+        print(f"{metric:28} {value:12}")
+    if args.json:
+        with open(args.json, "w") as results_file:
+            json.dump(results, results_file, indent=2)
+
+    if args.thresholds:
+        with open(args.thresholds) as thresholds_file:
+            violations = check_thresholds(results, json.load(thresholds_file))
+        for violation in violations:
+            print(f"Regression: {violation}", file=sys.stderr)
+        return 1 if violations else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
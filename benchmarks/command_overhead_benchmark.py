@@ -0,0 +1,64 @@
+# Copyright 2021 TestProject (https://testproject.io)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""Measures the time the SDK adds to a driver command when all reporting is disabled.
+
+The driver round-trip is replaced by a stub returning immediately, so the measured time is the time spent in
+Selenium's RemoteConnection.execute and in the SDK. The overhead is the difference with calling
+RemoteConnection.execute directly, with reporting and step handling bypassed, and without bypassing them.
+
+Usage:
+    python -m benchmarks.command_overhead_benchmark
+"""
+
+import timeit
+from types import SimpleNamespace
+
+from selenium.webdriver.remote.command import Command
+from selenium.webdriver.remote.remote_connection import RemoteConnection
+
+from src.testproject.sdk.drivers import webdriver  # noqa: F401 - loads the SDK modules in their usual order
+from src.testproject.sdk.internal.helpers.custom_command_executor import CustomCommandExecutor
+
+
+def create_executor() -> CustomCommandExecutor:
+    agent_client = SimpleNamespace(agent_session=SimpleNamespace(dialect="W3C", session_id="benchmark"))
+    executor = CustomCommandExecutor(agent_client, "http://localhost:4444")
+    executor._request = lambda method, url, body=None: {"status": 0, "value": "Benchmark"}
+    executor.disable_reports = True
+    return executor
+
+
+def measure(function, number: int = 20000, repeat: int = 5) -> float:
+    """Returns the best time in microseconds spent per call"""
+    return min(timeit.repeat(function, number=number, repeat=repeat)) / number * 1e6
+
+
+def main():
+    executor = create_executor()
+
+    selenium = measure(lambda: RemoteConnection.execute(executor, Command.GET_TITLE, {"sessionId": "benchmark"}))
+    bypassed = measure(lambda: executor.execute(Command.GET_TITLE, {"sessionId": "benchmark"}))
+    # Reporting disabled, but every command going through step handling and test name inference as before
+    executor._bypass_reporting = False
+    handled = measure(lambda: executor.execute(Command.GET_TITLE, {"sessionId": "benchmark"}), number=2000)
+
+    print(f"RemoteConnection.execute:       {selenium:9.2f} us per command")
+    print(f"Reporting disabled (bypassed):  {bypassed:9.2f} us per command ({bypassed - selenium:+.2f} us)")
+    print(f"Reporting disabled (handled):   {handled:9.2f} us per command ({handled - selenium:+.2f} us)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+# Copyright 2021 TestProject (https://testproject.io)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""In-process stand-in for the TestProject Agent, used by the benchmarks and the tests of the SDK.
+
+The fake Agent serves, on a single local HTTP/1.1 port:
+    - the Agent status (/api/status)
+    - development sessions (/api/development/session), including job name updates
+    - driver command, step, test and batch reports (/api/development/report/...)
+    - a stub WebDriver (/wd/hub/...) returned as the session server address, answering every command immediately
+Requests to any other path, such as action executions, are answered with a passed execution result. Compressed
+request bodies are decompressed according to their Content-Encoding header.
+
+It also listens on a development TCP socket, sending the session UUID to every SDK connecting to it like the Agent
+does, and discarding whatever the SDK sends on it.
+"""
+
+import gzip
+import json
+import socket
+import struct
+import threading
+import time
+import uuid
+import zlib
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+
+
+class ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+class FakeAgent:
+    """Local HTTP server and development socket implementing the Agent API used by the SDK
+
+    Args:
+        version (str): The Agent version reported to the SDK
+        record_requests (bool): True to record every request received, which benchmarks leave off so that the
+            fake Agent does not retain memory
+
+    Attributes:
+        address (str): The base URL of the fake Agent
+        version (str): The Agent version reported to the SDK
+        sessions (int): Number of development sessions started
+        reports (int): Number of reports received, counting each report of a batch
+        commands (int): Number of commands received by the stub WebDriver
+        requests (list): (method, path, client port, parsed JSON body) tuples for every request received, if recorded
+        content_encodings (list): Content-Encoding header of every request received, None if uncompressed
+        bytes_received (int): total size of the request bodies received, as sent on the wire
+        faults (list): faults injected in the next requests, either an HTTP status code to respond with or
+            "reset" to abort the connection without responding
+        delay (float): number of seconds to wait before responding to each request
+    """
+
+    WEBDRIVER_PATH = "/wd/hub"
+    W3C_ELEMENT_KEY = "element-6066-11e4-a52e-4f735466cecf"
+
+    def __init__(self, version: str = "3.3.0", record_requests: bool = False):
+        self.version = version
+        self.sessions = 0
+        self.reports = 0
+        self.commands = 0
+        self.requests = []
+        self.content_encodings = []
+        self.bytes_received = 0
+        self.faults = []
+        self.delay = 0
+        self._record_requests = record_requests
+        self._lock = threading.Lock()
+        agent = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                self._handle()
+
+            def do_POST(self):
+                self._handle()
+
+            def do_PUT(self):
+                self._handle()
+
+            def do_DELETE(self):
+                self._handle()
+
+            def _handle(self):
+                raw_body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                fault = agent.faults.pop(0) if agent.faults else None
+                if fault == "reset":
+                    # Abort the connection with a TCP reset
+                    self.connection.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack("ii", 1, 0))
+                    self.close_connection = True
+                    return
+                if fault is not None:
+                    self.send_response(fault)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                content_encoding = self.headers.get("Content-Encoding")
+                if content_encoding == "gzip":
+                    body = gzip.decompress(raw_body)
+                elif content_encoding == "deflate":
+                    body = zlib.decompress(raw_body)
+                else:
+                    body = raw_body
+                body = json.loads(body) if body else None
+                if agent._record_requests:
+                    with agent._lock:
+                        agent.content_encodings.append(content_encoding)
+                        agent.bytes_received += len(raw_body)
+                        agent.requests.append((self.command, self.path, self.client_address[1], body))
+                time.sleep(agent.delay)
+                self._respond(agent.handle(self.command, self.path, body))
+
+            def _respond(self, response):
+                body = json.dumps(response).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.address = f"http://127.0.0.1:{self._server.server_port}"
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._socket.bind(("127.0.0.1", 0))
+        self._socket.listen()
+        self._uuid = uuid.uuid4().hex[:34].ljust(34, "0")
+        threading.Thread(target=self._server.serve_forever, args=(0.05,), daemon=True).start()
+        threading.Thread(target=self._accept_connections, daemon=True).start()
+
+    @property
+    def webdriver_address(self) -> str:
+        """Getter for the base URL of the stub WebDriver"""
+        return self.address + self.WEBDRIVER_PATH
+
+    @property
+    def client_ports(self) -> list:
+        """Getter for the client port of every request recorded, identifying the TCP connection used"""
+        return [request[2] for request in self.requests]
+
+    def handle(self, method: str, path: str, body):
+        """Returns the response to an Agent API or WebDriver request
+
+        Args:
+            method (str): The HTTP method of the request
+            path (str): The path of the request
+            body: The parsed JSON body of the request, None if empty
+
+        Returns:
+            The response body, serialized to JSON
+        """
+        if path.startswith(self.WEBDRIVER_PATH):
+            with self._lock:
+                self.commands += 1
+            if method == "POST" and path.endswith("/element"):
+                return {"value": {self.W3C_ELEMENT_KEY: str(uuid.uuid4())}}
+            return {"value": None if method != "GET" else "Benchmark"}
+        if path == "/api/status":
+            return {"tag": self.version}
+        if path == "/api/development/session":
+            if method == "PUT":
+                # Job name update
+                return {}
+            with self._lock:
+                self.sessions += 1
+            return {
+                "devSocketPort": self._socket.getsockname()[1],
+                "serverAddress": self.webdriver_address,
+                "sessionId": str(uuid.uuid4()),
+                "dialect": "W3C",
+                "capabilities": body.get("capabilities", {}) if isinstance(body, dict) else {},
+                "version": self.version,
+                "uuid": self._uuid,
+            }
+        if path.startswith("/api/development/report"):
+            with self._lock:
+                self.reports += len(body) if isinstance(body, list) else 1
+            return {}
+        return {"resultType": "Passed", "outputs": {}}
+
+    def _accept_connections(self):
+        """Accepts development socket connections, validating each of them with the session UUID"""
+        while True:
+            try:
+                connection, _ = self._socket.accept()
+            except OSError:
+                return
+            # The UUID is sent as a Java modified UTF-8 string, prefixed with its length on 2 bytes
+            connection.sendall(struct.pack(">H", len(self._uuid)) + self._uuid.encode("ascii"))
+            threading.Thread(target=self._discard, args=(connection,), daemon=True).start()
+
+    @staticmethod
+    def _discard(connection: socket.socket):
+        """Reads and ignores everything sent by the SDK on a development socket until it is closed"""
+        with connection:
+            try:
+                while connection.recv(4096):
+                    pass
+            except OSError:
+                pass
+
+    def shutdown(self):
+        self._server.shutdown()
+        self._server.server_close()
+        self._socket.close()
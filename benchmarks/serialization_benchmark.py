@@ -0,0 +1,84 @@
+# Copyright 2021 TestProject (https://testproject.io)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""Measures the cost of serializing reports before they are sent to the Agent.
+
+Compares encoding every report with the standard library json module when it is sent, and again as part of its
+batch, with serializing it once using ReportEncoder and joining the serialized reports into a batch.
+
+Usage:
+    python -m benchmarks.serialization_benchmark
+"""
+
+import base64
+import json
+import os
+import timeit
+
+from src.testproject.sdk.drivers import webdriver  # noqa: F401 - loads the SDK modules in their usual order
+from src.testproject.rest.messages import DriverCommandReport
+from src.testproject.sdk.internal.agent.report_encoder import ReportEncoder, orjson
+
+BATCH_SIZE = 10
+
+
+def create_reports(count: int, screenshot_size: int) -> list:
+    screenshot = base64.b64encode(os.urandom(screenshot_size)).decode() if screenshot_size else None
+    return [
+        DriverCommandReport(
+            command="findElement",
+            command_params={"using": "css selector", "value": f"#element-{i}"},
+            result={"element-6066-11e4-a52e-4f735466cecf": f"{i:032x}"},
+            passed=True,
+            screenshot=screenshot,
+            message="Step Passed.",
+        ).to_json()
+        for i in range(count)
+    ]
+
+
+def encode_twice(reports: list):
+    """Reports are encoded when queued and again when their batch is sent, as before pre-serialization"""
+    for report in reports:
+        json.dumps(report)
+    for i in range(0, len(reports), BATCH_SIZE):
+        json.dumps(reports[i : i + BATCH_SIZE])
+
+
+def encode_once(reports: list):
+    """Reports are serialized once and batches are built by joining the serialized reports"""
+    payloads = [ReportEncoder.encode(report) for report in reports]
+    for i in range(0, len(payloads), BATCH_SIZE):
+        ReportEncoder.encode_array(payloads[i : i + BATCH_SIZE])
+
+
+def measure(function, reports: list, repeat: int = 5) -> float:
+    """Returns the best time in microseconds spent per report"""
+    number = max(1, 2000 // len(reports))
+    best = min(timeit.repeat(lambda: function(reports), number=number, repeat=repeat))
+    return best / number / len(reports) * 1e6
+
+
+def main():
+    print(f"Encoder: {'orjson' if orjson is not None else 'json (standard library)'}")
+    for title, screenshot_size in [("without screenshot", 0), ("with 150 KB screenshot", 150 * 1024)]:
+        reports = create_reports(100, screenshot_size)
+        before = measure(encode_twice, reports)
+        after = measure(encode_once, reports)
+        print(f"Report {title}: {before:9.2f} us -> {after:9.2f} us per report ({before / after:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+# Copyright 2021 TestProject (https://testproject.io)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""Measures the cost of creating a driver per test, against an in-process fake Agent (see benchmarks.fake_agent).
+
+Each simulated test creates a driver, executes a few commands and quits it. With the same report settings for every
+test, the drivers reuse the reports queue and development socket of the first one. With a different job name per
+test, every driver starts a new reports queue and reconnects the development socket, as all drivers did before.
+
+Usage:
+    python -m benchmarks.session_reuse_benchmark
+"""
+
+import logging
+import os
+import statistics
+import time
+
+from selenium.webdriver.remote.remote_connection import RemoteConnection
+
+from benchmarks.fake_agent import FakeAgent
+from src.testproject.sdk.drivers import webdriver
+
+
+def run_tests(agent: FakeAgent, tests: int, job_name) -> tuple:
+    """Runs simulated tests and returns the median driver creation and quit times in milliseconds"""
+    create_times = []
+    quit_times = []
+    for test in range(tests):
+        start_time = time.perf_counter()
+        driver = webdriver.Chrome(
+            token="benchmark-token", agent_url=agent.address, project_name="Benchmarks", job_name=job_name(test)
+        )
+        create_times.append(time.perf_counter() - start_time)
+        for _ in range(10):
+            driver.title
+        start_time = time.perf_counter()
+        driver.quit()
+        quit_times.append(time.perf_counter() - start_time)
+    return statistics.median(create_times) * 1000, statistics.median(quit_times) * 1000
+
+
+def main():
+    logging.disable(logging.WARNING)
+    # The SDK version is read from the package metadata, which is missing when running from the source tree
+    os.environ.setdefault("TP_SDK_VERSION", "0.0.0")
+    # Selenium 3 sends commands with the socket default timeout, which recent urllib3 versions reject
+    RemoteConnection.set_timeout(30)
+
+    agent = FakeAgent()
+    try:
+        renewed = run_tests(agent, 50, lambda test: f"Session reuse {test}")
+        reused = run_tests(agent, 50, lambda test: "Session reuse")
+    finally:
+        agent.shutdown()
+
+    print(f"New session per test:    create {renewed[0]:7.2f} ms, quit {renewed[1]:7.2f} ms")
+    print(f"Reused session:          create {reused[0]:7.2f} ms, quit {reused[1]:7.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+# Copyright 2021 TestProject (https://testproject.io)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""Measures the cost of detecting whether a driver command is executed by a wait loop.
+
+Compares scanning the call stack for a wait.py frame, as done before for every reported command, with reading the
+wait context. Both are measured from the bottom of a 60 frames deep call stack, similar to a test run by pytest.
+
+Usage:
+    python -m benchmarks.wait_detection_benchmark
+"""
+
+import inspect
+import timeit
+
+from src.testproject.sdk.drivers import webdriver  # noqa: F401 - loads the SDK modules in their usual order
+from src.testproject.classes.wait_context import WaitContext
+
+STACK_DEPTH = 60
+
+
+def scan_call_stack() -> bool:
+    """Wait detection as done before the wait context"""
+    for frame in inspect.stack().__reversed__():
+        if str(frame.filename).find("wait.py") > 0:
+            return True
+    return False
+
+
+def read_wait_context() -> bool:
+    return WaitContext.active()
+
+
+def at_depth(depth: int, function):
+    """Calls a function from the bottom of a call stack with the given number of additional frames"""
+    if depth <= 0:
+        return function()
+    return at_depth(depth - 1, function)
+
+
+def measure(function, number: int, repeat: int = 5) -> float:
+    """Returns the best time in microseconds spent per call"""
+    padding = STACK_DEPTH - len(inspect.stack())
+    best = min(timeit.repeat(lambda: at_depth(padding, function), number=number, repeat=repeat))
+    return best / number * 1e6
+
+
+def main():
+    before = measure(scan_call_stack, number=200)
+    after = measure(read_wait_context, number=20000)
+    print(
+        f"Wait detection at {STACK_DEPTH} frames: {before:9.2f} us -> {after:9.2f} us per command"
+        f" ({before / after:.0f}x)"
+    )
+
+
+if __name__ == "__main__":
+    main()
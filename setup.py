@@ -14,7 +14,9 @@ setuptools.setup(
     long_description=long_description,
     long_description_content_type="text/x-rst",
     url="https://github.com/testproject-io/python-opensdk",
-    packages=setuptools.find_packages(exclude=["tests", "tests.*", "proxy_examples", "proxy_examples.*"]),
+    packages=setuptools.find_packages(
+        exclude=["tests", "tests.*", "proxy_examples", "proxy_examples.*", "benchmarks", "benchmarks.*"]
+    ),
     classifiers=[
         "Programming Language :: Python :: 3",
         "License :: OSI Approved :: Apache Software License",
@@ -29,4 +31,12 @@ setuptools.setup(
         "importlib-metadata>=1.7.0",
         "packaging>=20.4",
     ],
+    entry_points={
+        # Sets the test identity and reports test results when running tests with pytest
+        "pytest11": ["testproject = src.testproject.plugins.pytest_plugin"],
+    },
+    extras_require={
+        # Faster serialization of reports sent to the Agent
+        "orjson": ["orjson>=3.4.0"],
+    },
 )
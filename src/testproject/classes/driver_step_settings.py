@@ -54,3 +54,5 @@ class DriverStepSettings:
     def __exit__(self, exc_type, exc_val, exc_tb):
         """Reverting to the previous settings."""
         self.driver.command_executor.settings = self.previous_settings
+        # The timeout of the previous settings is applied again before the next command
+        self.driver.command_executor.step_helper.reset_timeout()
@@ -0,0 +1,169 @@
+# Copyright 2021 TestProject (https://testproject.io)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import json
+import logging
+import os
+import threading
+import time
+
+
+class Tracer:
+    """Records the activity of the SDK as a timeline of spans, written in the Chrome Trace Event format.
+
+    Tracing is process wide and disabled until started. While disabled, span() returns a shared no-op context, so
+    traced code only pays for a function call. The written file can be opened in chrome://tracing or Perfetto,
+    each thread appearing on its own track. It uses the JSON array format, whose closing bracket is optional, so
+    that each write only appends the spans recorded since the previous one and they are no longer kept in memory.
+
+    Examples:
+        with Tracer.span("findElement", "command"):
+            # Driver command sent to the Agent.
+    """
+
+    _events = None
+    _origin = 0.0
+    _threads = {}
+    # The file the spans were last written to and the threads named in it
+    _written_path = None
+    _written_threads = set()
+
+    @classmethod
+    def start(cls):
+        """Starts recording spans, if not started already"""
+        if cls._events is None:
+            cls._threads = {}
+            cls._written_path = None
+            cls._written_threads = set()
+            cls._origin = time.perf_counter()
+            cls._events = []
+
+    @classmethod
+    def stop(cls):
+        """Stops recording spans and discards the recorded ones"""
+        cls._events = None
+
+    @classmethod
+    def enabled(cls) -> bool:
+        """Returns True if spans are being recorded, False otherwise"""
+        return cls._events is not None
+
+    @classmethod
+    def span(cls, name: str, category: str, **args):
+        """Returns a context recording its execution as a span
+
+        Args:
+            name (str): The span name, such as the driver command or the action executed
+            category (str): The kind of activity, spans can be filtered by category in the trace viewers
+            args: Details shown with the span
+
+        Returns:
+            A context manager recording a span, or doing nothing if tracing is disabled
+        """
+        if cls._events is None:
+            return _NO_SPAN
+        return _Span(name, category, args)
+
+    @classmethod
+    def write(cls, path: str):
+        """Writes the spans recorded since the previous write to a Chrome Trace Event JSON file
+
+        The file is created by the first write since tracing started, later writes to the same file append to it.
+        Written spans are discarded.
+
+        Args:
+            path (str): Path of the file to write
+        """
+        events = cls._events
+        if events is None:
+            return
+        # Spans recorded while writing are kept for the next write
+        count = len(events)
+        pid = os.getpid()
+        append = path == cls._written_path
+        written_threads = cls._written_threads if append else set()
+        threads = [
+            {"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": thread_name}}
+            for tid, thread_name in list(cls._threads.items())
+            if tid not in written_threads
+        ]
+        try:
+            with open(path, "a" if append else "w") as trace_file:
+                if not append:
+                    trace_file.write("[\n")
+                trace_file.writelines(f"{json.dumps(event)},\n" for event in threads + events[:count])
+        except OSError as e:
+            logging.warning(f"Failed writing trace to {path}: {e}")
+            return
+        del events[:count]
+        cls._written_path = path
+        cls._written_threads = written_threads | {thread["tid"] for thread in threads}
+
+    @classmethod
+    def _record(cls, name: str, category: str, args: dict, start: float, end: float):
+        """Adds a complete event to the recorded spans, timestamps are in microseconds since tracing started"""
+        events = cls._events
+        if events is None:
+            return
+        thread = threading.current_thread()
+        cls._threads.setdefault(thread.ident, thread.name)
+        event = {
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            "ts": round((start - cls._origin) * 1e6, 3),
+            "dur": round((end - start) * 1e6, 3),
+            "pid": os.getpid(),
+            "tid": thread.ident,
+        }
+        if args:
+            event["args"] = args
+        events.append(event)
+
+
+class _Span:
+    """Context recording its execution as a span"""
+
+    __slots__ = ("_name", "_category", "_args", "_start")
+
+    def __init__(self, name: str, category: str, args: dict):
+        self._name = name
+        self._category = category
+        self._args = args
+        self._start = 0.0
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is not None:
+            self._args["error"] = exc_type.__name__
+        Tracer._record(self._name, self._category, self._args, self._start, time.perf_counter())
+
+
+class _NoSpan:
+    """Context doing nothing, returned while tracing is disabled"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        pass
+
+
+_NO_SPAN = _NoSpan()
@@ -0,0 +1,68 @@
+# Copyright 2021 TestProject (https://testproject.io)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import functools
+import threading
+
+from selenium.webdriver.support.wait import WebDriverWait
+
+from src.testproject.classes.tracer import Tracer
+
+
+class WaitContext:
+    """Implementation of the 'with' compound statement marking driver commands as executed by a wait loop.
+
+    Commands executed within this compound statement on the same thread are recognized as part of a wait loop,
+    so only the last of them is reported. Contexts can be nested.
+
+    Examples:
+        with WaitContext():
+            # Driver commands polled until a condition is met.
+    """
+
+    _state = threading.local()
+
+    @classmethod
+    def active(cls) -> bool:
+        """Returns True if the current thread is executing a wait loop, False otherwise"""
+        return getattr(cls._state, "depth", 0) > 0
+
+    @classmethod
+    def install_selenium_hook(cls):
+        """Makes the Selenium WebDriverWait until and until_not functions run within a wait context"""
+        for function_name in ("until", "until_not"):
+            function = getattr(WebDriverWait, function_name)
+            if not getattr(function, "_in_wait_context", False):
+                setattr(WebDriverWait, function_name, cls.__in_wait_context(function))
+
+    @classmethod
+    def __in_wait_context(cls, function):
+        """Wraps a function so it is executed within a wait context"""
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with cls(), Tracer.span(function.__name__, "wait"):
+                return function(*args, **kwargs)
+
+        wrapper._in_wait_context = True
+        return wrapper
+
+    def __enter__(self):
+        """Marking the current thread as executing a wait loop."""
+        self._state.depth = getattr(self._state, "depth", 0) + 1
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Reverting to the previous state."""
+        self._state.depth -= 1
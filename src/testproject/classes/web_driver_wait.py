@@ -5,6 +5,7 @@ from selenium.common.exceptions import TimeoutException
 from selenium.webdriver.support.wait import WebDriverWait
 
 from src.testproject.classes import DriverStepSettings, StepSettings
+from src.testproject.classes.wait_context import WaitContext
 
 
 class TestProjectWebDriverWait(WebDriverWait):
@@ -58,7 +59,7 @@ class TestProjectWebDriverWait(WebDriverWait):
             sleep_time=step_settings.sleep_time,
         )
         # Execute the function with default StepSettings.
-        with DriverStepSettings(self._driver, StepSettings()):
+        with DriverStepSettings(self._driver, StepSettings()), WaitContext():
             try:
                 result = getattr(super(), function_name)(method, message)
                 passed = True if result else False
@@ -5,6 +5,8 @@ from .reportnamingelement import ReportNamingElement
 from .environmentvariable import EnvironmentVariable
 from .sleep_timing_type import SleepTimingType
 from .screenshot_condition_type import TakeScreenshotConditionType
+from .reports_overflow_policy import ReportsOverflowPolicy
+from .command_reports_mode import CommandReportsMode
 
 __all__ = [
     "ExecutionResultType",
@@ -14,4 +16,6 @@ __all__ = [
     "EnvironmentVariable",
     "SleepTimingType",
     "TakeScreenshotConditionType",
+    "ReportsOverflowPolicy",
+    "CommandReportsMode",
 ]
@@ -15,15 +15,13 @@
 from src.testproject.sdk.drivers.webdriver import Remote, Generic
 from src.testproject.sdk.drivers.webdriver.base import BaseDriver
 from src.testproject.sdk.exceptions import SdkException
+from src.testproject.sdk.internal.session import SessionRegistry
 
 
 def get_active_driver_instance():
     """Get the current driver instance in use (BaseDriver, Remote or Generic)"""
-    # Get the first driver instance that exists (not None) in the list of possible driver instances.
-    driver = next(
-        (_driver for _driver in [BaseDriver.instance(), Remote.instance(), Generic.instance()] if _driver is not None),
-        None,
-    )
+    # Prefer the driver bound to the current thread, in case several drivers run concurrently.
+    driver = SessionRegistry.current(BaseDriver, Remote, Generic)
     if driver is None:
         raise SdkException("No active driver instance found for reporting")
     return driver
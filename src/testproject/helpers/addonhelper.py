@@ -17,6 +17,7 @@ import os
 from selenium.webdriver.common.by import By
 
 from src.testproject.classes import ElementSearchCriteria
+from src.testproject.classes.tracer import Tracer
 from src.testproject.enums import ExecutionResultType, FindByType
 from src.testproject.rest.messages import AddonExecutionResponse
 from src.testproject.sdk.addons import ActionProxy
@@ -51,8 +52,12 @@ class AddonHelper:
         # Handling sleep before execution
         step_helper.handle_sleep(sleep_timing_type=settings.sleep_timing_type, sleep_time=settings.sleep_time)
 
-        # Execute the action
-        response: AddonExecutionResponse = self._agent_client.execute_proxy(action)
+        # Execute the action once the screenshots of the previous steps have been captured
+        self._command_executor.wait_for_screenshots()
+        with Tracer.span(type(action).__name__, "addon"):
+            response: AddonExecutionResponse = self._agent_client.execute_proxy(action)
+        # Addon actions run on the Agent and may change the session implicit wait
+        step_helper.reset_timeout()
 
         # Handling sleep after execution
         step_helper.handle_sleep(
@@ -14,8 +14,11 @@
 
 import os
 import logging
+import tempfile
+from typing import Optional
 
 from src.testproject import definitions
+from src.testproject.enums import CommandReportsMode, ReportsOverflowPolicy
 
 
 class ConfigHelper:
@@ -61,3 +64,210 @@ class ConfigHelper:
             str: the current SDK version
         """
         return definitions.get_sdk_version()
+
+    @staticmethod
+    def get_agent_http_pool_size() -> int:
+        """Returns the number of keep-alive connections to the Agent as defined in the TP_AGENT_HTTP_POOL_SIZE
+            environment variable. Defaults to 10
+
+        Returns:
+            int: the maximum number of pooled connections per Agent host
+        """
+        return ConfigHelper.get_int_from_env("TP_AGENT_HTTP_POOL_SIZE", 10)
+
+    @staticmethod
+    def get_agent_request_timeout(method: str, default: float = None) -> float:
+        """Returns the timeout for HTTP requests of the given method sent to the Agent, as defined in the
+            TP_AGENT_<METHOD>_TIMEOUT environment variable (in milliseconds, e.g. TP_AGENT_POST_TIMEOUT)
+
+        Args:
+            method (str): HTTP method (GET, POST, ...)
+            default (float): Timeout in seconds to use when the environment variable is not defined
+
+        Returns:
+            float: the request timeout in seconds, or None to wait indefinitely
+        """
+        timeout_ms = ConfigHelper.get_int_from_env(f"TP_AGENT_{method.upper()}_TIMEOUT", None)
+        return timeout_ms / 1000.0 if timeout_ms is not None else default
+
+    @staticmethod
+    def get_reports_queue_capacity() -> int:
+        """Returns the maximum number of reports waiting to be sent to the Agent as defined in the
+            TP_REPORTS_QUEUE_CAPACITY environment variable. Defaults to 0, which means unbounded
+
+        Returns:
+            int: the reports queue capacity
+        """
+        return max(0, ConfigHelper.get_int_from_env("TP_REPORTS_QUEUE_CAPACITY", 0))
+
+    @staticmethod
+    def get_reports_queue_workers() -> int:
+        """Returns the number of threads sending reports to the Agent concurrently as defined in the
+            TP_REPORTS_QUEUE_WORKERS environment variable. Defaults to 1
+
+        Returns:
+            int: the number of reporting threads
+        """
+        return ConfigHelper.get_int_from_env("TP_REPORTS_QUEUE_WORKERS", 1)
+
+    @staticmethod
+    def get_reports_overflow_policy() -> ReportsOverflowPolicy:
+        """Returns the policy applied to reports submitted while the reports queue is full, as defined in the
+            TP_REPORTS_QUEUE_OVERFLOW_POLICY environment variable (Block, DropCommands, StripScreenshots or
+            SpillToDisk). Defaults to Block
+
+        Returns:
+            ReportsOverflowPolicy: the reports queue overflow policy
+        """
+        policy_name = os.getenv("TP_REPORTS_QUEUE_OVERFLOW_POLICY")
+        if policy_name is None:
+            return ReportsOverflowPolicy.Block
+        try:
+            return ReportsOverflowPolicy[policy_name]
+        except KeyError:
+            logging.warning(f"Unknown reports queue overflow policy '{policy_name}', using Block.")
+            return ReportsOverflowPolicy.Block
+
+    @staticmethod
+    def get_reports_spool_dir() -> str:
+        """Returns the directory where reports are spooled to disk as defined in the TP_REPORTS_SPOOL_DIR
+            environment variable. Defaults to a 'testproject-reports' directory in the system temporary directory.
+            Reports are spooled to a subdirectory scoped to the token and the Agent address
+
+        Returns:
+            str: the reports spool directory
+        """
+        return os.getenv("TP_REPORTS_SPOOL_DIR", os.path.join(tempfile.gettempdir(), "testproject-reports"))
+
+    @staticmethod
+    def get_reports_compression() -> str:
+        """Returns the content encoding used to compress reports sent to the Agent as defined in the
+            TP_REPORTS_COMPRESSION environment variable: 'gzip', 'deflate', 'none' or 'auto', which compresses
+            reports using gzip only when the Agent is not running locally.
+            Defaults to 'none', compression must only be enabled for Agents accepting compressed reports
+
+        Returns:
+            str: the reports compression setting
+        """
+        compression = os.getenv("TP_REPORTS_COMPRESSION", "none").casefold()
+        if compression not in ["gzip", "deflate", "none", "auto"]:
+            logging.warning(f"Unknown reports compression '{compression}', using none.")
+            return "none"
+        return compression
+
+    @staticmethod
+    def get_reports_compression_level() -> int:
+        """Returns the level used to compress reports sent to the Agent as defined in the
+            TP_REPORTS_COMPRESSION_LEVEL environment variable, from 1 (fastest) to 9 (smallest). Defaults to 6
+
+        Returns:
+            int: the reports compression level
+        """
+        return ConfigHelper.get_int_from_env("TP_REPORTS_COMPRESSION_LEVEL", 6)
+
+    @staticmethod
+    def get_max_screenshots_in_flight() -> int:
+        """Returns the maximum number of screenshots captured in the background at the same time as defined in the
+            TP_MAX_SCREENSHOTS_IN_FLIGHT environment variable. Defaults to 4, 0 captures screenshots on the test thread
+
+        Returns:
+            int: the maximum number of screenshots in flight
+        """
+        return max(0, ConfigHelper.get_int_from_env("TP_MAX_SCREENSHOTS_IN_FLIGHT", 4))
+
+    @staticmethod
+    def get_command_reports_mode() -> CommandReportsMode:
+        """Returns which driver command reports are sent to the Agent, as defined in the TP_COMMAND_REPORTS_MODE
+            environment variable (All or OnFailure). Defaults to All
+
+        Returns:
+            CommandReportsMode: the driver command reports mode
+        """
+        mode_name = os.getenv("TP_COMMAND_REPORTS_MODE")
+        if mode_name is None:
+            return CommandReportsMode.All
+        try:
+            return CommandReportsMode[mode_name]
+        except KeyError:
+            logging.warning(f"Unknown driver command reports mode '{mode_name}', using All.")
+            return CommandReportsMode.All
+
+    @staticmethod
+    def get_command_reports_buffer_size() -> int:
+        """Returns the number of driver command reports kept to be sent when a test fails, as defined in the
+            TP_COMMAND_REPORTS_BUFFER_SIZE environment variable. Defaults to 50
+
+        Returns:
+            int: the maximum number of buffered driver command reports
+        """
+        return max(1, ConfigHelper.get_int_from_env("TP_COMMAND_REPORTS_BUFFER_SIZE", 50))
+
+    @staticmethod
+    def get_command_stats_file() -> Optional[str]:
+        """Returns the path of the file the driver command stats are written to when the driver quits, as defined in
+            the TP_COMMAND_STATS_FILE environment variable. Defaults to None, stats are not written
+
+        Returns:
+            Optional[str]: the path of the driver command stats file
+        """
+        return os.getenv("TP_COMMAND_STATS_FILE") or None
+
+    @staticmethod
+    def get_trace_file() -> Optional[str]:
+        """Returns the path of the file the trace of the SDK activity is written to when the driver quits, as defined
+            in the TP_TRACE_FILE environment variable. Defaults to None, the SDK activity is not traced
+
+        Returns:
+            Optional[str]: the path of the trace file
+        """
+        return os.getenv("TP_TRACE_FILE") or None
+
+    @staticmethod
+    def get_redaction_prefetch() -> bool:
+        """Returns whether elements are checked for redaction as soon as they are found, as defined in the
+            TP_REDACTION_PREFETCH environment variable ('true' or 'false'). Defaults to false
+
+        Returns:
+            bool: True if the redaction verdict is fetched when an element is found, False otherwise
+        """
+        return os.getenv("TP_REDACTION_PREFETCH", "false").casefold() == "true"
+
+    @staticmethod
+    def get_async_reports_flush() -> bool:
+        """Returns whether quitting a driver returns before its remaining reports are delivered, as defined in the
+            TP_ASYNC_REPORTS_FLUSH environment variable ('true' or 'false'). Defaults to false
+
+        Returns:
+            bool: True if the reports are delivered in the background after the driver quit, False otherwise
+        """
+        return os.getenv("TP_ASYNC_REPORTS_FLUSH", "false").casefold() == "true"
+
+    @staticmethod
+    def get_agent_heartbeat_interval() -> float:
+        """Returns the interval between checks of the Agent development socket connection as defined in the
+            TP_AGENT_HEARTBEAT_INTERVAL_MS environment variable (in milliseconds). Defaults to 0, which disables them
+
+        Returns:
+            float: the heartbeat interval in seconds, 0 if the connection is not checked in the background
+        """
+        return max(0, ConfigHelper.get_int_from_env("TP_AGENT_HEARTBEAT_INTERVAL_MS", 0)) / 1000.0
+
+    @staticmethod
+    def get_int_from_env(variable_name: str, default):
+        """Reads an integer value from an environment variable
+
+        Args:
+            variable_name (str): Name of the environment variable
+            default: Value returned when the variable is not defined or is not a valid integer
+
+        Returns:
+            int: the value of the environment variable, or the default value
+        """
+        value = os.getenv(variable_name)
+        if value is None:
+            return default
+        try:
+            return int(value)
+        except ValueError:
+            logging.warning(f"The environment variable {variable_name} value must be an integer, using {default}.")
+            return default
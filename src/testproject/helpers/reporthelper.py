@@ -12,16 +12,47 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import functools
 import logging
 import ntpath
 import os
-import inspect
+import sys
+import threading
+import unittest
 
 from src.testproject.enums import EnvironmentVariable, ReportNamingElement
 
 
 class ReportHelper:
-    """Provides helper functions used in reporting command, tests and steps"""
+    """Provides helper functions used in reporting command, tests and steps
+
+    Test names are inferred from cheap signals whenever possible: the decorator environment variable, the test set
+    by the pytest plugin, the test info stored by pytest, or the unittest test being run as tracked by a hook on
+    unittest.TestCase.run. The call stack is only walked when none of these is available. Without a testing
+    framework, the function called by the module level code is remembered per thread, so that later walks stop as
+    soon as they reach it.
+    """
+
+    # The (test, project, job) names of the test being run by each thread, as set by the pytest plugin
+    __current_test = threading.local()
+
+    # The (test name, passed, message) result of the latest test of each thread whose result is known
+    __test_result = threading.local()
+
+    # Whether unittest was invoked, detected once per process
+    __unittest_detected = None
+
+    # The unittest test method being run and whether its tearDown method is running, tracked by the unittest hook
+    __unittest_hooked = False
+    __unittest_test_name = None
+    __unittest_in_teardown = False
+
+    # The original and the tracking unittest.TestCase.run methods while the unittest hook is installed
+    __unittest_run = None
+    __unittest_tracked_run = None
+
+    # The function called by the module level code of each thread, as found by walking its call stack
+    __module_caller = threading.local()
 
     @classmethod
     def infer_test_name(cls) -> str:
@@ -35,16 +66,27 @@ class ReportHelper:
         if test_name_in_decorator is not None:
             return test_name_in_decorator
 
+        if cls.__unittest_test_name is not None:
+            # unittest is running a test, which may itself have been started by a pytest test
+            return cls.__unittest_test_name
+
+        current_test = cls.__current_test_names()
+        if current_test is not None:
+            return current_test[0]
+
         current_test_info = os.environ.get("PYTEST_CURRENT_TEST")
 
         if current_test_info is not None:
             # we're using pytest
             result = cls.infer_name_from_pytest_info_for(current_test_info, ReportNamingElement.Test)
+        elif cls.__unittest_hooked:
+            # unittest is running a class level fixture since the hook was installed
+            result = cls.__unittest_test_name
         else:
             # Try finding the right entry in the call stack (for unittest or when no testing framework is used)
-            logging.debug("Attempting to infer test name using inspect.stack()")
+            logging.debug("Attempting to infer test name using the call stack")
             result = cls.__find_name_in_call_stack_for(ReportNamingElement.Test)
-            logging.debug(f"Inferred test name '{result}' from inspect.stack()")
+            logging.debug(f"Inferred test name '{result}' from the call stack")
 
         return result if result is not None else "Unnamed Test"
 
@@ -60,6 +102,10 @@ class ReportHelper:
         if project_name_in_decorator is not None:
             return project_name_in_decorator
 
+        current_test = cls.__current_test_names()
+        if current_test is not None:
+            return current_test[1]
+
         current_test_info = os.environ.get("PYTEST_CURRENT_TEST")
 
         if current_test_info is not None:
@@ -67,9 +113,9 @@ class ReportHelper:
             result = cls.infer_name_from_pytest_info_for(current_test_info, ReportNamingElement.Project)
         else:
             # Try finding the right entry in the call stack (for unittest or when no testing framework is used)
-            logging.debug("Attempting to infer project name using inspect.stack()")
+            logging.debug("Attempting to infer project name using the call stack")
             result = cls.__find_name_in_call_stack_for(ReportNamingElement.Project)
-            logging.debug(f"Inferred project name '{result}' from inspect.stack()")
+            logging.debug(f"Inferred project name '{result}' from the call stack")
 
         return result if result is not None else "Unnamed Project"
 
@@ -85,6 +131,10 @@ class ReportHelper:
         if job_name_in_decorator is not None:
             return job_name_in_decorator
 
+        current_test = cls.__current_test_names()
+        if current_test is not None:
+            return current_test[2]
+
         current_test_info = os.environ.get("PYTEST_CURRENT_TEST")
 
         if current_test_info is not None:
@@ -92,15 +142,63 @@ class ReportHelper:
             result = cls.infer_name_from_pytest_info_for(current_test_info, ReportNamingElement.Job)
         else:
             # Try finding the right entry in the call stack (for unittest or when no testing framework is used)
-            logging.debug("Attempting to infer job name using inspect.stack()")
+            logging.debug("Attempting to infer job name using the call stack")
             result = cls.__find_name_in_call_stack_for(ReportNamingElement.Job)
-            logging.debug(f"Inferred job name '{result}' from inspect.stack()")
+            logging.debug(f"Inferred job name '{result}' from the call stack")
 
         return result if result is not None else "Unnamed Job"
 
     @classmethod
+    def set_current_test(cls, test: str, project: str, job: str):
+        """Sets the names of the test being run by the current thread, used instead of inferring them
+
+        Args:
+            test (str): The name of the test
+            project (str): The name of the project
+            job (str): The name of the job
+        """
+        cls.__current_test.names = (test, project, job)
+
+    @classmethod
+    def clear_current_test(cls):
+        """Clears the names of the test being run by the current thread, names are inferred again"""
+        cls.__current_test.names = None
+
+    @classmethod
+    def __current_test_names(cls):
+        """Returns the (test, project, job) names of the test being run by the current thread, None if not set"""
+        return getattr(cls.__current_test, "names", None)
+
+    @classmethod
+    def set_test_result(cls, test: str, passed: bool, message: str = None):
+        """Records the result of a test run by the current thread, to be included in its test report
+
+        Args:
+            test (str): The name of the test
+            passed (bool): True if the test passed, False otherwise
+            message (str): A message that goes with the test result
+        """
+        cls.__test_result.result = (test, passed, message)
+
+    @classmethod
+    def get_test_result(cls, test: str) -> tuple:
+        """Returns the recorded result of a test run by the current thread
+
+        Args:
+            test (str): The name of the test
+
+        Returns:
+            tuple: (passed, message) of the test, (True, None) if its result was not recorded
+        """
+        test_result = getattr(cls.__test_result, "result", None)
+        if test_result is not None and test_result[0] == test:
+            return test_result[1], test_result[2]
+        return True, None
+
+    @classmethod
+    @functools.lru_cache(maxsize=256)
     def infer_name_from_pytest_info_for(cls, pytest_info: str, element_to_find: ReportNamingElement):
-        """Uses the test info stored by pytest to infer a project, job or test name
+        """Uses the test info stored by pytest to infer a project, job or test name, the result is cached
 
         Args:
             pytest_info (str): the test info as stored by pytest
@@ -147,19 +245,19 @@ class ReportHelper:
                 # A driver can be initialized inside a test method, but also in a fixture method
                 # Therefore we want to look for all these methods when we try to infer project and job names
                 # (since project and job names are sent to the Agent upon driver creation)
-                for frame in inspect.stack().__reversed__():
-                    if frame.function.startswith("test") or frame.function in [
+                for frame in cls.__call_stack():
+                    if frame.co_name.startswith("test") or frame.co_name in [
                         "setUp",
                         "tearDown",
                         "setUpClass",
                         "tearDownClass",
                     ]:
                         if element_to_find == ReportNamingElement.Project:
-                            path_elements = os.path.normpath(frame.filename).split(os.sep)
+                            path_elements = os.path.normpath(frame.co_filename).split(os.sep)
                             # return the folder name containing the current test file as the project name
                             return str(path_elements[-2])
                         elif element_to_find == ReportNamingElement.Job:
-                            path_elements = os.path.normpath(frame.filename).split(os.sep)
+                            path_elements = os.path.normpath(frame.co_filename).split(os.sep)
                             # return the current test file name minus the .py extension as the job name
                             return str(path_elements[-1]).split(".py")[0]
                         else:
@@ -167,59 +265,151 @@ class ReportHelper:
             else:
                 # When inferring test names, we are only interested in those methods whose name
                 # actually starts with 'test', not in fixture methods
-                for frame in inspect.stack().__reversed__():
-                    if frame.function.startswith("test"):
+                for frame in cls.__call_stack():
+                    if frame.co_name.startswith("test"):
                         if element_to_find == ReportNamingElement.Test:
                             # return the current method name as the test name
-                            return frame.function
+                            return frame.co_name
                 return None
 
         else:
             # we're using neither pytest nor unittest, so return sensible values
-            inside_module = False
-
-            for frame in inspect.stack().__reversed__():
-                if inside_module:
-                    if element_to_find == ReportNamingElement.Test:
-                        return frame.function
-                    elif element_to_find == ReportNamingElement.Project:
-                        # in this case we can't infer a project name because there's no data
-                        return None
-                    elif element_to_find == ReportNamingElement.Job:
-                        path_elements = os.path.normpath(frame.filename).split(os.sep)
-                        # return the current test file name minus the .py extension as the job name
-                        return str(path_elements[-1]).split(".py")[0]
-                if str(frame.function) == "<module>":
-                    # we're entering the module, the next frame contains the info we're looking for
-                    inside_module = True
+            code = cls.__find_module_caller()
+            if code is None:
+                return None
+            if element_to_find == ReportNamingElement.Test:
+                return code.co_name
+            elif element_to_find == ReportNamingElement.Job:
+                path_elements = os.path.normpath(code.co_filename).split(os.sep)
+                # return the current test file name minus the .py extension as the job name
+                return str(path_elements[-1]).split(".py")[0]
+            # in this case we can't infer a project name because there's no data
+            return None
+
+    @classmethod
+    def __find_module_caller(cls):
+        """Finds the function called by the outermost module level code of the current thread, typically the test
+
+        The function found is remembered per thread. While it is running, the call stack is only walked until its
+        frame is reached. Threads without module level code in their call stack, such as the threads started by
+        the test, never get one, so they are not walked again.
+
+        Returns:
+            code: the code object of the function, None if the call stack holds no module level code
+        """
+        found = getattr(cls.__module_caller, "found", ())
+        if found is None:
+            return None
+        module_caller = None
+        caller = None
+        frame = sys._getframe(1)
+        while frame is not None:
+            if found and frame.f_code is found[0] and id(frame.f_back) == found[1]:
+                # The function found by a previous walk is still running
+                return found[0]
+            if frame.f_code.co_name == "<module>" and caller is not None:
+                # Keep going, the outermost module level code is the one running the tests
+                module_caller = (caller.f_code, id(frame))
+            caller = frame
+            frame = frame.f_back
+        cls.__module_caller.found = module_caller
+        return module_caller[0] if module_caller is not None else None
 
     @classmethod
     def __detect_unittest(cls) -> bool:
-        """Utility method that traverses the call stack and checks if unittest was invoked
+        """Utility method that traverses the call stack once per process and checks if unittest was invoked
 
         Returns:
             bool: True if unittest was found in the call stack, False otherwise
         """
-        for frame in inspect.stack().__reversed__():
-            if (
-                frame.function == "__init__"
-                and str(frame.filename).find("unittest") > 0
-                and str(frame.filename).find("main.py") > 0
-            ):
-                return True
-        return False
+        if cls.__unittest_detected is None:
+            cls.__unittest_detected = any(
+                frame.co_name == "__init__"
+                and str(frame.co_filename).find("unittest") > 0
+                and str(frame.co_filename).find("main.py") > 0
+                for frame in cls.__call_stack()
+            )
+            if cls.__unittest_detected:
+                cls.__install_unittest_hook()
+        return cls.__unittest_detected
 
     @classmethod
     def find_unittest_teardown(cls) -> bool:
-        """Utility method that traverses the call stack and checks if unittest was invoked
+        """Utility method that checks if a unittest tearDown or tearDownClass method is running
 
         Returns:
-            bool: True if unittest was found in the call stack, False otherwise
+            bool: True if a unittest tearDown or tearDownClass method is running, False otherwise
         """
         if not cls.__detect_unittest():
             return False
-        else:
-            for frame in inspect.stack().__reversed__():
-                if frame.function in ["tearDown", "tearDownClass"]:
-                    return True
+        if cls.__unittest_hooked:
+            # Outside of a test, the only class level fixture that can report commands is tearDownClass
+            return cls.__unittest_in_teardown or cls.__unittest_test_name is None
+        for frame in cls.__call_stack():
+            if frame.co_name in ["tearDown", "tearDownClass"]:
+                return True
         return False
+
+    @classmethod
+    def remove_unittest_hook(cls):
+        """Restores unittest.TestCase.run, called once the last driver quit
+
+        unittest is detected again, and the hook installed again, by the next driver.
+        """
+        if cls.__unittest_run is None:
+            return
+        # Leave the method alone if it was wrapped again by someone else in the meantime
+        if unittest.TestCase.run is cls.__unittest_tracked_run:
+            unittest.TestCase.run = cls.__unittest_run
+        cls.__unittest_run = None
+        cls.__unittest_tracked_run = None
+        cls.__unittest_hooked = False
+        cls.__unittest_test_name = None
+        cls.__unittest_detected = None
+
+    @classmethod
+    def __install_unittest_hook(cls):
+        """Wraps unittest.TestCase.run to keep track of the test method being run and of its tearDown method"""
+        run = unittest.TestCase.run
+
+        @functools.wraps(run)
+        def tracked_run(test, *args, **kwargs):
+            tear_down = test.tearDown
+
+            def tracked_tear_down():
+                cls.__unittest_in_teardown = True
+                try:
+                    tear_down()
+                finally:
+                    cls.__unittest_in_teardown = False
+
+            # The hook only takes over from the call stack once a test has started after it was installed
+            cls.__unittest_hooked = True
+            cls.__unittest_test_name = test._testMethodName
+            test.tearDown = tracked_tear_down
+            try:
+                return run(test, *args, **kwargs)
+            finally:
+                del test.tearDown
+                cls.__unittest_test_name = None
+
+        cls.__unittest_run = run
+        cls.__unittest_tracked_run = tracked_run
+        unittest.TestCase.run = tracked_run
+
+    @staticmethod
+    def __call_stack() -> list:
+        """Returns the code objects of the frames in the current call stack, outermost first
+
+        Unlike inspect.stack(), this does not read the source code of every frame.
+
+        Returns:
+            list: the code objects of the frames in the current call stack
+        """
+        frame = sys._getframe(1)
+        stack = []
+        while frame is not None:
+            stack.append(frame.f_code)
+            frame = frame.f_back
+        stack.reverse()
+        return stack
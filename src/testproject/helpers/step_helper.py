@@ -22,24 +22,39 @@ from src.testproject.enums import SleepTimingType, TakeScreenshotConditionType
 
 
 class StepHelper:
+    # Commands changing the session implicit wait when sent by the user
+    TIMEOUT_COMMANDS = (Command.SET_TIMEOUTS, Command.IMPLICIT_WAIT)
+
     def __init__(self, executor: RemoteConnection, w3c: bool, session_id: str):
         self.executor = executor
         self.w3c = w3c
         self.session_id = session_id
+        # Implicit wait last applied to the session by the step settings, None if unknown
+        self._applied_timeout = None
 
     def handle_timeout(self, timeout):
-        if timeout > 0:
+        """Applies the step settings timeout as the session implicit wait, unless it is already applied."""
+        if timeout > 0 and timeout != self._applied_timeout:
             logging.debug(f"Setting driver implicit wait to {timeout} milliseconds.")
             if self.w3c:
-                self.executor.execute(
+                response = self.executor.execute(
                     Command.SET_TIMEOUTS,
                     {"sessionId": self.session_id, "implicit": int(timeout)},
                 )
             else:
-                self.executor.execute(
+                response = self.executor.execute(
                     Command.IMPLICIT_WAIT,
                     {"sessionId": self.session_id, "ms": float(timeout)},
                 )
+            # Errors are returned by the remote connection as the response status
+            self._applied_timeout = timeout if response.get("status") in [None, 0] else None
+
+    def reset_timeout(self):
+        """Forgets the applied timeout, so the step settings timeout is sent again before the next command.
+
+        Called when the session implicit wait may have been changed outside of the step settings.
+        """
+        self._applied_timeout = None
 
     @staticmethod
     def handle_sleep(sleep_timing_type, sleep_time, command=None, step_executed=False):
@@ -0,0 +1,79 @@
+# Copyright 2021 TestProject (https://testproject.io)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""pytest plugin setting the test identity and result used by the SDK reports
+
+Registered through the pytest11 entry point, so it is loaded by pytest whenever the SDK is installed.
+The project, job and test names are set when a test is set up instead of being inferred for every driver command,
+and the test report sent to the Agent holds the actual test result.
+"""
+
+import pytest
+
+from src.testproject.enums import ReportNamingElement
+from src.testproject.helpers import ReportHelper
+from src.testproject.sdk.exceptions import SdkException
+from src.testproject.sdk.internal.session import SessionRegistry
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtest_setup(item):
+    """Sets the names of the test about to be run, before its fixtures create a driver"""
+    ReportHelper.set_current_test(
+        test=item.name,
+        project=ReportHelper.infer_name_from_pytest_info_for(item.nodeid, ReportNamingElement.Project),
+        job=ReportHelper.infer_name_from_pytest_info_for(item.nodeid, ReportNamingElement.Job),
+    )
+
+
+def pytest_runtest_logreport(report):
+    """Records the result of the test once its setup or call phase has completed"""
+    # Named after its node ID as in setup, since the names set in setup are not known where tests run remotely
+    test = report.nodeid.rsplit("::", 1)[-1]
+    if report.when == "setup" or report.when == "call":
+        if report.failed:
+            ReportHelper.set_test_result(test, passed=False, message=report.longreprtext)
+        elif report.when == "setup":
+            ReportHelper.set_test_result(test, passed=True)
+
+
+@pytest.hookimpl(trylast=True)
+def pytest_runtest_teardown(item):
+    """Reports the test using the driver still active after its fixtures were torn down"""
+    if not SessionRegistry.active():
+        # No driver is running, tests of pytest runs that do not use the SDK end here
+        ReportHelper.clear_current_test()
+        return
+
+    # Imported here, so loading the plugin does not load the drivers for pytest runs that do not use the SDK
+    from src.testproject.helpers.activesessionhelper import get_active_driver_instance
+
+    try:
+        driver = get_active_driver_instance()
+    except SdkException:
+        # The driver was quit by a fixture, which reported the test
+        driver = None
+
+    if driver is not None:
+        command_executor = driver.command_executor
+        if (
+            command_executor.test_name == ReportHelper.infer_test_name()
+            and not command_executor.disable_auto_test_reports
+        ):
+            command_executor.report_test()
+            # The test has been reported, the next one is reported when its first command is executed
+            command_executor.test_name = "Unnamed Test"
+
+    ReportHelper.clear_current_test()
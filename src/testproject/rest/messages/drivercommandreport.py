@@ -24,7 +24,7 @@ class DriverCommandReport:
         command_params (dict): Parameters associated with the command
         result (dict): The result of the command that was executed
         passed (bool): Indication whether or not command execution was performed successfully
-        screenshot (str): Screenshot as base64 encoded string
+        screenshot (str): Screenshot as base64 encoded string, or a ScreenshotHandle resolved to it when sent
         message (str): The message to include in the result
 
     Attributes:
@@ -32,7 +32,7 @@ class DriverCommandReport:
         _command_params (dict): Parameters associated with the command
         _result (dict): The result of the command that was executed
         _passed (bool): Indication whether or not command execution was performed successfully
-        _screenshot (str): Screenshot as base64 encoded string
+        _screenshot (str): Screenshot as base64 encoded string, or a ScreenshotHandle resolved to it when sent
         _message (str): The message to include in the result
     """
 
@@ -16,9 +16,11 @@ import logging
 import inspect
 
 from src.testproject.classes import ActionExecutionResponse
+from src.testproject.classes.tracer import Tracer
 from src.testproject.enums import ExecutionResultType
 from src.testproject.helpers import SeleniumHelper
 from src.testproject.sdk.internal.agent import AgentClient
+from src.testproject.sdk.internal.session import SessionRegistry
 from selenium.webdriver.common.by import By
 from src.testproject.sdk.drivers.actions.action_guids import actions
 
@@ -68,7 +70,15 @@ class Actions:
             else:
                 logging.error(f"Failure in creating search criteria from locator strategy {by} with value {by_value}")
 
-        response = self._agent_client.send_action_execution_request(action_guid, body)
+        # Execute the action once the screenshots of the previous steps have been captured
+        command_executor = self.__command_executor()
+        if command_executor is not None:
+            command_executor.wait_for_screenshots()
+        with Tracer.span(action_guid, "action"):
+            response = self._agent_client.send_action_execution_request(action_guid, body)
+        if command_executor is not None:
+            # Actions run on the Agent and may change the session implicit wait
+            command_executor.step_helper.reset_timeout()
         if response.executionresulttype == ExecutionResultType.Failed:
             logging.warning(
                 f"Failed to execute action '{inspect.stack()[1].function}', "
@@ -76,6 +86,18 @@ class Actions:
             )
         return response
 
+    def __command_executor(self):
+        """Returns the command executor of the driver sharing the Agent client of these actions
+
+        Returns:
+            ReportingCommandExecutor: the command executor of the driver, None if the driver quit
+        """
+        for driver in SessionRegistry.active():
+            command_executor = getattr(driver, "command_executor", None)
+            if getattr(command_executor, "agent_client", None) is self._agent_client:
+                return command_executor
+        return None
+
     def pause(self, milliseconds: int) -> bool:
         """Pause test execution for the specified duration
 
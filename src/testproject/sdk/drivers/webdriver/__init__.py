@@ -5,5 +5,6 @@ from .safari import Safari
 from .ie import Ie
 from .remote import Remote
 from .generic import Generic
+from .driver_future import DriverFuture, DriverPool
 
-__all__ = ["Chrome", "Firefox", "Edge", "Safari", "Ie", "Remote", "Generic"]
+__all__ = ["Chrome", "Firefox", "Edge", "Safari", "Ie", "Remote", "Generic", "DriverFuture", "DriverPool"]
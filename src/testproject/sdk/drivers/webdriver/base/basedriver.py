@@ -18,6 +18,7 @@ import os
 from selenium.webdriver.remote.webdriver import WebDriver as RemoteWebDriver
 
 from src.testproject.classes import StepSettings
+from src.testproject.classes.tracer import Tracer
 from src.testproject.enums import EnvironmentVariable
 from src.testproject.enums.report_type import ReportType
 from src.testproject.helpers import (
@@ -31,7 +32,7 @@ from src.testproject.sdk.exceptions import SdkException
 from src.testproject.sdk.internal.agent import AgentClient
 from src.testproject.sdk.internal.helpers import CustomCommandExecutor
 from src.testproject.sdk.internal.reporter import Reporter
-from src.testproject.sdk.internal.session import AgentSession
+from src.testproject.sdk.internal.session import AgentSession, SessionRegistry
 
 
 class BaseDriver(RemoteWebDriver):
@@ -55,8 +56,6 @@ class BaseDriver(RemoteWebDriver):
         session_id (str): contains the current session ID
     """
 
-    __instance = None
-
     def __init__(
         self,
         capabilities: dict,
@@ -71,10 +70,15 @@ class BaseDriver(RemoteWebDriver):
         socket_session_timeout: int,
     ):
 
-        if BaseDriver.__instance is not None:
-            raise SdkException("A driver session already exists")
+        if SessionRegistry.bound(BaseDriver) is not None:
+            raise SdkException("A driver session already exists in this thread")
 
         LoggingHelper.configure_logging()
+
+        # Record the SDK activity as a timeline, written when the driver quits
+        if ConfigHelper.get_trace_file() is not None:
+            Tracer.start()
+
         env_token = ConfigHelper.get_developer_token()
         if env_token is not None:
             if token is not None:
@@ -137,12 +141,12 @@ class BaseDriver(RemoteWebDriver):
             desired_capabilities=self._agent_session.capabilities,
         )
 
-        BaseDriver.__instance = self
+        SessionRegistry.register(self)
 
     @classmethod
     def instance(cls):
-        """Returns the singleton instance of the driver object"""
-        return cls.__instance
+        """Returns the driver instance used by the current thread"""
+        return SessionRegistry.current(BaseDriver)
 
     @property
     def step_settings(self):
@@ -185,20 +189,34 @@ class BaseDriver(RemoteWebDriver):
         self._agent_client.update_job_name(job_name=job_name)
 
     def quit(self):
-        """Quits the driver and stops the session with the Agent, cleaning up after itself"""
+        """Quits the driver and stops the session with the Agent, cleaning up after itself.
+
+        Returns:
+            ReportsFlush: completed once the reports of the driver are delivered, which happens in the background
+                if TP_ASYNC_REPORTS_FLUSH is enabled
+        """
         # Report any left over driver command reports
         self.command_executor.clear_stash()
 
         # Make instance available again
-        BaseDriver.__instance = None
+        SessionRegistry.unregister(self)
 
         try:
             RemoteWebDriver.quit(self)
         except Exception:
             pass
 
-        # Stop the Agent client
-        self.command_executor.agent_client.stop()
+        # Leave unittest as it was once the last driver quit, the quit command above infers the test name again
+        if not SessionRegistry.active():
+            ReportHelper.remove_unittest_hook()
+
+        # Stop the Agent client, the remaining reports may still be sent in the background
+        reports_flush = self.command_executor.agent_client.stop()
+
+        # Write the timeline, reports still being sent in the background are left out
+        trace_file = ConfigHelper.get_trace_file()
+        if trace_file is not None:
+            Tracer.write(trace_file)
 
         # Clean up any environment variables set in the decorator
         for env_var in [
@@ -207,3 +225,5 @@ class BaseDriver(RemoteWebDriver):
             EnvironmentVariable.TP_JOB_NAME,
         ]:
             EnvironmentVariable.remove(env_var)
+
+        return reports_flush
@@ -0,0 +1,161 @@
+# Copyright 2021 TestProject (https://testproject.io)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import collections
+import logging
+import os
+import threading
+
+from src.testproject.enums import EnvironmentVariable
+from src.testproject.helpers import ReportHelper
+from src.testproject.sdk.exceptions import SdkException
+from src.testproject.sdk.internal.agent.agent_client_singleton import AgentClientSingleton
+from src.testproject.sdk.internal.session import SessionRegistry
+
+
+class DriverFuture:
+    """Creates a driver on a background thread, starting its Agent session while the caller goes on with other work.
+
+    Starting the session, validating the development socket and launching the browser all happen in the
+    background. The project and job names are inferred on the calling thread, as they would be by the driver.
+    The background thread ends once the driver is created, so the driver does not share its reports queue and
+    development socket with later drivers: they are released when the driver quits.
+
+    Args:
+        driver_class (type): The driver to create, such as webdriver.Chrome or webdriver.Remote
+        kwargs: The arguments of the driver constructor
+
+    Examples:
+        future = DriverFuture(webdriver.Chrome, chrome_options=options)
+        # Other test setup...
+        driver = future.result()
+    """
+
+    def __init__(self, driver_class: type, **kwargs):
+        if not kwargs.get("disable_reports", False):
+            if kwargs.get("project_name") is None:
+                kwargs["project_name"] = ReportHelper.infer_project_name()
+            if not kwargs.get("job_name"):
+                kwargs["job_name"] = ReportHelper.infer_job_name()
+                # Can update job name at runtime if not specified.
+                os.environ[EnvironmentVariable.TP_UPDATE_JOB_NAME.value] = "True"
+        self._driver_class = driver_class
+        self._kwargs = kwargs
+        self._driver = None
+        self._error = None
+        self._done = threading.Event()
+        threading.Thread(target=self.__create, name=f"{driver_class.__name__}-session", daemon=True).start()
+
+    def __create(self):
+        try:
+            self._driver = self._driver_class(**self._kwargs)
+        except BaseException as e:
+            self._error = e
+        finally:
+            # No other driver is created on this thread, Agent clients left by a failed driver are released now
+            AgentClientSingleton.detach_thread_instances(release=self._error is not None)
+            self._done.set()
+
+    def done(self) -> bool:
+        """Returns True if the driver was created or failed to be created, False otherwise"""
+        return self._done.is_set()
+
+    def result(self, timeout: float = None):
+        """Waits for the driver to be created and binds it to the calling thread
+
+        Args:
+            timeout (float): Maximum number of seconds to wait, None waits until the driver is created
+
+        Returns:
+            The created driver
+
+        Raises:
+            SdkException: if the driver is not created within the timeout, or the thread already has a driver
+            Any exception raised by the driver constructor
+        """
+        driver = self._wait(timeout)
+        bound_driver = SessionRegistry.bound(object)
+        if bound_driver is not None and bound_driver is not driver:
+            raise SdkException("A driver session already exists in this thread")
+        SessionRegistry.bind(driver)
+        return driver
+
+    def _wait(self, timeout: float = None):
+        """Waits for the driver to be created, without binding it to the calling thread"""
+        if not self._done.wait(timeout):
+            raise SdkException(f"{self._driver_class.__name__} driver was not created within {timeout} seconds")
+        if self._error is not None:
+            raise self._error
+        return self._driver
+
+
+class DriverPool:
+    """Keeps a number of drivers with started sessions ready, so that taking one does not wait for a session to start.
+
+    Each driver taken from the pool is replaced by a new one started in the background.
+    Drivers that were never taken are quit when the pool is closed.
+
+    Args:
+        driver_class (type): The driver to create, such as webdriver.Chrome or webdriver.Remote
+        size (int): The number of drivers kept ready
+        kwargs: The arguments of the driver constructor
+
+    Examples:
+        with DriverPool(webdriver.Chrome, size=2) as pool:
+            driver = pool.acquire()
+            # Test code...
+            driver.quit()
+    """
+
+    def __init__(self, driver_class: type, size: int, **kwargs):
+        if size < 1:
+            raise SdkException(f"Invalid driver pool size {size}, at least one driver must be kept ready")
+        self._driver_class = driver_class
+        self._kwargs = kwargs
+        self._closed = False
+        self._lock = threading.Lock()
+        self._futures = collections.deque(DriverFuture(driver_class, **kwargs) for _ in range(size))
+
+    def acquire(self, timeout: float = None):
+        """Takes the driver that was started first out of the pool and starts a new one in its place
+
+        Args:
+            timeout (float): Maximum number of seconds to wait for the driver, None waits until it is created
+
+        Returns:
+            A driver with a started session, bound to the calling thread
+        """
+        with self._lock:
+            if self._closed:
+                raise SdkException("Driver pool is closed")
+            future = self._futures.popleft()
+            self._futures.append(DriverFuture(self._driver_class, **self._kwargs))
+        return future.result(timeout)
+
+    def close(self):
+        """Quits the drivers that were not taken from the pool"""
+        with self._lock:
+            self._closed = True
+            futures, self._futures = list(self._futures), collections.deque()
+        for future in futures:
+            try:
+                future._wait().quit()
+            except Exception as e:
+                logging.warning(f"Failed to quit pooled {self._driver_class.__name__} driver: {e}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
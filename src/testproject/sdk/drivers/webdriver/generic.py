@@ -17,6 +17,7 @@ import os
 
 from packaging import version
 
+from src.testproject.classes.tracer import Tracer
 from src.testproject.enums import EnvironmentVariable
 from src.testproject.enums.report_type import ReportType
 from src.testproject.helpers import (
@@ -31,7 +32,7 @@ from src.testproject.sdk.exceptions import SdkException, AgentConnectException
 from src.testproject.sdk.internal.agent import AgentClient
 from src.testproject.sdk.internal.helpers import GenericCommandExecutor
 from src.testproject.sdk.internal.reporter import Reporter
-from src.testproject.sdk.internal.session import AgentSession
+from src.testproject.sdk.internal.session import AgentSession, SessionRegistry
 
 
 class Generic:
@@ -46,8 +47,6 @@ class Generic:
         socket_session_timeout (int): The connection timeout to the agent in milliseconds.
     """
 
-    __instance = None
-
     MIN_GENERIC_DRIVER_SUPPORTED_VERSION = "0.64.40"
 
     def __init__(
@@ -62,11 +61,15 @@ class Generic:
         report_path: str = None,
         socket_session_timeout: int = AgentClient.NEW_SESSION_SOCKET_TIMEOUT_MS,
     ):
-        if Generic.__instance is not None:
-            raise SdkException("A driver session already exists")
+        if SessionRegistry.bound(Generic) is not None:
+            raise SdkException("A driver session already exists in this thread")
 
         LoggingHelper.configure_logging()
 
+        # Record the SDK activity as a timeline, written when the driver quits
+        if ConfigHelper.get_trace_file() is not None:
+            Tracer.start()
+
         env_token = ConfigHelper.get_developer_token()
         if env_token is not None and token is not None:
             logging.info("Using token from environment variable...")
@@ -114,12 +117,12 @@ class Generic:
 
         self.command_executor = GenericCommandExecutor(agent_client=self._agent_client)
 
-        Generic.__instance = self
+        SessionRegistry.register(self)
 
     @classmethod
     def instance(cls):
-        """Returns the singleton instance of the driver object"""
-        return Generic.__instance
+        """Returns the driver instance used by the current thread"""
+        return SessionRegistry.current(Generic)
 
     def start_session(self, capabilities, browser_profile=None):
         """Sets capabilities and sessionId obtained from the Agent when creating the original session."""
@@ -147,7 +150,12 @@ class Generic:
         self._agent_client.update_job_name(job_name=job_name)
 
     def quit(self):
-        """Quits the driver and stops the session with the Agent, cleaning up after itself."""
+        """Quits the driver and stops the session with the Agent, cleaning up after itself.
+
+        Returns:
+            ReportsFlush: completed once the reports of the driver are delivered, which happens in the background
+                if TP_ASYNC_REPORTS_FLUSH is enabled
+        """
         # Report any left over driver command reports
         self.command_executor.clear_stash()
 
@@ -155,10 +163,18 @@ class Generic:
         self.command_executor.report_test()
 
         # Make instance available again
-        Generic.__instance = None
+        SessionRegistry.unregister(self)
+        if not SessionRegistry.active():
+            # Leave unittest as it was once the last driver quit
+            ReportHelper.remove_unittest_hook()
+
+        # Stop the Agent client, the remaining reports may still be sent in the background
+        reports_flush = self.command_executor.agent_client.stop()
 
-        # Stop the Agent client
-        self.command_executor.agent_client.stop()
+        # Write the timeline, reports still being sent in the background are left out
+        trace_file = ConfigHelper.get_trace_file()
+        if trace_file is not None:
+            Tracer.write(trace_file)
 
         # Clean up any environment variables set in the decorator
         for env_var in [
@@ -167,3 +183,5 @@ class Generic:
             EnvironmentVariable.TP_JOB_NAME,
         ]:
             EnvironmentVariable.remove(env_var)
+
+        return reports_flush
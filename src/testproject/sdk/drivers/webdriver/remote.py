@@ -18,6 +18,7 @@ import os
 from appium.webdriver.webdriver import WebDriver as AppiumWebDriver
 
 from src.testproject.classes import StepSettings
+from src.testproject.classes.tracer import Tracer
 from src.testproject.enums import EnvironmentVariable
 from src.testproject.enums.report_type import ReportType
 from src.testproject.helpers import (
@@ -31,7 +32,7 @@ from src.testproject.sdk.exceptions import SdkException
 from src.testproject.sdk.internal.agent import AgentClient
 from src.testproject.sdk.internal.helpers import CustomAppiumCommandExecutor
 from src.testproject.sdk.internal.reporter import Reporter
-from src.testproject.sdk.internal.session import AgentSession
+from src.testproject.sdk.internal.session import AgentSession, SessionRegistry
 
 
 class Remote(AppiumWebDriver):
@@ -54,8 +55,6 @@ class Remote(AppiumWebDriver):
         session_id (str): contains the current session ID
     """
 
-    __instance = None
-
     def __init__(
         self,
         desired_capabilities: dict = None,
@@ -69,11 +68,15 @@ class Remote(AppiumWebDriver):
         report_path: str = None,
         socket_session_timeout: int = AgentClient.NEW_SESSION_SOCKET_TIMEOUT_MS,
     ):
-        if Remote.__instance is not None:
-            raise SdkException("A driver session already exists")
+        if SessionRegistry.bound(Remote) is not None:
+            raise SdkException("A driver session already exists in this thread")
 
         LoggingHelper.configure_logging()
 
+        # Record the SDK activity as a timeline, written when the driver quits
+        if ConfigHelper.get_trace_file() is not None:
+            Tracer.start()
+
         self._desired_capabilities = desired_capabilities
 
         env_token = ConfigHelper.get_developer_token()
@@ -128,12 +131,12 @@ class Remote(AppiumWebDriver):
             self.command_executor.disable_command_reports = True
             self.command_executor.disable_auto_test_reports = True
 
-        Remote.__instance = self
+        SessionRegistry.register(self)
 
     @classmethod
     def instance(cls):
-        """Returns the singleton instance of the driver object"""
-        return Remote.__instance
+        """Returns the driver instance used by the current thread"""
+        return SessionRegistry.current(Remote)
 
     @property
     def step_settings(self):
@@ -172,20 +175,34 @@ class Remote(AppiumWebDriver):
         self._agent_client.update_job_name(job_name=job_name)
 
     def quit(self):
-        """Quits the driver and stops the session with the Agent, cleaning up after itself."""
+        """Quits the driver and stops the session with the Agent, cleaning up after itself.
+
+        Returns:
+            ReportsFlush: completed once the reports of the driver are delivered, which happens in the background
+                if TP_ASYNC_REPORTS_FLUSH is enabled
+        """
         # Report any left over driver command reports
         self.command_executor.clear_stash()
 
         # Make instance available again
-        Remote.__instance = None
+        SessionRegistry.unregister(self)
 
         try:
             AppiumWebDriver.quit(self)
         except Exception:
             pass
 
-        # Stop the Agent client
-        self.command_executor.agent_client.stop()
+        # Leave unittest as it was once the last driver quit, the quit command above infers the test name again
+        if not SessionRegistry.active():
+            ReportHelper.remove_unittest_hook()
+
+        # Stop the Agent client, the remaining reports may still be sent in the background
+        reports_flush = self.command_executor.agent_client.stop()
+
+        # Write the timeline, reports still being sent in the background are left out
+        trace_file = ConfigHelper.get_trace_file()
+        if trace_file is not None:
+            Tracer.write(trace_file)
 
         # Clean up any environment variables set in the decorator
         for env_var in [
@@ -194,3 +211,5 @@ class Remote(AppiumWebDriver):
             EnvironmentVariable.TP_JOB_NAME,
         ]:
             EnvironmentVariable.remove(env_var)
+
+        return reports_flush
@@ -12,7 +12,9 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import atexit
 import logging
+import threading
 import uuid
 
 from distutils.util import strtobool
@@ -49,6 +51,9 @@ from src.testproject.sdk.exceptions import (
 )
 from src.testproject.sdk.exceptions.addonnotinstalled import AddonNotInstalledException
 from src.testproject.sdk.internal.agent.agent_client_singleton import AgentClientSingleton
+from src.testproject.sdk.internal.agent.pooled_session import create_pooled_session
+from src.testproject.sdk.internal.agent.report_compressor import ReportCompressor
+from src.testproject.sdk.internal.agent.reports_flush import ReportsFlush
 from src.testproject.sdk.internal.agent.reports_queue import ReportsQueue
 from src.testproject.sdk.internal.agent.reports_queue_batch import ReportsQueueBatch
 from src.testproject.sdk.internal.session import AgentSession
@@ -73,6 +78,8 @@ class AgentClient(metaclass=AgentClientSingleton):
         _token (str): The development token used to authenticate with the Agent
         _report_settings (ReportSettings): Settings (project name, job name) to be included in the report
         _queue (queue.Queue): queue holding reports to be sent to Agent in separate thread
+        _socket_manager (SocketManager): manages the development socket connection of the session
+        _detached (bool): True if the thread that created the client ended, no later driver can reuse it then
     """
 
     # Minimum Agent version number that supports session reuse
@@ -87,9 +94,22 @@ class AgentClient(metaclass=AgentClientSingleton):
     # New Session HTTP connection request timeout in milliseconds.
     NEW_SESSION_SOCKET_TIMEOUT_MS = 120 * 1000
 
+    # Default HTTP request timeouts to the Agent in seconds, per method (None waits indefinitely).
+    # Can be overridden in milliseconds using the TP_AGENT_<METHOD>_TIMEOUT environment variables.
+    REQUEST_TIMEOUTS = {"GET": 30, "POST": None, "PUT": 30, "DELETE": 30}
+
     # Class variable containing the current known Agent version
     __agent_version: str = None
 
+    # Keep-alive connection pool shared by all requests sent to the Agent
+    __http_session = None
+    __http_session_lock = threading.Lock()
+
+    # Reports queues kept running after their driver quit, for the next driver of the same thread to reuse.
+    # They are stopped when the process exits, delivering the reports left.
+    __idle_queues = set()
+    __idle_queues_lock = threading.Lock()
+
     def __init__(
         self,
         token: str,
@@ -108,6 +128,7 @@ class AgentClient(metaclass=AgentClientSingleton):
         self._capabilities = capabilities
         self._token = token
         self._session_socket_timeout = socket_session_timeout
+        self._detached = False
         # Attempt to start the session
         self.__start_session()
         # Make sure local reports are supported
@@ -115,9 +136,16 @@ class AgentClient(metaclass=AgentClientSingleton):
         # Create reports queue
         if version.parse(self.__agent_version) >= version.parse(self.MIN_BATCH_REPORT_SUPPORTED_VERSION):
             url = urljoin(self._remote_address, Endpoint.ReportBatch.value)
-            self._reports_queue = ReportsQueueBatch(token=token, url=url)
+            self._reports_queue = ReportsQueueBatch(
+                token=token, url=url, compressor=self.__create_report_compressor(), agent_url=self._remote_address
+            )
         else:
-            self._reports_queue = ReportsQueue(token)
+            self._reports_queue = ReportsQueue(
+                token, compressor=self.__create_report_compressor(), agent_url=self._remote_address
+            )
+        # Send the reports previous runs failed to deliver before the Agent was stopped or became unreachable
+        self._reports_queue.replay_journals()
+        self.__start_heartbeat()
 
     @property
     def agent_session(self):
@@ -129,6 +157,11 @@ class AgentClient(metaclass=AgentClientSingleton):
         """Getter for the ReportSettings object"""
         return self._report_settings
 
+    @property
+    def socket_manager(self) -> SocketManager:
+        """Getter for the development socket manager of the session"""
+        return self._socket_manager
+
     def __verify_local_reports_supported(self, report_type: ReportType):
         """Verify that target Agent supports local reports, otherwise throw an exception.
 
@@ -179,7 +212,9 @@ class AgentClient(metaclass=AgentClientSingleton):
             self._agent_response.capabilities,
         )
 
-        SocketManager.instance().open_socket(
+        # Keep the socket manager of the thread starting the session, the socket must outlive it
+        self._socket_manager = SocketManager.instance()
+        self._socket_manager.open_socket(
             urlparse(self._remote_address).hostname,
             self._agent_response.dev_socket_port,
             self._agent_response.uuid,
@@ -187,6 +222,20 @@ class AgentClient(metaclass=AgentClientSingleton):
 
         logging.info("Development session started...")
 
+    def __start_heartbeat(self):
+        """Checks the development socket in the background if TP_AGENT_HEARTBEAT_INTERVAL_MS is set"""
+        interval = ConfigHelper.get_agent_heartbeat_interval()
+        if interval > 0:
+            self._socket_manager.start_heartbeat(interval, self.__on_agent_disconnected)
+
+    def __on_agent_disconnected(self):
+        """Parks reports while the Agent is disconnected, instead of letting each delivery time out.
+
+        The reports queue probes the Agent again once the circuit reset timeout passed, and resumes sending reports
+        as soon as it is reachable. The next driver session connects the development socket again.
+        """
+        self._reports_queue.retry_policy.open_circuit("Agent closed the development socket")
+
     def log_warnings(self):
         """Log various warnings which might be returned from the agent"""
         if self._agent_response.warnings is not None:
@@ -276,19 +325,17 @@ class AgentClient(metaclass=AgentClientSingleton):
         Returns:
             OperationResult: contains result of the sent request
         """
-        with requests.Session() as session:
-            if params:
-                session.params = params
-            if method == "GET":
-                response = session.get(path, headers={"Authorization": self._token})
-            elif method == "POST":
-                response = session.post(path, headers={"Authorization": self._token}, json=body, timeout=timeout)
-            elif method == "DELETE":
-                response = session.delete(path, headers={"Authorization": self._token})
-            elif method == "PUT":
-                response = session.put(path, headers={"Authorization": self._token}, json=body)
-            else:
-                raise SdkException(f"Unsupported HTTP method {method} in send_request()")
+        if method not in self.REQUEST_TIMEOUTS:
+            raise SdkException(f"Unsupported HTTP method {method} in send_request()")
+
+        response = self.http_session().request(
+            method,
+            path,
+            headers={"Authorization": self._token},
+            json=body,
+            params=params,
+            timeout=timeout / 1000.0 if timeout is not None else self.request_timeout(method),
+        )
 
         response_json = {}
         # For some successful calls, the response body will be empty
@@ -341,6 +388,31 @@ class AgentClient(metaclass=AgentClientSingleton):
 
         return ActionExecutionResponse(result, response.message, result_data)
 
+    @classmethod
+    def http_session(cls) -> requests.Session:
+        """Returns the keep-alive connection pool used to communicate with the Agent, creating it on first use
+
+        Returns:
+            requests.Session: session shared by all requests sent to the Agent
+        """
+        if cls.__http_session is None:
+            with cls.__http_session_lock:
+                if cls.__http_session is None:
+                    cls.__http_session = create_pooled_session(ConfigHelper.get_agent_http_pool_size())
+        return cls.__http_session
+
+    @classmethod
+    def request_timeout(cls, method: str) -> float:
+        """Returns the timeout to apply to HTTP requests of the given method sent to the Agent
+
+        Args:
+            method (str): HTTP method (GET, POST, ...)
+
+        Returns:
+            float: the request timeout in seconds, or None to wait indefinitely
+        """
+        return ConfigHelper.get_agent_request_timeout(method, cls.REQUEST_TIMEOUTS.get(method))
+
     @staticmethod
     def get_agent_version(token: str):
         """Requests the current Agent status
@@ -352,11 +424,11 @@ class AgentClient(metaclass=AgentClientSingleton):
             AgentStatusResponse: contains the response to the sent Agent status request
         """
 
-        with requests.Session() as session:
-            response = session.get(
-                urljoin(ConfigHelper.get_agent_service_address(), Endpoint.GetStatus.value),
-                headers={"Authorization": token},
-            )
+        response = AgentClient.http_session().get(
+            urljoin(ConfigHelper.get_agent_service_address(), Endpoint.GetStatus.value),
+            headers={"Authorization": token},
+            timeout=AgentClient.request_timeout("GET"),
+        )
 
         try:
             response.raise_for_status()
@@ -386,6 +458,7 @@ class AgentClient(metaclass=AgentClientSingleton):
             report_as_json=driver_command_report.to_json(),
             url=urljoin(self._remote_address, Endpoint.ReportDriverCommand.value),
             block=False,
+            ordering_key=self.__reports_ordering_key(),
         )
 
     def report_step(self, step_report: StepReport):
@@ -399,6 +472,7 @@ class AgentClient(metaclass=AgentClientSingleton):
             report_as_json=step_report.to_json(),
             url=urljoin(self._remote_address, Endpoint.ReportStep.value),
             block=False,
+            ordering_key=self.__reports_ordering_key(),
         )
 
     def report_test(self, test_report: CustomTestReport):
@@ -412,8 +486,21 @@ class AgentClient(metaclass=AgentClientSingleton):
             report_as_json=test_report.to_json(),
             url=urljoin(self._remote_address, Endpoint.ReportTest.value),
             block=False,
+            ordering_key=self.__reports_ordering_key(),
         )
 
+    def __reports_ordering_key(self) -> str:
+        """Returns the key of the reports of the current driver session, which are always sent in order
+
+        The Agent attributes command and step reports to the test reported after them, so the reports of a session
+        can never be reordered. Reports of the previous session of a reused reports queue, and reports replayed from
+        previous runs, are sent concurrently with them when TP_REPORTS_QUEUE_WORKERS is greater than 1.
+
+        Returns:
+            str: the development session identifier
+        """
+        return self._agent_response.session_id if self._agent_response is not None else None
+
     def execute_proxy(self, action: ActionProxy) -> AddonExecutionResponse:
         """Sends a custom action to the Agent
         Args:
@@ -501,13 +588,124 @@ class AgentClient(metaclass=AgentClientSingleton):
     def __check_local_execution(self):
         """Helper method which validates if the remote address supplied is local"""
         valid_hosts = ["127.0.0.1", "localhost", "0.0.0.0"]
-        if urlparse(self._remote_address).hostname in valid_hosts:
-            self._is_local_execution = True
+        self._is_local_execution = urlparse(self._remote_address).hostname in valid_hosts
+
+    def __create_report_compressor(self) -> ReportCompressor:
+        """Creates the compressor applied to reports, if compression was enabled using TP_REPORTS_COMPRESSION
+
+        The Agent does not advertise support for compressed reports, so they are only sent when opted in.
 
-    def stop(self):
-        self._reports_queue.stop()
+        Returns:
+            ReportCompressor: the compressor to use, None if reports should be sent uncompressed
+        """
+        compression = ConfigHelper.get_reports_compression()
+        if compression == "none" or (compression == "auto" and self._is_local_execution):
+            # Compressing reports sent over the loopback interface only costs CPU time
+            return None
+        encoding = "gzip" if compression == "auto" else compression
+        return ReportCompressor(encoding=encoding, level=ConfigHelper.get_reports_compression_level())
+
+    def can_reuse(self, token: str, agent_url: str, report_settings: ReportSettings) -> bool:
+        """Determine whether a new driver can reuse the reports queue and development socket of this client
+
+        Args:
+            token (str): The development token of the new driver
+            agent_url (str): The Agent address of the new driver
+            report_settings (ReportSettings): Settings (project name, job name) of the new driver
+
+        Returns:
+            bool: True if the Agent session is shared with the new driver, False otherwise
+        """
+        return (
+            self._reports_queue.running
+            and self.can_reuse_session()
+            and report_settings is not None
+            and report_settings == self._report_settings
+            and token == self._token
+            and agent_url == self.agent_url
+        )
+
+    def reuse(self, capabilities: dict, socket_session_timeout: int):
+        """Starts the driver session of a new driver, keeping the reports queue and the development socket.
+
+        Reports of the previous driver that were not delivered yet are sent in the background, ahead of the new ones.
+
+        Args:
+            capabilities (dict): Additional options to be applied to the new driver instance
+            socket_session_timeout (int): The connection timeout to the agent in milliseconds.
+        """
+        with AgentClient.__idle_queues_lock:
+            AgentClient.__idle_queues.discard(self._reports_queue)
+        self._capabilities = capabilities
+        self._session_socket_timeout = socket_session_timeout
+        self.__start_session()
+        self.__start_heartbeat()
+
+    def stop(self) -> ReportsFlush:
+        """Sends the remaining reports once the driver quit.
+
+        If the Agent supports session reuse, the reports queue keeps running for the next driver, otherwise it
+        is stopped. The reports queue and the socket of a detached client are released instead. Unless
+        TP_ASYNC_REPORTS_FLUSH is enabled, waits until the reports are delivered.
+
+        Returns:
+            ReportsFlush: completed once the remaining reports are delivered
+        """
+        wait = not ConfigHelper.get_async_reports_flush()
+        if self._detached:
+            # No driver can reuse the reports queue and the socket, release them instead of keeping them idle
+            if wait:
+                self.release()
+                reports_flush = ReportsFlush.completed()
+            else:
+                reports_flush = ReportsFlush.run(self.release)
+        elif self.can_reuse_session():
+            reports_flush = self._reports_queue.flush_async()
+            with AgentClient.__idle_queues_lock:
+                AgentClient.__idle_queues.add(self._reports_queue)
+            if wait and not reports_flush.wait(self._reports_queue.REPORTS_QUEUE_TIMEOUT):
+                # Journal whatever could not be sent within the flush timeout
+                with AgentClient.__idle_queues_lock:
+                    AgentClient.__idle_queues.discard(self._reports_queue)
+                self._reports_queue.stop(timeout=0)
+        elif wait:
+            self._reports_queue.stop()
+            reports_flush = ReportsFlush.completed()
+        else:
+            reports_flush = ReportsFlush.run(self._reports_queue.stop)
         if self._agent_response and self._agent_response.local_report and self._is_local_execution:
             logging.info(f"Execution Report: {self._agent_response.local_report}")
+        return reports_flush
+
+    def shutdown(self):
+        """Stops the reports queue, if it was kept running for reuse"""
+        with AgentClient.__idle_queues_lock:
+            AgentClient.__idle_queues.discard(self._reports_queue)
+        if self._reports_queue.running:
+            self._reports_queue.stop()
+
+    def detach(self):
+        """Marks the client as detached from the thread that created it, once that thread ended.
+
+        No later driver can reuse the client, so its reports queue and socket are released when the driver quits.
+        """
+        self._detached = True
+
+    def release(self):
+        """Stops the reports queue and closes the development socket"""
+        self.shutdown()
+        self._socket_manager.close_socket()
+
+    @classmethod
+    def _stop_idle_queues(cls):
+        """Stops the reports queues kept running for reuse, called when the process exits"""
+        with cls.__idle_queues_lock:
+            queues, cls.__idle_queues = list(cls.__idle_queues), set()
+        for reports_queue in queues:
+            reports_queue.stop()
+
+
+atexit.register(AgentClient._stop_idle_queues)
 
 
 @unique
@@ -12,7 +12,8 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from src.testproject.tcp import SocketManager
+import logging
+import threading
 
 
 class AgentClientSingleton(type):
@@ -21,30 +22,59 @@ class AgentClientSingleton(type):
     This class returns the instance of the AgentClient if it exists, as well as creates it if it does not,
     it also checks if the agent dev session should be reused before returning the instance, for aggregating
     test reports which use the same ReportSettings (Job and Project name).
+    Instances are kept per thread, so that drivers created by different threads each get their own AgentClient.
     """
 
-    _instances = {}
+    _local = threading.local()
 
     def __call__(cls, *args, **kwargs):
-        if cls not in cls._instances:
+        if not hasattr(AgentClientSingleton._local, "instances"):
+            AgentClientSingleton._local.instances = {}
+        instances = AgentClientSingleton._local.instances
+
+        if cls not in instances:
             # Create an instance of it does not exist
-            cls._instances[cls] = super(AgentClientSingleton, cls).__call__(*args, **kwargs)
+            instances[cls] = super(AgentClientSingleton, cls).__call__(*args, **kwargs)
         else:
             # An instance already exists, check if it has the same designated Job and Project name
             input_settings = kwargs["report_settings"]
-            instance = cls._instances[cls]
+            instance = instances[cls]
             report_settings = instance.report_settings
 
             same_settings = True if input_settings is not None and input_settings == report_settings else False
 
-            # Stop the current instance, and submit the reports to the reports Queue
-            instance.stop()
+            if instance.can_reuse(kwargs["token"], kwargs["agent_url"], input_settings):
+                # Keep the reports queue and the socket, reports of the previous driver are sent in the background
+                instance.reuse(kwargs["capabilities"], kwargs["socket_session_timeout"])
+            else:
+                # Stop the current instance, and submit the reports to the reports Queue
+                instance.shutdown()
+
+                if not same_settings or not instance.can_reuse_session():
+                    # Close the socket, as the settings are not the same hence different reports need to be generated
+                    instance.socket_manager.close_socket()
+
+                # Init the instance to start the new Test
+                instance.__init__(*args, **kwargs)
+
+        return instances[cls]
 
-            if not same_settings or not instance.can_reuse_session():
-                # Close the socket, as the settings are not the same hence different reports need to be generated
-                SocketManager.instance().close_socket()
+    @staticmethod
+    def detach_thread_instances(release: bool = False):
+        """Removes the instances of the current thread, used by threads that end after creating a driver.
 
-            # Init the instance to start the new Test
-            instance.__init__(*args, **kwargs)
+        The instances are no longer reused by later drivers of the thread, they are released when their driver quits.
 
-        return cls._instances[cls]
+        Args:
+            release (bool): Release the instances right away, when no driver was created with them
+        """
+        instances = getattr(AgentClientSingleton._local, "instances", {})
+        AgentClientSingleton._local.instances = {}
+        for instance in instances.values():
+            if not release:
+                instance.detach()
+                continue
+            try:
+                instance.release()
+            except Exception as e:
+                logging.warning(f"Failed to release {type(instance).__name__}: {e}")
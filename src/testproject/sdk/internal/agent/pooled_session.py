@@ -0,0 +1,36 @@
+# Copyright 2021 TestProject (https://testproject.io)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+def create_pooled_session(pool_size: int) -> requests.Session:
+    """Creates a requests Session backed by a keep-alive connection pool
+
+    Connections are returned to the pool after each request instead of being closed, so consecutive
+    requests to the Agent reuse the same TCP connection rather than opening a new one every time.
+
+    Args:
+        pool_size (int): Maximum number of connections kept alive per Agent host
+
+    Returns:
+        requests.Session: a session reusing its connections across requests
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
@@ -0,0 +1,71 @@
+# Copyright 2021 TestProject (https://testproject.io)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import gzip
+import zlib
+
+from src.testproject.sdk.exceptions import SdkException
+
+
+class ReportCompressor:
+    """Compresses report payloads before they are sent to the Agent
+
+    Args:
+        encoding (str): Content encoding to apply, either 'gzip' or 'deflate'
+        level (int): Compression level, from 1 (fastest) to 9 (smallest)
+        min_size (int): Payloads smaller than this number of bytes are sent uncompressed
+
+    Attributes:
+        _encoding (str): Content encoding to apply, either 'gzip' or 'deflate'
+        _level (int): Compression level, from 1 (fastest) to 9 (smallest)
+        _min_size (int): Payloads smaller than this number of bytes are sent uncompressed
+    """
+
+    SUPPORTED_ENCODINGS = ["gzip", "deflate"]
+
+    # Compressing small payloads costs more than it saves
+    MIN_COMPRESSED_SIZE = 1024
+
+    def __init__(self, encoding: str = "gzip", level: int = 6, min_size: int = MIN_COMPRESSED_SIZE):
+        if encoding not in self.SUPPORTED_ENCODINGS:
+            raise SdkException(f"Unsupported report compression '{encoding}'")
+        self._encoding = encoding
+        self._level = min(9, max(1, level))
+        self._min_size = min_size
+
+    @property
+    def encoding(self) -> str:
+        """Getter for the content encoding applied to payloads"""
+        return self._encoding
+
+    @property
+    def level(self) -> int:
+        """Getter for the compression level"""
+        return self._level
+
+    def compress(self, payload: bytes) -> tuple:
+        """Compresses a payload if it is large enough to benefit from it
+
+        Args:
+            payload (bytes): The serialized report or batch of reports
+
+        Returns:
+            tuple: the payload to send and the Content-Encoding header value (None if left uncompressed)
+        """
+        if len(payload) < self._min_size:
+            return payload, None
+        if self._encoding == "gzip":
+            return gzip.compress(payload, compresslevel=self._level), self._encoding
+        return zlib.compress(payload, self._level), self._encoding
@@ -0,0 +1,105 @@
+# Copyright 2021 TestProject (https://testproject.io)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import json
+from typing import Callable
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _resolve_deferred(obj):
+    # Values completed in the background, such as screenshots, are resolved when the report is serialized
+    if callable(getattr(obj, "resolve", None)):
+        return obj.resolve()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _stdlib_dumps(obj) -> bytes:
+    return json.dumps(obj, separators=(",", ":"), default=_resolve_deferred).encode("utf-8")
+
+
+def _orjson_dumps(obj) -> bytes:
+    try:
+        return orjson.dumps(obj, default=_resolve_deferred, option=orjson.OPT_NON_STR_KEYS)
+    except TypeError:
+        # orjson is stricter than the standard library, e.g. for integers exceeding 64 bits
+        return _stdlib_dumps(obj)
+
+
+class ReportEncoder:
+    """Serializes report payloads to JSON bytes
+
+    Uses orjson when it is installed, falling back to the standard library json module otherwise.
+    A different encoder can be plugged in using register().
+    Values that are not JSON serializable but have a resolve() method, such as screenshot handles,
+    are serialized as the value returned by resolve().
+    """
+
+    _dumps = staticmethod(_orjson_dumps if orjson is not None else _stdlib_dumps)
+
+    @classmethod
+    def encode(cls, obj) -> bytes:
+        """Serializes an object to JSON
+
+        Args:
+            obj: The object to serialize
+
+        Returns:
+            bytes: the UTF-8 encoded JSON representation of the object
+        """
+        return cls._dumps(obj)
+
+    @staticmethod
+    def encode_array(fragments: list) -> bytes:
+        """Joins already serialized JSON values into a JSON array without encoding them again
+
+        Args:
+            fragments (list): JSON values as returned by encode()
+
+        Returns:
+            bytes: the UTF-8 encoded JSON array
+        """
+        return b"[" + b",".join(fragments) + b"]"
+
+    @classmethod
+    def register(cls, dumps: Callable[[object], bytes] = None):
+        """Replaces the JSON encoder used to serialize reports
+
+        Args:
+            dumps (Callable[[object], bytes]): Function serializing an object to UTF-8 encoded JSON bytes
+                on a single line, None restores the default encoder. It should use resolve_deferred() for
+                values it cannot serialize
+        """
+        if dumps is None:
+            dumps = _orjson_dumps if orjson is not None else _stdlib_dumps
+        cls._dumps = staticmethod(dumps)
+
+    @staticmethod
+    def resolve_deferred(obj):
+        """Resolves a value completed in the background, to be used as the default hook of JSON encoders
+
+        Args:
+            obj: A value that is not JSON serializable
+
+        Returns:
+            the value returned by its resolve() method
+
+        Raises:
+            TypeError: if the value cannot be resolved
+        """
+        return _resolve_deferred(obj)
@@ -0,0 +1,123 @@
+# Copyright 2021 TestProject (https://testproject.io)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import collections
+import logging
+import queue
+import threading
+from typing import Callable
+
+
+class ReportsDispatcher:
+    """Pool of worker threads sending queue items concurrently, keeping the order of items that share an ordering key
+
+    Items sharing an ordering key form a lane that is sent by a single worker at a time, in the order the items were
+    dispatched. Different lanes are sent concurrently by up to the number of workers in the pool.
+
+    Args:
+        workers (int): Number of worker threads sending items
+        send (Callable): Sends an item, called with the item and the number of reports it contains.
+            Returns False if the item was not sent and should be left in its lane, True otherwise
+
+    Attributes:
+        _send (Callable): Sends an item, called with the item and the number of reports it contains
+        _lanes (dict): Ordering key to deque of (item, report count, (url, payload) tuples) waiting to be sent
+        _ready (queue.Queue): Ordering keys of the lanes waiting for a worker
+        _halted (bool): True once the workers should stop taking items from their lanes
+        _idle (threading.Condition): Condition guarding the lanes, notified when a lane is drained
+        _workers (list): The worker threads
+    """
+
+    # Put in the ready queue to stop a worker, None is a valid ordering key
+    __STOP = object()
+
+    def __init__(self, workers: int, send: Callable):
+        self._send = send
+        self._lanes = {}
+        self._ready = queue.Queue()
+        self._halted = False
+        self._idle = threading.Condition()
+        self._workers = [
+            threading.Thread(target=self.__worker, name=f"reports-dispatcher-{i}", daemon=True) for i in range(workers)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def dispatch(self, ordering_key, item, report_count: int, reports: list):
+        """Adds an item to the lane of its ordering key
+
+        Args:
+            ordering_key: Key identifying the lane, items sharing a key are sent in order
+            item (QueueItem): The item to send
+            report_count (int): Number of reports contained in the item
+            reports (list): (url, payload) tuples of the reports contained in the item, journaled if left unsent
+        """
+        with self._idle:
+            lane = self._lanes.get(ordering_key)
+            if lane is None:
+                lane = self._lanes[ordering_key] = collections.deque()
+                self._ready.put(ordering_key)
+            lane.append((item, report_count, reports))
+
+    def pending(self) -> list:
+        """Returns the reports that were dispatched and not sent yet, including the ones being sent
+
+        Returns:
+            list: (url, payload) tuples of the reports, in dispatch order within each lane
+        """
+        with self._idle:
+            return [report for lane in self._lanes.values() for _, _, reports in lane for report in reports]
+
+    def join(self):
+        """Waits until all lanes are drained"""
+        with self._idle:
+            while self._lanes and not self._halted:
+                self._idle.wait()
+
+    def halt(self):
+        """Stops the workers, leaving the items that were not sent in their lanes"""
+        with self._idle:
+            self._halted = True
+            self._idle.notify_all()
+        for _ in self._workers:
+            self._ready.put(self.__STOP)
+
+    def __worker(self):
+        """Worker method sending the items of one lane at a time"""
+        while True:
+            ordering_key = self._ready.get()
+            if ordering_key is self.__STOP:
+                return
+            while True:
+                with self._idle:
+                    lane = self._lanes[ordering_key]
+                    if self._halted:
+                        return
+                    if not lane:
+                        # The lane is drained, the next item dispatched with its key opens a new lane
+                        del self._lanes[ordering_key]
+                        self._idle.notify_all()
+                        break
+                    # The item stays at the head of its lane until it is sent, so it is journaled if left unsent
+                    item, report_count, _ = lane[0]
+                try:
+                    sent = self._send(item, report_count)
+                except Exception as e:
+                    logging.error(f"Failed to send a report to the Agent: {e}")
+                    sent = True
+                if not sent:
+                    return
+                with self._idle:
+                    lane.popleft()
@@ -0,0 +1,92 @@
+# Copyright 2021 TestProject (https://testproject.io)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import threading
+from typing import Callable
+
+
+class ReportsFlush:
+    """Completion handle of the delivery of reports to the Agent, such as the reports left when a driver quits.
+
+    The handle can be waited for with a timeout, joined like a thread or awaited in a coroutine.
+
+    Examples:
+        reports_flush = driver.quit()
+        # Other teardown...
+        reports_flush.wait(timeout=30)
+    """
+
+    def __init__(self):
+        self._delivered = threading.Event()
+
+    @classmethod
+    def completed(cls) -> "ReportsFlush":
+        """Returns a handle of reports that are already delivered"""
+        reports_flush = cls()
+        reports_flush.complete()
+        return reports_flush
+
+    @classmethod
+    def run(cls, deliver: Callable) -> "ReportsFlush":
+        """Delivers reports on a background thread.
+
+        The thread is not a daemon thread, so the interpreter waits for the delivery to end before exiting.
+
+        Args:
+            deliver (Callable): Delivers the reports, such as stopping a reports queue
+
+        Returns:
+            ReportsFlush: completed when deliver returns
+        """
+        reports_flush = cls()
+
+        def run_and_complete():
+            try:
+                deliver()
+            finally:
+                reports_flush.complete()
+
+        threading.Thread(target=run_and_complete, name="reports-flush").start()
+        return reports_flush
+
+    def complete(self):
+        """Marks the reports as delivered, waking up the threads waiting for them"""
+        self._delivered.set()
+
+    def done(self) -> bool:
+        """Returns True if the reports were delivered, False otherwise"""
+        return self._delivered.is_set()
+
+    def wait(self, timeout: float = None) -> bool:
+        """Waits for the reports to be delivered
+
+        Args:
+            timeout (float): Maximum number of seconds to wait, None waits until they are delivered
+
+        Returns:
+            bool: True if the reports were delivered, False if the timeout passed first
+        """
+        return self._delivered.wait(timeout)
+
+    def join(self, timeout: float = None):
+        """Waits for the reports to be delivered, like Thread.join()
+
+        Args:
+            timeout (float): Maximum number of seconds to wait, None waits until they are delivered
+        """
+        self.wait(timeout)
+
+    def __await__(self):
+        return asyncio.get_event_loop().run_in_executor(None, self.wait).__await__()
@@ -12,9 +12,22 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import collections
 import queue
 import threading
 import logging
+import time
+from src.testproject.classes.tracer import Tracer
+from src.testproject.enums import ReportsOverflowPolicy
+from src.testproject.helpers import ConfigHelper
+from src.testproject.rest.messages.reportitemtype import ReportItemType
+from src.testproject.sdk.internal.agent.pooled_session import create_pooled_session
+from src.testproject.sdk.internal.agent.report_compressor import ReportCompressor
+from src.testproject.sdk.internal.agent.report_encoder import ReportEncoder
+from src.testproject.sdk.internal.agent.reports_dispatcher import ReportsDispatcher
+from src.testproject.sdk.internal.agent.reports_flush import ReportsFlush
+from src.testproject.sdk.internal.agent.reports_spool import ReportsSpool
+from src.testproject.sdk.internal.agent.retry_policy import RetryPolicy
 from src.testproject.tcp import SocketManager
 from typing import Optional
 import requests
@@ -22,11 +35,77 @@ from requests import HTTPError
 
 
 class ReportsQueue:
+    """Queue holding reports to be sent to the Agent by a background reporting thread
+
+    Args:
+        token (str): Token used to authenticate with the Agent
+        retry_policy (RetryPolicy): Policy deciding when failed deliveries are retried, defaults to RetryPolicy()
+        capacity (int): Maximum number of reports waiting to be sent, 0 means unbounded.
+            Defaults to the TP_REPORTS_QUEUE_CAPACITY environment variable
+        overflow_policy (ReportsOverflowPolicy): What happens to reports submitted while the queue is full.
+            Defaults to the TP_REPORTS_QUEUE_OVERFLOW_POLICY environment variable
+        compressor (ReportCompressor): Compresses payloads before they are sent, None sends them uncompressed
+        workers (int): Number of threads sending reports concurrently, reports sharing an ordering key are always
+            sent in order. Defaults to the TP_REPORTS_QUEUE_WORKERS environment variable
+        agent_url (str): Address of the Agent, reports journaled to disk are only replayed to the same Agent
+
+    Attributes:
+        _token (str): Token used to authenticate with the Agent
+        _retry_policy (RetryPolicy): Policy deciding when failed deliveries are retried
+        _capacity (int): Maximum number of reports waiting to be sent, 0 means unbounded
+        _overflow_policy (ReportsOverflowPolicy): What happens to reports submitted while the queue is full
+        _overflow_counts (dict): Number of reports affected by each overflow policy
+        _compressor (ReportCompressor): Compresses payloads before they are sent, None sends them uncompressed
+        _dispatcher (ReportsDispatcher): Pool sending reports concurrently, None if reports are sent by the
+            reporting thread itself
+        _spool (ReportsSpool): Reports spilled to disk while the queue was full or the Agent was unreachable
+        _current_item (QueueItem): Item the reporting thread is currently sending
+        _spooled_in_flight (collections.deque): Spooled reports read back by the reporting thread and not sent yet
+        _abandoned (bool): True once undelivered reports have been journaled on stop()
+        _session (requests.Session): keep-alive connection shared by all reports sent from this queue
+        _reports_sent (int): number of reports successfully delivered to the Agent
+        _sending_time (float): total time in seconds spent delivering reports to the Agent
+        _stats_lock (threading.Lock): lock guarding the delivery statistics
+    """
+
     REPORTS_QUEUE_TIMEOUT = 10
 
-    def __init__(self, token: str):
+    # Number of seconds between checks for spilled reports while the queue is empty
+    SPOOL_POLL_INTERVAL = 0.1
+
+    # Ordering key of the reports replayed from previous runs, which are independent of the reports of this run
+    JOURNAL_ORDERING_KEY = "journal"
+
+    def __init__(
+        self,
+        token: str,
+        retry_policy: RetryPolicy = None,
+        capacity: int = None,
+        overflow_policy: ReportsOverflowPolicy = None,
+        compressor: ReportCompressor = None,
+        workers: int = None,
+        agent_url: str = None,
+    ):
         self._token = token
+        self._retry_policy = retry_policy if retry_policy is not None else RetryPolicy()
+        self._capacity = capacity if capacity is not None else ConfigHelper.get_reports_queue_capacity()
+        self._overflow_policy = (
+            overflow_policy if overflow_policy is not None else ConfigHelper.get_reports_overflow_policy()
+        )
+        self._overflow_counts = {policy: 0 for policy in ReportsOverflowPolicy}
+        self._compressor = compressor
+        self._space_available = threading.Condition()
+        self._spool = ReportsSpool(ConfigHelper.get_reports_spool_dir(), token, agent_url)
+        self._current_item = None
+        self._spooled_in_flight = collections.deque()
+        self._abandoned = False
         self._close_socket = False
+        workers = max(1, workers if workers is not None else ConfigHelper.get_reports_queue_workers())
+        self._dispatcher = ReportsDispatcher(workers, self._deliver) if workers > 1 else None
+        self._session = create_pooled_session(pool_size=workers)
+        self._reports_sent = 0
+        self._sending_time = 0.0
+        self._stats_lock = threading.Lock()
         # Running after all is initialized successfully
         self._running = True
         # After session started and is running, start the reporting thread
@@ -34,16 +113,135 @@ class ReportsQueue:
         self._reporting_thread = threading.Thread(target=self._report_worker, daemon=True)
         self._reporting_thread.start()
 
-    def submit(self, report_as_json: [dict], url: [str], block: [bool]):
+    def submit(self, report_as_json: [dict], url: [str], block: [bool], ordering_key=None):
         queue_item = QueueItem(
             report_as_json=report_as_json,
             url=url,
             token=self._token,
+            ordering_key=ordering_key,
         )
+        if len(self._spool) > 0 or self._retry_policy.circuit_open:
+            # The Agent is unreachable, or earlier reports were spooled and later ones follow them to keep ordering.
+            # Reports that cannot be written to disk are kept in memory instead.
+            if self._spool.append(url, queue_item.payload):
+                self._overflow_counts[ReportsOverflowPolicy.SpillToDisk] += 1
+                return
+        if self._capacity and self._queue.qsize() >= self._capacity:
+            queue_item = self._handle_overflow(queue_item)
+            if queue_item is None:
+                return
         self._queue.put(queue_item, block=block)
 
-    def stop(self):
-        """Send all remaining report items in the queue to TestProject"""
+    def _handle_overflow(self, item) -> Optional["QueueItem"]:
+        """Applies the overflow policy to an item submitted while the queue is full
+
+        Args:
+            item (QueueItem): The submitted item
+
+        Returns:
+            Optional[QueueItem]: The item to put in the queue, or None if it was dropped or spilled to disk
+        """
+        policy = self._overflow_policy
+        if policy is ReportsOverflowPolicy.SpillToDisk:
+            if not self._spool.append(item.url, item.payload):
+                # Writing to disk failed, the report is queued beyond the capacity rather than lost
+                return item
+            self._overflow_counts[policy] += 1
+            return None
+
+        report_type = item.report_as_json.get("type") if isinstance(item.report_as_json, dict) else None
+        if policy is ReportsOverflowPolicy.DropCommands:
+            if report_type == ReportItemType.Command.value:
+                self._overflow_counts[policy] += 1
+                return None
+            # Step and test reports are few and must not be lost, so they are queued beyond the capacity
+            return item
+        if policy is ReportsOverflowPolicy.StripScreenshots:
+            # Reports without a screenshot are small, so they are queued beyond the capacity
+            if item.report_as_json.get("screenshot") is not None:
+                item.report_as_json["screenshot"] = None
+                self._overflow_counts[policy] += 1
+            return item
+
+        # Block the test thread until the reporting thread has made room in the queue
+        self._overflow_counts[ReportsOverflowPolicy.Block] += 1
+        with self._space_available:
+            while self._running and self._queue.qsize() >= self._capacity:
+                self._space_available.wait(timeout=1)
+        return item
+
+    def replay_journals(self):
+        """Submits the reports that previous runs failed to deliver, as journaled in the spool directory"""
+        entries = ReportsSpool.claim_journals(self._spool.directory)
+        if not entries:
+            return
+        logging.info(f"Sending {len(entries)} undelivered reports from previous runs")
+        for url, payload in entries:
+            item = QueueItem(
+                report_as_json=None,
+                url=url,
+                token=self._token,
+                payload=payload,
+                ordering_key=self.JOURNAL_ORDERING_KEY,
+            )
+            self._queue.put(item, block=False)
+
+    @property
+    def overflow_counts(self) -> dict:
+        """Getter for the number of reports affected by each overflow policy"""
+        return dict(self._overflow_counts)
+
+    @property
+    def retry_policy(self) -> RetryPolicy:
+        """Getter for the policy deciding when failed deliveries are retried"""
+        return self._retry_policy
+
+    @property
+    def reports_sent(self) -> int:
+        """Getter for the number of reports delivered to the Agent"""
+        return self._reports_sent
+
+    @property
+    def drain_rate(self) -> float:
+        """Getter for the measured number of reports delivered to the Agent per second"""
+        return self._reports_sent / self._sending_time if self._sending_time > 0 else 0.0
+
+    @property
+    def running(self) -> bool:
+        """Getter for whether the reporting thread accepts new reports, False once the queue is stopped"""
+        return self._running
+
+    def flush(self, timeout: float = None) -> bool:
+        """Waits until the reports submitted so far are delivered, keeping the reporting thread running
+
+        Args:
+            timeout (float): Maximum number of seconds to wait, defaults to REPORTS_QUEUE_TIMEOUT
+
+        Returns:
+            bool: True if the reports were delivered within the timeout, False otherwise
+        """
+        with Tracer.span("flush", "report"):
+            return self.flush_async().wait(timeout if timeout is not None else self.REPORTS_QUEUE_TIMEOUT)
+
+    def flush_async(self) -> ReportsFlush:
+        """Requests the delivery of the reports submitted so far without waiting for it
+
+        Returns:
+            ReportsFlush: completed once the reports submitted so far are delivered
+        """
+        reports_flush = ReportsFlush()
+        self._queue.put(reports_flush, block=False)
+        return reports_flush
+
+    def stop(self, timeout: float = None):
+        """Send all remaining report items in the queue to TestProject
+
+        Args:
+            timeout (float): Maximum number of seconds to wait before journaling the unsent reports,
+                defaults to REPORTS_QUEUE_TIMEOUT
+        """
+        stop_time = time.perf_counter()
+
         # Send a stop signal to the thread worker
         self._running = False
 
@@ -52,26 +250,171 @@ class ReportsQueue:
         self._queue.put(QueueItem(report_as_json=None, url=None, token=self._token), block=False)
 
         # Wait until all items have been reported or timeout passes
-        self._reporting_thread.join(timeout=self.REPORTS_QUEUE_TIMEOUT)
+        with Tracer.span("drain", "report"):
+            self._reporting_thread.join(timeout=timeout if timeout is not None else self.REPORTS_QUEUE_TIMEOUT)
         if self._reporting_thread.is_alive():
             # Thread is still alive, so there are unreported items
-            logging.warning(f"There are {self._queue.qsize()} unreported items in the queue")
+            self._journal_unsent_reports()
+        logging.debug(
+            f"Reports queue drained in {time.perf_counter() - stop_time:.3f}s, {self._reports_sent} reports sent"
+            f" at {self.drain_rate:.1f} reports/sec"
+        )
+
+    def _journal_unsent_reports(self):
+        """Stops the reporting thread from sending more reports and journals all undelivered reports to disk"""
+        self._abandoned = True
+        if self._dispatcher is not None:
+            self._dispatcher.halt()
+        spooled = self._spool.take_all()
+        for url, payload in self._unsent_reports():
+            self._spool.append(url, payload)
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if isinstance(item, QueueItem) and not item.empty:
+                self._spool.append(item.url, item.payload)
+        for url, payload in spooled:
+            self._spool.append(url, payload)
+        journaled = self._spool.seal()
+        logging.warning(
+            f"There are {journaled} unreported items in the queue,"
+            f" they will be sent when the next session starts (journal directory: {self._spool.directory})"
+        )
+
+    def _unsent_reports(self) -> list:
+        """Returns the reports taken from the queue by the reporting thread that were not delivered yet
+
+        Returns:
+            list: (url, payload) tuples of the undelivered reports
+        """
+        dispatched = self._dispatcher.pending() if self._dispatcher is not None else []
+        return dispatched + self._held_reports()
+
+    def _held_reports(self) -> list:
+        """Returns the reports held by the reporting thread that were not handed over for delivery yet
+
+        Returns:
+            list: (url, payload) tuples of the held reports
+        """
+        item = self._current_item
+        current = [(item.url, item.payload)] if item is not None and not item.empty else []
+        return current + list(self._spooled_in_flight)
 
     def _report_worker(self):
         """Worker method that is polling the queue for items to report"""
-        while self._running or self._queue.qsize() > 0:
-            item = self._queue.get()
+        while (self._running or self._queue.qsize() > 0) and not self._abandoned:
+            timeout = self._poll_timeout()
+            if len(self._spool) > 0:
+                timeout = min(timeout, self.SPOOL_POLL_INTERVAL) if timeout is not None else self.SPOOL_POLL_INTERVAL
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                self._send_spooled_reports()
+                self._flush()
+                continue
+            if self._capacity:
+                with self._space_available:
+                    self._space_available.notify_all()
             if isinstance(item, QueueItem):
+                self._current_item = item
                 self._handle_report(item)
+                self._current_item = None
+            elif isinstance(item, ReportsFlush):
+                # Deliver everything submitted before the flush request, then wake up the flushing thread
+                self._send_spooled_reports()
+                self._flush()
+                if self._dispatcher is not None:
+                    self._dispatcher.join()
+                item.complete()
             else:
                 logging.warning(f"Unknown object of type {type(item)} found on queue, ignoring it..")
             self._queue.task_done()
+            if self._queue.qsize() == 0:
+                self._send_spooled_reports()
+        if not self._abandoned:
+            self._flush()
+            if self._dispatcher is not None:
+                self._dispatcher.join()
+        self._session.close()
         # Close socket only after agent_client is no longer running and all reports in the queue have been sent.
         if self._close_socket:
             SocketManager.instance().close_socket()
 
+    def _send_spooled_reports(self):
+        """Sends the reports that were spilled to disk, in the order they were submitted"""
+        self._spooled_in_flight = collections.deque(self._spool.take_all())
+        while self._spooled_in_flight and not self._abandoned:
+            url, payload = self._spooled_in_flight[0]
+            self._handle_report(QueueItem(report_as_json=None, url=url, token=self._token, payload=payload))
+            self._spooled_in_flight.popleft()
+
+    def _poll_timeout(self) -> Optional[float]:
+        """Returns the number of seconds the worker waits for a new item before flushing held back reports
+
+        Returns:
+            Optional[float]: the timeout in seconds, or None to wait until an item is available
+        """
+        return None
+
+    def _flush(self):
+        """Sends any reports held back by the worker, called when the poll timeout passes and before the worker exits"""
+        pass
+
     def _handle_report(self, item: [object]):
-        item.send()
+        self._send(item, report_count=1)
+
+    def _send(self, item, report_count: int, reports: list = None):
+        """Sends a queue item, handing it over to the dispatcher if reports are sent concurrently
+
+        Args:
+            item (QueueItem): The item to send
+            report_count (int): Number of reports contained in the item
+            reports (list): (url, payload) tuples of the reports contained in the item, defaults to the item itself
+        """
+        if item.empty:
+            # Skip empty queue items put in the queue on stop()
+            return
+        if self._dispatcher is None:
+            self._deliver(item, report_count)
+            return
+        if reports is None:
+            reports = [(item.url, item.payload)]
+        self._dispatcher.dispatch(item.ordering_key, item, report_count, reports)
+
+    def _deliver(self, item, report_count: int) -> bool:
+        """Sends a queue item over the shared connection and records the delivery statistics
+
+        Args:
+            item (QueueItem): The item to send
+            report_count (int): Number of reports contained in the item
+
+        Returns:
+            bool: False if the item was abandoned because it has been journaled by stop(), True otherwise
+        """
+        start_time = time.perf_counter()
+        delivered = 0
+        with Tracer.span("deliver", "report", reports=report_count):
+            while True:
+                # While the Agent is unhealthy the item stays parked at the head of the queue, preserving ordering
+                if self._retry_policy.circuit_open:
+                    with Tracer.span("parked", "report"):
+                        self._retry_policy.wait_while_open()
+                if self._abandoned:
+                    # The item has been journaled by stop()
+                    return False
+                with Tracer.span("send", "report", url=item.url):
+                    sent = item.send(self._session, self._retry_policy, self._compressor)
+                if sent:
+                    delivered = report_count
+                    break
+                if not self._retry_policy.circuit_open:
+                    break
+        with self._stats_lock:
+            self._reports_sent += delivered
+            self._sending_time += time.perf_counter() - start_time
+        return True
 
 
 class QueueItem:
@@ -81,45 +424,104 @@ class QueueItem:
         report_as_json (dict): JSON payload representing the item to be reported
         url (str): Agent endpoint the payload should be POSTed to
         token (str): Token used to authenticate with the Agent
+        payload (bytes): The item already serialized to JSON, if available
+        ordering_key: Key of the items this item is sent in order with, None for the reports of the current run
 
     Attributes:
         _report_as_json (Optional[dict]): JSON payload representing the item to be reported
         _url (Optional[str]): Agent endpoint the payload should be POSTed to
         _token (str): Token used to authenticate with the Agent
+        _payload (Optional[bytes]): The item serialized to JSON, encoded once on first use
+        _ordering_key: Key of the items this item is sent in order with, None for the reports of the current run
     """
 
-    def __init__(self, report_as_json: Optional[dict], url: Optional[str], token: str):
+    def __init__(
+        self,
+        report_as_json: Optional[dict],
+        url: Optional[str],
+        token: str,
+        payload: bytes = None,
+        ordering_key=None,
+    ):
         self._report_as_json = report_as_json
         self._url = url
         self._token = token
+        self._payload = payload
+        self._ordering_key = ordering_key
+
+    def send(self, session: requests.Session, retry_policy: RetryPolicy, compressor: ReportCompressor = None) -> bool:
+        """Send a report item to the Agent
 
-    def send(self):
-        """Send a report item to the Agent"""
-        max_report_failure_attempts = 4
+        Args:
+            session (requests.Session): Session whose connection is reused to send the report
+            retry_policy (RetryPolicy): Policy deciding when a failed attempt is retried
+            compressor (ReportCompressor): Compresses the payload once before it is sent, None sends it as is
 
-        if self._report_as_json is None and self._url is None:
+        Returns:
+            bool: True if the report was delivered, False otherwise
+        """
+        if self.empty:
             # Skip empty queue items put in the queue on stop()
-            return
+            return False
+
+        headers = {"Authorization": self._token, "Content-Type": "application/json"}
+        data = self.payload
+        if compressor is not None:
+            data, content_encoding = compressor.compress(data)
+            if content_encoding is not None:
+                headers["Content-Encoding"] = content_encoding
 
-        for i in range(max_report_failure_attempts):
-            with requests.Session() as session:
-                response = session.post(
-                    self._url,
-                    headers={"Authorization": self._token},
-                    json=self._report_as_json,
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                response = session.post(self._url, headers=headers, data=data)
+                response.raise_for_status()
+                retry_policy.record_success()
+                return True
+            except HTTPError:
+                logging.warning(
+                    f"Agent responded with an unexpected status {response.status_code}, "
+                    f"response from Agent: {response.text}"
                 )
-                try:
-                    response.raise_for_status()
-                    return
-                except HTTPError:
-                    remaining_attempts = max_report_failure_attempts - i - 1
-                    logging.warning(
-                        f"Agent responded with an unexpected status {response.status_code}, "
-                        f"response from Agent: {response.text}"
-                    )
-                    logging.info(f"Failed to send a report to the Agent, {remaining_attempts} attempts remaining...")
-        logging.error(f"All {max_report_failure_attempts} attempts to send report have failed.")
+                if not RetryPolicy.is_retryable(response.status_code):
+                    # The Agent is healthy but rejected the report, sending it again will not help
+                    retry_policy.record_success()
+                    logging.error("Report was rejected by the Agent and will not be sent again.")
+                    return False
+            except requests.exceptions.RequestException as e:
+                logging.warning(f"Failed to connect to the Agent: {e}")
+
+            if not retry_policy.acquire_retry(attempt):
+                break
+            logging.info(f"Failed to send a report to the Agent (attempt {attempt}), retrying...")
+            retry_policy.backoff(attempt)
+
+        retry_policy.record_failure()
+        logging.error(f"All {attempt} attempts to send report have failed.")
+        return False
 
     @property
     def report_as_json(self):
         return self._report_as_json
+
+    @property
+    def payload(self) -> bytes:
+        """Getter for the item serialized to JSON, serializing it on first use"""
+        if self._payload is None:
+            self._payload = ReportEncoder.encode(self._report_as_json)
+        return self._payload
+
+    @property
+    def empty(self) -> bool:
+        """Getter indicating whether this is an empty item, as put in the queue on stop()"""
+        return self._report_as_json is None and self._payload is None
+
+    @property
+    def url(self):
+        return self._url
+
+    @property
+    def ordering_key(self):
+        """Getter for the key of the items this item is sent in order with"""
+        return self._ordering_key
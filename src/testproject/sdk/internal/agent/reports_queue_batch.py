@@ -13,51 +13,144 @@
 # limitations under the License.
 import collections
 import logging
-import os
+import time
+from typing import Optional
+
+from src.testproject.enums import ReportsOverflowPolicy
+from src.testproject.helpers import ConfigHelper
+from src.testproject.sdk.internal.agent.report_compressor import ReportCompressor
+from src.testproject.sdk.internal.agent.report_encoder import ReportEncoder
 from src.testproject.sdk.internal.agent.reports_queue import ReportsQueue, QueueItem
+from src.testproject.sdk.internal.agent.retry_policy import RetryPolicy
 
 
 class ReportsQueueBatch(ReportsQueue):
+    """Reports queue sending reports to the Agent in batches
+
+    A batch is sent once it holds the maximum number of reports, once adding another report would exceed the
+    maximum payload size, or once the linger window that started with the first report in the batch has passed.
+    A batch only holds reports sharing the same ordering key.
+
+    Args:
+        token (str): Token used to authenticate with the Agent
+        url (str): Agent endpoint the batches should be POSTed to
+        retry_policy (RetryPolicy): Policy deciding when failed deliveries are retried
+        capacity (int): Maximum number of reports waiting to be sent, 0 means unbounded
+        overflow_policy (ReportsOverflowPolicy): What happens to reports submitted while the queue is full
+        compressor (ReportCompressor): Compresses batches before they are sent, None sends them uncompressed
+        workers (int): Number of threads sending batches concurrently
+        agent_url (str): Address of the Agent, reports journaled to disk are only replayed to the same Agent
+
+    Attributes:
+        _url (str): Agent endpoint the batches should be POSTed to
+        _max_batch_size (int): Maximum number of reports in a batch
+        _max_batch_bytes (int): Maximum size of a batch payload in bytes
+        _linger_time (float): Maximum number of seconds to wait for more reports before sending a batch
+    """
+
     MAX_REPORT_BATCH_SIZE = 10
+    MAX_REPORT_BATCH_BYTES = 5 * 1024 * 1024
+    REPORT_BATCH_LINGER_MS = 100
     TP_MAX_BATCH_SIZE_VARIABLE_NAME = "TP_MAX_REPORTS_BATCH_SIZE"
+    TP_MAX_BATCH_BYTES_VARIABLE_NAME = "TP_MAX_REPORTS_BATCH_BYTES"
+    TP_BATCH_LINGER_MS_VARIABLE_NAME = "TP_REPORTS_BATCH_LINGER_MS"
 
-    def __init__(self, token: str, url: [str]):
-        super().__init__(token)
+    def __init__(
+        self,
+        token: str,
+        url: [str],
+        retry_policy: RetryPolicy = None,
+        capacity: int = None,
+        overflow_policy: ReportsOverflowPolicy = None,
+        compressor: ReportCompressor = None,
+        workers: int = None,
+        agent_url: str = None,
+    ):
         self._url = url
         self.__batch_list = collections.deque()
-        """Get maximum reports batch size from environment variable."""
-        """If the environment variable is not defined - set maximum reports batch size to 10 as default"""
-        try:
-            env_var_value = os.environ[self.TP_MAX_BATCH_SIZE_VARIABLE_NAME]
-            if env_var_value is not None:
-                self.__max_batch_size = int(env_var_value)
-            else:
-                self.__max_batch_size = self.MAX_REPORT_BATCH_SIZE
-        except KeyError:
-            logging.warning("The environment variable {TP_MAX_BATCH_SIZE_VARIABLE_NAME} is not defined.")
-            self.__max_batch_size = self.MAX_REPORT_BATCH_SIZE
-        except ValueError:
-            logging.warning("The environment variable {TP_MAX_BATCH_SIZE_VARIABLE_NAME} value must be an integer.")
-            self.__max_batch_size = self.MAX_REPORT_BATCH_SIZE
-        except Exception:
-            self.__max_batch_size = self.MAX_REPORT_BATCH_SIZE
-        logging.info("The maximum reports batch size is defined as {self.__max_batch_size}.")
+        self.__batch_key = None
+        self.__batch_bytes = 0
+        self.__batch_deadline = None
+        self.__sending_batch = []
+        self._max_batch_size = max(
+            1, ConfigHelper.get_int_from_env(self.TP_MAX_BATCH_SIZE_VARIABLE_NAME, self.MAX_REPORT_BATCH_SIZE)
+        )
+        self._max_batch_bytes = ConfigHelper.get_int_from_env(
+            self.TP_MAX_BATCH_BYTES_VARIABLE_NAME, self.MAX_REPORT_BATCH_BYTES
+        )
+        self._linger_time = (
+            max(0, ConfigHelper.get_int_from_env(self.TP_BATCH_LINGER_MS_VARIABLE_NAME, self.REPORT_BATCH_LINGER_MS))
+            / 1000.0
+        )
+        logging.info(
+            f"Reports are sent in batches of at most {self._max_batch_size} reports or {self._max_batch_bytes} bytes,"
+            f" waiting up to {int(self._linger_time * 1000)} ms for more reports"
+        )
+        # Start the reporting thread only after the batching policy is initialized
+        super().__init__(token, retry_policy, capacity, overflow_policy, compressor, workers, agent_url)
 
-    def _handle_report(self, item: [object]):
-        self.__batch_list.append(item.report_as_json)
+    def _poll_timeout(self) -> Optional[float]:
+        if self.__batch_deadline is None:
+            return None
+        return max(0.0, self.__batch_deadline - time.monotonic())
+
+    def _flush(self):
+        # The linger window has passed without filling up the batch, or the worker is exiting
+        self.__send_batch()
 
-        if self.__batch_list.__len__() == 0:
+    def _held_reports(self) -> list:
+        # Reports taken from the queue are either waiting in the current batch or part of the batch being sent
+        pending = self.__sending_batch + list(self.__batch_list)
+        pending_ids = {id(payload) for _, payload in pending}
+        others = [(url, payload) for url, payload in super()._held_reports() if id(payload) not in pending_ids]
+        return pending + others
+
+    def _handle_report(self, item: [object]):
+        if item.empty:
+            # Empty queue items are put in the queue on stop(), send whatever is left right away
+            self.__send_batch()
             return
 
-        """Send the reports batch, if one of the following conditions is true:"""
-        """The batch list size reached allowed maximum."""
-        """The queue is empty and the reports batch list is not."""
-        if self.__batch_list.__len__() == self.__max_batch_size or (
-            self.__batch_list.__len__() > 0 and self._queue.qsize() == 0
-        ):
-            """Convert reports linked list to a plain list before it's sent to the Agent"""
-            batch_json = list(self.__batch_list)
-            """Build QueueItem with reports batch json and send it to the agent"""
-            batch_item = QueueItem(url=self._url, report_as_json=batch_json, token=self._token)
-            batch_item.send()
-            self.__batch_list.clear()
+        # Reports are serialized once, the batch payload is built by joining them
+        payload = item.payload
+        report_bytes = len(payload) + 1
+        if self.__batch_list and self.__batch_bytes + report_bytes > self._max_batch_bytes:
+            # Adding this report would make the payload too large
+            self.__send_batch()
+        elif self.__batch_list and item.ordering_key != self.__batch_key:
+            # Reports that must be sent in order with other reports never share a batch
+            self.__send_batch()
+
+        self.__batch_key = item.ordering_key
+        # The endpoint of each report is kept, so that journaled reports can be replayed one by one
+        self.__batch_list.append((item.url, payload))
+        self.__batch_bytes += report_bytes
+        if self.__batch_deadline is None:
+            self.__batch_deadline = time.monotonic() + self._linger_time
+
+        if len(self.__batch_list) >= self._max_batch_size or self.__batch_bytes >= self._max_batch_bytes:
+            self.__send_batch()
+        elif self._linger_time == 0 and self._queue.qsize() == 0:
+            # Without a linger window the batch is sent as soon as the queue is empty
+            self.__send_batch()
+
+    def __send_batch(self):
+        """Sends all reports in the current batch to the Agent as a single request"""
+        if not self.__batch_list:
+            return
+        # Convert reports linked list to a plain list before it's sent to the Agent
+        batch = list(self.__batch_list)
+        self.__batch_list.clear()
+        self.__batch_bytes = 0
+        self.__batch_deadline = None
+        # Build QueueItem with the serialized reports batch and send it to the agent
+        batch_item = QueueItem(
+            url=self._url,
+            report_as_json=None,
+            token=self._token,
+            payload=ReportEncoder.encode_array([payload for _, payload in batch]),
+            ordering_key=self.__batch_key,
+        )
+        self.__sending_batch = batch
+        self._send(batch_item, report_count=len(batch), reports=batch)
+        self.__sending_batch = []
@@ -0,0 +1,253 @@
+# Copyright 2021 TestProject (https://testproject.io)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import glob
+import hashlib
+import json
+import logging
+import os
+import threading
+import uuid
+from typing import Optional
+
+
+class ReportsSpool:
+    """Append-only file on disk holding reports that could not be kept in memory or could not be delivered
+
+    While a reports queue is running its spool file is private to it. Reports left undelivered when the queue is
+    stopped are sealed into a journal file, which is replayed by the next reports queue started in any process
+    with the same token and Agent. Spool files of processes that ended without stopping their queue, and files
+    claimed by processes that ended while replaying them, are replayed as well. Spool files are kept in a
+    subdirectory named after a hash of the token and Agent, so that reports are never replayed to another Agent or
+    with the token of another user.
+
+    Args:
+        directory (str): Base directory of the spool files
+        token (str): Token used to authenticate with the Agent
+        agent_url (str): Address of the Agent the reports are sent to
+
+    Attributes:
+        _directory (str): Directory in which the spool file is created, scoped to the token and Agent
+        _path (str): Path of the spool file
+        _pending (int): Number of reports appended to the spool and not read back yet
+        _lock (threading.Lock): Lock guarding the spool file
+    """
+
+    SPOOL_EXTENSION = ".spool"
+    JOURNAL_EXTENSION = ".journal"
+
+    # Windows process access right and exit code, used to check if the process owning a spool file is running
+    PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+    STILL_ACTIVE = 259
+
+    def __init__(self, directory: str, token: str = None, agent_url: str = None):
+        scope = hashlib.sha256(f"{token}\n{agent_url}".encode("utf-8")).hexdigest()[:16]
+        self._directory = os.path.join(directory, scope)
+        self._path = os.path.join(self._directory, f"reports-{os.getpid()}-{uuid.uuid4().hex}{self.SPOOL_EXTENSION}")
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._pending
+
+    @property
+    def path(self) -> str:
+        """Getter for the path of the spool file"""
+        return self._path
+
+    @property
+    def directory(self) -> str:
+        """Getter for the directory in which the spool file is created"""
+        return self._directory
+
+    def append(self, url: str, payload: bytes) -> bool:
+        """Appends a report to the spool
+
+        Args:
+            url (str): Agent endpoint the report should be POSTed to
+            payload (bytes): The report serialized to JSON
+
+        Returns:
+            bool: True if the report was written to the spool, False if writing to disk failed
+        """
+        # Each line holds the JSON encoded URL and the serialized report separated by a tab,
+        # so reports are stored and read back without being encoded again
+        line = json.dumps(url).encode("utf-8") + b"\t" + payload + b"\n"
+        with self._lock:
+            try:
+                # The spool directory may hold reports of the user, keep it private
+                os.makedirs(self._directory, mode=0o700, exist_ok=True)
+                with open(self._path, "ab") as spool_file:
+                    spool_file.write(line)
+            except OSError as e:
+                logging.error(f"Failed to write report to spool file {self._path}: {e}")
+                return False
+            self._pending += 1
+        return True
+
+    def take_all(self) -> list:
+        """Reads back all spooled reports in the order they were appended and empties the spool
+
+        Returns:
+            list: (url, payload) tuples of the spooled reports
+        """
+        with self._lock:
+            if self._pending == 0:
+                return []
+            entries = self._read(self._path)
+            os.remove(self._path)
+            self._pending = 0
+        return entries
+
+    def seal(self) -> int:
+        """Durably stores the spooled reports as a journal, to be replayed by the next reports queue
+
+        Returns:
+            int: Number of reports in the journal
+        """
+        with self._lock:
+            if self._pending == 0:
+                return 0
+            with open(self._path, "ab") as spool_file:
+                spool_file.flush()
+                os.fsync(spool_file.fileno())
+            os.replace(self._path, os.path.splitext(self._path)[0] + self.JOURNAL_EXTENSION)
+            pending, self._pending = self._pending, 0
+        return pending
+
+    @classmethod
+    def claim_journals(cls, directory: str) -> list:
+        """Reads and removes the journals left in a directory, oldest first
+
+        Spool files of processes that are no longer running, and files claimed by such processes, are read as
+        journals too. A file is renamed before it is read, so concurrent processes never replay it twice.
+
+        Args:
+            directory (str): Directory containing the journals, as scoped by a spool
+
+        Returns:
+            list: (url, payload) tuples of the journaled reports
+        """
+        journals = []
+        for path in glob.glob(os.path.join(directory, "reports-*")):
+            unclaimed = cls._unclaimed_path(os.path.basename(path))
+            if unclaimed is None:
+                continue
+            try:
+                journals.append((os.path.getmtime(path), path, os.path.join(directory, unclaimed)))
+            except OSError:
+                # Claimed by another process in the meantime
+                continue
+        entries = []
+        for _, journal, unclaimed in sorted(journals):
+            claimed = f"{unclaimed}.{os.getpid()}"
+            try:
+                os.rename(journal, claimed)
+            except OSError:
+                # Claimed by another process in the meantime
+                continue
+            try:
+                entries.extend(cls._read(claimed))
+            except OSError as e:
+                # Keep the journal so that the next reports queue tries again
+                logging.error(f"Failed to read reports journal {journal}: {e}")
+                os.replace(claimed, journal)
+                continue
+            os.remove(claimed)
+        return entries
+
+    @classmethod
+    def _unclaimed_path(cls, name: str) -> Optional[str]:
+        """Returns the name of a file to replay, without the suffix of the process that claimed it
+
+        Args:
+            name (str): Name of a file in the spool directory
+
+        Returns:
+            str: The name of a journal, of a spool file or of a claimed file whose process is no longer running,
+                None if the file is not to be replayed
+        """
+        stem, extension = os.path.splitext(name)
+        if extension == cls.JOURNAL_EXTENSION:
+            return name
+        if extension == cls.SPOOL_EXTENSION:
+            # reports-<pid>-<id>.spool, written by a running reports queue of that process
+            owner = stem.split("-")[1]
+        elif os.path.splitext(stem)[1] in (cls.JOURNAL_EXTENSION, cls.SPOOL_EXTENSION):
+            # <journal or spool file>.<pid>, being read by that process
+            owner, name = extension[1:], stem
+        else:
+            return None
+        if not owner.isdigit() or cls._is_running(int(owner)):
+            return None
+        return name
+
+    @classmethod
+    def _is_running(cls, pid: int) -> bool:
+        """Checks if a process is running
+
+        Args:
+            pid (int): The process ID
+
+        Returns:
+            bool: True if the process is running, False otherwise
+        """
+        if pid == os.getpid():
+            return True
+        if os.name == "nt":
+            # os.kill() would send a CTRL+C event on Windows, query the process exit code instead
+            import ctypes
+
+            process = ctypes.windll.kernel32.OpenProcess(cls.PROCESS_QUERY_LIMITED_INFORMATION, False, pid)
+            if not process:
+                return False
+            try:
+                exit_code = ctypes.c_ulong()
+                ctypes.windll.kernel32.GetExitCodeProcess(process, ctypes.byref(exit_code))
+                return exit_code.value == cls.STILL_ACTIVE
+            finally:
+                ctypes.windll.kernel32.CloseHandle(process)
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except OSError:
+            # The process exists but belongs to another user
+            return True
+        return True
+
+    @staticmethod
+    def _read(path: str) -> list:
+        """Reads all reports stored in a spool or journal file
+
+        Args:
+            path (str): Path of the file
+
+        Returns:
+            list: (url, payload) tuples of the stored reports
+        """
+        entries = []
+        with open(path, "rb") as spool_file:
+            for line_number, line in enumerate(spool_file, start=1):
+                line = line.rstrip(b"\n")
+                if not line:
+                    continue
+                try:
+                    url, payload = line.split(b"\t", 1)
+                    entries.append((json.loads(url), payload))
+                except ValueError as e:
+                    # A line cut short by a crash while appending, the other reports are still valid
+                    logging.error(f"Skipping invalid report at line {line_number} of {path}: {e}")
+        return entries
@@ -0,0 +1,154 @@
+# Copyright 2021 TestProject (https://testproject.io)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import logging
+import random
+import threading
+import time
+from http import HTTPStatus
+
+
+class RetryPolicy:
+    """Decides if and when a failed report delivery should be retried
+
+    Retries are delayed using exponential backoff with full jitter and are limited by a retry budget shared by
+    all reports of a queue, so a struggling Agent is not hammered. After several consecutive failed deliveries
+    the circuit opens: the reports queue parks its reports until the reset timeout has passed, then lets a single
+    report through to probe whether the Agent has recovered.
+
+    Args:
+        max_attempts (int): Maximum number of attempts to deliver a single report
+        base_delay (float): Backoff delay in seconds before the first retry, doubled for every next retry
+        max_delay (float): Upper limit for the backoff delay in seconds
+        retry_budget (int): Maximum number of retry tokens available to the queue
+        budget_refill (float): Number of retry tokens earned back by every successful delivery
+        failure_threshold (int): Number of consecutive failed deliveries that opens the circuit
+        reset_timeout (float): Number of seconds the circuit stays open before a delivery is attempted again
+
+    Attributes:
+        _retry_tokens (float): Remaining retry budget
+        _consecutive_failures (int): Number of deliveries that failed in a row
+        _opened_at (float): Time at which the circuit was opened, None while the circuit is closed
+        _lock (threading.Lock): Lock guarding the policy state
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 4,
+        base_delay: float = 0.1,
+        max_delay: float = 5.0,
+        retry_budget: int = 50,
+        budget_refill: float = 0.1,
+        failure_threshold: int = 3,
+        reset_timeout: float = 5.0,
+    ):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retry_budget = retry_budget
+        self.budget_refill = budget_refill
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._retry_tokens = float(retry_budget)
+        self._consecutive_failures = 0
+        self._opened_at = None
+        self._lock = threading.Lock()
+
+    @property
+    def circuit_open(self) -> bool:
+        """Getter for the circuit state, True while the Agent is considered unhealthy"""
+        return self._opened_at is not None
+
+    @property
+    def retry_tokens(self) -> float:
+        """Getter for the remaining retry budget"""
+        return self._retry_tokens
+
+    @staticmethod
+    def is_retryable(status_code: int) -> bool:
+        """Checks if a request that failed with the given HTTP status code is worth retrying
+
+        Args:
+            status_code (int): The HTTP status code returned by the Agent
+
+        Returns:
+            bool: True for server errors and throttling responses, False for other client errors
+        """
+        return status_code >= HTTPStatus.INTERNAL_SERVER_ERROR or status_code in [
+            HTTPStatus.REQUEST_TIMEOUT,
+            HTTPStatus.TOO_MANY_REQUESTS,
+        ]
+
+    def acquire_retry(self, attempt: int) -> bool:
+        """Checks if another attempt is allowed after the given number of failed attempts and consumes a retry token
+
+        Args:
+            attempt (int): Number of attempts made so far for the current report
+
+        Returns:
+            bool: True if the report should be sent again, False otherwise
+        """
+        with self._lock:
+            # Probing an unhealthy Agent is done using a single attempt
+            if attempt >= self.max_attempts or self.circuit_open or self._retry_tokens < 1:
+                return False
+            self._retry_tokens -= 1
+            return True
+
+    def backoff(self, attempt: int):
+        """Sleeps before the next attempt using exponential backoff with full jitter
+
+        Args:
+            attempt (int): Number of attempts made so far for the current report
+        """
+        time.sleep(random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1))))
+
+    def record_success(self):
+        """Registers that the Agent handled a delivery, closing the circuit and refilling the retry budget"""
+        with self._lock:
+            if self.circuit_open:
+                logging.info("Agent is reachable again, resuming sending reports")
+            self._consecutive_failures = 0
+            self._opened_at = None
+            self._retry_tokens = min(float(self.retry_budget), self._retry_tokens + self.budget_refill)
+
+    def record_failure(self):
+        """Registers a delivery that failed on all attempts, opening the circuit once the threshold is reached"""
+        with self._lock:
+            self._consecutive_failures += 1
+            if self._consecutive_failures >= self.failure_threshold:
+                if not self.circuit_open:
+                    logging.warning(f"Agent seems unhealthy, parking reports for {self.reset_timeout} seconds")
+                self._opened_at = time.monotonic()
+
+    def open_circuit(self, reason: str):
+        """Opens the circuit right away, when the Agent is known to be unreachable before any delivery fails
+
+        Args:
+            reason (str): Why the Agent is considered unreachable, logged when the circuit opens
+        """
+        with self._lock:
+            if not self.circuit_open:
+                logging.warning(f"{reason}, parking reports for {self.reset_timeout} seconds")
+            self._consecutive_failures = max(self._consecutive_failures, self.failure_threshold)
+            self._opened_at = time.monotonic()
+
+    def wait_while_open(self):
+        """Blocks until the circuit is allowed to probe the Agent again, returns immediately if the circuit is closed"""
+        opened_at = self._opened_at
+        if opened_at is not None:
+            remaining = opened_at + self.reset_timeout - time.monotonic()
+            if remaining > 0:
+                time.sleep(remaining)
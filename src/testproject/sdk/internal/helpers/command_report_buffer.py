@@ -0,0 +1,78 @@
+# Copyright 2021 TestProject (https://testproject.io)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+from collections import deque
+from typing import Optional
+
+from src.testproject.rest.messages import DriverCommandReport, StepReport
+
+
+class CommandReportBuffer:
+    """Ring buffer keeping the latest driver command reports of a test, sent only when the test fails
+
+    Args:
+        size (int): The maximum number of driver command reports kept
+
+    Attributes:
+        _reports (deque): The latest driver command reports of the test, oldest first
+        _unreported (int): The number of driver command reports of the test that were not and will not be sent
+    """
+
+    def __init__(self, size: int):
+        self._reports = deque(maxlen=size)
+        self._unreported = 0
+
+    @property
+    def size(self) -> int:
+        """Getter for the maximum number of driver command reports kept"""
+        return self._reports.maxlen
+
+    def add(self, report: DriverCommandReport):
+        """Keeps a driver command report, dropping the oldest one when the buffer is full
+
+        Args:
+            report (DriverCommandReport): The driver command report to keep
+        """
+        if len(self._reports) == self._reports.maxlen:
+            self._unreported += 1
+        self._reports.append(report)
+
+    def flush(self) -> list:
+        """Empties the buffer, called when a failure occurs
+
+        Returns:
+            list: The buffered driver command reports to be sent, oldest first
+        """
+        reports = list(self._reports)
+        self._reports.clear()
+        return reports
+
+    def discard(self) -> Optional[StepReport]:
+        """Empties the buffer without sending its reports, called when a test ends without failures
+
+        Returns:
+            Optional[StepReport]: A step summarizing the driver commands of the test that were not sent,
+            None if all of them were sent
+        """
+        unreported = self._unreported + len(self._reports)
+        self._reports.clear()
+        self._unreported = 0
+        if unreported == 0:
+            return None
+        return StepReport(
+            description=f"{unreported} passed driver command(s) not reported",
+            message=f"Only failed driver commands and the {self.size} commands preceding them are reported.",
+            passed=True,
+        )
@@ -0,0 +1,161 @@
+# Copyright 2021 TestProject (https://testproject.io)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import json
+import logging
+import math
+import time
+from array import array
+
+
+class CommandStats:
+    """Records how long each phase of the driver command execution takes
+
+    Phases are timed with laps: each call to lap() records the time elapsed since the previous one and returns the
+    current time, so a sequence of phases is timed with a single clock read per phase. Durations are counted in a
+    fixed size histogram per phase, so the memory used does not grow with the number of commands. Percentiles are
+    computed from the histogram when requested, within about 5% of the recorded durations.
+
+    Phases:
+        screenshot_wait: waiting for the screenshots of the previous step before sending the command
+        test_name: inferring the current test name, including reporting the previous test when it has ended
+        timeout: applying the step settings timeout to the session
+        sleep: sleeping before and after the command as set by the step settings
+        selenium: sending the command to the driver through Selenium / Appium
+        redaction: redacting typed passwords from the command report
+        screenshot: requesting (or capturing, when not in the background) the screenshot of the step
+        screenshot_capture: capturing a screenshot on the screenshot pipeline thread
+        report: submitting the command report to the reports queue
+        total: the whole command execution, including nested commands sent by the SDK
+
+    Attributes:
+        _durations (dict): Histogram of the durations recorded for each phase
+    """
+
+    def __init__(self):
+        self._durations = {}
+
+    def lap(self, phase: str, start: float) -> float:
+        """Records the time elapsed since the start of a phase
+
+        Args:
+            phase (str): The name of the phase
+            start (float): The time at which the phase started, as returned by time.perf_counter()
+
+        Returns:
+            float: The current time, start of the next phase
+        """
+        now = time.perf_counter()
+        self.record(phase, now - start)
+        return now
+
+    def record(self, phase: str, duration: float):
+        """Records the duration of a phase
+
+        Args:
+            phase (str): The name of the phase
+            duration (float): The duration of the phase in seconds
+        """
+        durations = self._durations.get(phase)
+        if durations is None:
+            durations = self._durations.setdefault(phase, DurationHistogram())
+        durations.add(duration)
+
+    def summary(self) -> dict:
+        """Aggregates the recorded durations
+
+        Returns:
+            dict: For each phase, the number of times it was recorded, its total duration and its 50th, 95th and
+            99th percentile durations in milliseconds
+        """
+        return {phase: durations.aggregate() for phase, durations in list(self._durations.items())}
+
+    def dump(self, path: str):
+        """Writes the aggregated durations to a JSON file
+
+        Args:
+            path (str): Path of the file to write
+        """
+        try:
+            with open(path, "w") as stats_file:
+                json.dump(self.summary(), stats_file, indent=2)
+        except OSError as e:
+            logging.warning(f"Failed writing driver command stats to {path}: {e}")
+
+
+class DurationHistogram:
+    """Counts durations in logarithmic buckets, each bucket is about 9% wider than the previous one
+
+    Durations from a microsecond to over an hour get their own buckets, shorter and longer ones are counted in the
+    first and last bucket. The exact minimum and maximum are kept as well.
+
+    Attributes:
+        _buckets (array): Number of durations counted in each bucket
+        _count (int): Number of durations counted
+        _total (float): Sum of the durations counted, in seconds
+        _minimum (float): Shortest duration counted, in seconds
+        _maximum (float): Longest duration counted, in seconds
+    """
+
+    __slots__ = ("_buckets", "_count", "_total", "_minimum", "_maximum")
+
+    MIN_DURATION = 1e-6
+    BUCKETS_PER_DOUBLING = 8
+    BUCKETS = 32 * BUCKETS_PER_DOUBLING
+
+    def __init__(self):
+        self._buckets = array("L", bytes(array("L").itemsize * self.BUCKETS))
+        self._count = 0
+        self._total = 0.0
+        self._minimum = math.inf
+        self._maximum = 0.0
+
+    def add(self, duration: float):
+        """Counts a duration
+
+        Args:
+            duration (float): The duration in seconds
+        """
+        if duration > self.MIN_DURATION:
+            index = min(int(math.log2(duration / self.MIN_DURATION) * self.BUCKETS_PER_DOUBLING), self.BUCKETS - 1)
+        else:
+            index = 0
+        self._buckets[index] += 1
+        self._count += 1
+        self._total += duration
+        self._minimum = min(self._minimum, duration)
+        self._maximum = max(self._maximum, duration)
+
+    def aggregate(self) -> dict:
+        """Computes the aggregates of the durations (percentiles by nearest rank)"""
+        return {
+            "count": self._count,
+            "total_ms": round(self._total * 1000, 3),
+            "p50_ms": self.__percentile(50),
+            "p95_ms": self.__percentile(95),
+            "p99_ms": self.__percentile(99),
+        }
+
+    def __percentile(self, rank: int) -> float:
+        """Returns the middle of the bucket holding the duration of the given rank, in milliseconds"""
+        target = max(1, math.ceil(rank / 100 * self._count))
+        counted = 0
+        for index, count in enumerate(self._buckets):
+            counted += count
+            if counted >= target:
+                middle = self.MIN_DURATION * 2 ** ((index + 0.5) / self.BUCKETS_PER_DOUBLING)
+                # The middle of the first and last buckets can be far from the durations they hold
+                return round(min(max(middle, self._minimum), self._maximum) * 1000, 3)
+        return 0.0
@@ -12,9 +12,13 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import time
+
 from appium.webdriver.appium_connection import AppiumConnection
 from selenium.webdriver.remote.command import Command
 
+from src.testproject.classes.tracer import Tracer
+from src.testproject.helpers.step_helper import StepHelper
 from src.testproject.sdk.internal.agent import AgentClient
 from src.testproject.sdk.internal.helpers.reporting_command_executor import ReportingCommandExecutor
 
@@ -47,27 +51,49 @@ class CustomAppiumCommandExecutor(AppiumConnection, ReportingCommandExecutor):
         Returns:
             response: Response returned by the Selenium remote WebDriver server
         """
-        self.update_known_test_name()
+        # Nothing is added to commands when nothing is reported, quitting still goes through the regular path
+        if self._bypass_reporting and command != Command.QUIT:
+            return super().execute(command=command, params=params)
+
+        with Tracer.span(command, "command"):
+            # Phases of the execution are timed as laps, see CommandStats
+            started = time.perf_counter()
+
+            # Screenshots requested for the previous step must show the page before this command changes it
+            self.wait_for_screenshots()
+            lap = self.stats.lap("screenshot_wait", started)
+
+            self.update_known_test_name()
+            lap = self.stats.lap("test_name", lap)
+
+            response = {}
 
-        response = {}
+            self.step_helper.handle_timeout(self.settings.timeout)
+            lap = self.stats.lap("timeout", lap)
 
-        self.step_helper.handle_timeout(self.settings.timeout)
+            # Handling sleep before execution
+            self.step_helper.handle_sleep(self.settings.sleep_timing_type, self.settings.sleep_time, command)
+            lap = self.stats.lap("sleep", lap)
 
-        # Handling sleep before execution
-        self.step_helper.handle_sleep(self.settings.sleep_timing_type, self.settings.sleep_time, command)
+            # Preserve mobile sessions
+            if not command == Command.QUIT:
+                response = super().execute(command=command, params=params)
+                lap = self.stats.lap("selenium", lap)
 
-        # Preserve mobile sessions
-        if not command == Command.QUIT:
-            response = super().execute(command=command, params=params)
+                # The user changed the implicit wait, the step settings timeout must be sent again
+                if command in StepHelper.TIMEOUT_COMMANDS:
+                    self.step_helper.reset_timeout()
 
-        # Handling sleep after execution
-        self.step_helper.handle_sleep(self.settings.sleep_timing_type, self.settings.sleep_time, command, True)
+            # Handling sleep after execution
+            self.step_helper.handle_sleep(self.settings.sleep_timing_type, self.settings.sleep_time, command, True)
+            self.stats.lap("sleep", lap)
 
-        result = response.get("value")
+            result = response.get("value")
 
-        passed = self.is_command_passed(response=response)
+            passed = self.is_command_passed(response=response)
 
-        if not skip_reporting:
-            self._report_command(command, params, result, passed)
+            if not skip_reporting:
+                self._report_command(command, params, result, passed)
 
-        return response
+            self.stats.lap("total", started)
+            return response
@@ -18,15 +18,39 @@ from selenium.webdriver.remote.command import Command
 class RedactHelper:
     """Class providing helper methods for command redaction
 
+    The verdict of each element is remembered per element ID, element IDs are not reused by drivers. All verdicts
+    are forgotten whenever the page changes, since elements found before are no longer valid. Verdicts of elements
+    that are not secured are also forgotten after scripts run and elements are clicked, since those can turn them
+    into password fields (for example, show/hide password toggles).
+
     Args:
         command_executor: The command executor used to send WebDriver commands (Selenium or Appium)
+        prefetch (bool): True if elements should be checked for redaction as soon as they are found
 
     Attributes:
         _command_executor: The command executor used to send WebDriver commands (Selenium or Appium)
+        _prefetch_enabled (bool): True if elements should be checked for redaction as soon as they are found
+        _verdicts (dict): Whether typing into an element is redacted, by element ID
     """
 
-    def __init__(self, command_executor):
+    NAVIGATION_COMMANDS = (Command.GET, Command.REFRESH, Command.GO_BACK, Command.GO_FORWARD)
+    # Commands that can run page scripts, changing the type of elements
+    PAGE_SCRIPT_COMMANDS = (
+        Command.EXECUTE_SCRIPT,
+        Command.EXECUTE_ASYNC_SCRIPT,
+        Command.W3C_EXECUTE_SCRIPT,
+        Command.W3C_EXECUTE_SCRIPT_ASYNC,
+        Command.CLICK_ELEMENT,
+    )
+    FIND_ELEMENT_COMMANDS = (Command.FIND_ELEMENT, Command.FIND_CHILD_ELEMENT)
+
+    # Keys holding the element ID in find element responses (W3C and JSON Wire Protocol)
+    ELEMENT_KEYS = ("element-6066-11e4-a52e-4f735466cecf", "ELEMENT")
+
+    def __init__(self, command_executor, prefetch: bool = False):
         self._command_executor = command_executor
+        self._prefetch_enabled = prefetch
+        self._verdicts = {}
 
     def redact_command(self, command: str, params: dict):
         """Redacts sensitive contents (passwords) so they do not appear in the reports
@@ -41,7 +65,7 @@ class RedactHelper:
         if command == Command.SEND_KEYS_TO_ELEMENT or command == Command.SEND_KEYS_TO_ACTIVE_ELEMENT:
             element_id = params["id"]
 
-            if not self._redaction_required(element_id):
+            if not self.is_redacted(element_id):
                 return params
 
             # Change text typed into redactable field to '***'
@@ -50,6 +74,43 @@ class RedactHelper:
 
         return params
 
+    def is_redacted(self, element_id: str) -> bool:
+        """Checks if text typed into the element should be redacted, unless the element was already checked
+
+        Args:
+            element_id (str): The ID of the element under investigation
+
+        Returns:
+            bool: True if the element should be redacted, False otherwise
+        """
+        redacted = self._verdicts.get(element_id)
+        if redacted is None:
+            redacted = self._verdicts[element_id] = self._redaction_required(element_id)
+        return redacted
+
+    def invalidate(self):
+        """Forgets the verdicts of all elements, called when the page changes"""
+        self._verdicts.clear()
+
+    def invalidate_unsecured(self):
+        """Forgets the verdicts of the elements that are not secured, called after a script ran or a click"""
+        self._verdicts = {element_id: redacted for element_id, redacted in self._verdicts.items() if redacted}
+
+    def prefetch(self, command: str, result, passed: bool):
+        """Checks a found element for redaction right away if prefetching is enabled
+
+        Args:
+            command (str): The executed driver command
+            result: The value returned by the Selenium remote WebDriver server
+            passed (bool): True if the command execution was successful, False otherwise
+        """
+        if not self._prefetch_enabled or not passed or command not in self.FIND_ELEMENT_COMMANDS:
+            return
+        if isinstance(result, dict):
+            element_id = next((result[key] for key in self.ELEMENT_KEYS if key in result), None)
+            if element_id is not None:
+                self.is_redacted(element_id)
+
     def _redaction_required(self, element_id: str) -> bool:
         """Checks if the element should be redacted
 
@@ -13,17 +13,23 @@
 # limitations under the License.
 
 import logging
-import inspect
 import time
+from typing import Optional, Union
 
 from selenium.webdriver.remote.command import Command
 
 from src.testproject.classes import StepSettings
-from src.testproject.helpers import ReportHelper
+from src.testproject.classes.tracer import Tracer
+from src.testproject.classes.wait_context import WaitContext
+from src.testproject.enums import CommandReportsMode, SleepTimingType
+from src.testproject.helpers import ConfigHelper, ReportHelper
 from src.testproject.helpers.step_helper import StepHelper
 from src.testproject.rest.messages import DriverCommandReport, CustomTestReport
 from src.testproject.sdk.internal.agent import AgentClient
+from src.testproject.sdk.internal.helpers.command_report_buffer import CommandReportBuffer
+from src.testproject.sdk.internal.helpers.command_stats import CommandStats
 from src.testproject.sdk.internal.helpers.redact_helper import RedactHelper
+from src.testproject.sdk.internal.helpers.screenshot_pipeline import ScreenshotHandle, ScreenshotPipeline
 from src.testproject.sdk.internal.reporter import Reporter
 
 
@@ -45,6 +51,13 @@ class ReportingCommandExecutor:
         inside WebDriverWait
         _latest_known_test_name (str): contains latest known test name
         _excluded_test_names (list): contains a list of test names that should not be reported
+        _screenshots (ScreenshotPipeline): captures screenshots in the background, None if they are captured
+        on the test thread
+        _redact_helper (RedactHelper): redacts typed passwords, remembering whether each element is secured
+        _bypass_reporting (bool): True if commands are sent straight to the driver, without any step handling
+        _command_reports (CommandReportBuffer): keeps the latest driver command reports until a failure occurs,
+        None if all driver command reports are sent
+        _stats (CommandStats): time spent in each phase of the driver command execution
     """
 
     def __init__(self, agent_client: AgentClient, command_executor, remote_connection):
@@ -63,6 +76,23 @@ class ReportingCommandExecutor:
             agent_client.agent_session.session_id,
         )
         self._settings = StepSettings()
+        # Commands executed by Selenium wait loops are detected through the wait context
+        WaitContext.install_selenium_hook()
+        # Drivers without a remote connection (the generic driver) cannot capture screenshots
+        max_screenshots_in_flight = ConfigHelper.get_max_screenshots_in_flight()
+        self._screenshots = (
+            ScreenshotPipeline(self.__capture_screenshot, max_screenshots_in_flight)
+            if max_screenshots_in_flight > 0 and remote_connection is not None
+            else None
+        )
+        self._redact_helper = RedactHelper(self, ConfigHelper.get_redaction_prefetch())
+        self._bypass_reporting = False
+        self._stats = CommandStats()
+        self._command_reports = (
+            CommandReportBuffer(ConfigHelper.get_command_reports_buffer_size())
+            if ConfigHelper.get_command_reports_mode() is CommandReportsMode.OnFailure
+            else None
+        )
 
     @property
     def disable_reports(self) -> bool:
@@ -73,6 +103,7 @@ class ReportingCommandExecutor:
     def disable_reports(self, value: bool):
         """Setter for the disable_reports flag"""
         self._disable_reports = value
+        self._resolve_execution_mode()
 
     @property
     def disable_auto_test_reports(self) -> bool:
@@ -128,12 +159,18 @@ class ReportingCommandExecutor:
     def settings(self, value: StepSettings):
         """Setter for the settings object."""
         self._settings = value
+        self._resolve_execution_mode()
 
     @property
     def step_helper(self):
         """Getter for the StepHelper object."""
         return self._step_helper
 
+    @property
+    def stats(self) -> CommandStats:
+        """Getter for the time spent in each phase of the driver command execution"""
+        return self._stats
+
     @property
     def test_name(self) -> str:
         """Getter for the latest known test name"""
@@ -144,6 +181,22 @@ class ReportingCommandExecutor:
         """Setter for the latest known test name"""
         self._latest_known_test_name = new_name
 
+    def _resolve_execution_mode(self):
+        """Decides whether commands can bypass reporting and step handling, when reports or settings change
+
+        Commands are sent straight to the driver when all reporting is disabled, the step settings
+        neither set a timeout nor sleep around commands and commands are not traced.
+        """
+        sleeps = self._settings.sleep_timing_type in [SleepTimingType.Before, SleepTimingType.After]
+        bypass_reporting = self._disable_reports and self._settings.timeout <= 0 and not sleeps and not Tracer.enabled()
+        if bypass_reporting and not self._bypass_reporting:
+            # Screenshots of the last reported step must still show the page before the next command
+            self.wait_for_screenshots()
+        elif self._bypass_reporting and not bypass_reporting:
+            # The test may have changed the implicit wait while commands were bypassed
+            self.step_helper.reset_timeout()
+        self._bypass_reporting = bypass_reporting
+
     def _report_command(self, command: str, params: dict, result: dict, passed: bool):
         """Reports a driver command to the TestProject platform
 
@@ -157,24 +210,32 @@ class ReportingCommandExecutor:
         if command == Command.QUIT:
             if not self.disable_auto_test_reports:
                 self.report_test()
+            if self._screenshots is not None:
+                self._screenshots.close()
+            stats_file = ConfigHelper.get_command_stats_file()
+            if stats_file is not None:
+                self._stats.dump(stats_file)
             return  # This ensures that the actual driver.quit() command is not included in the report
 
+        # Elements found before navigating are no longer valid, neither are their redaction verdicts
+        if command in RedactHelper.NAVIGATION_COMMANDS:
+            self._redact_helper.invalidate()
+        elif command in RedactHelper.PAGE_SCRIPT_COMMANDS:
+            self._redact_helper.invalidate_unsecured()
+
         # Report commands to the agent only if reports are not disabled
         if self._disable_reports or self.disable_command_reports:
             logging.debug(f"Command [{command}] - [{'Passed' if passed is True else 'Failed'}]")
             return
 
         if not self._disable_redaction:
-            params = RedactHelper(self).redact_command(command, params)
+            started = time.perf_counter()
+            self._redact_helper.prefetch(command, result, passed)
+            params = self._redact_helper.redact_command(command, params)
+            self._stats.lap("redaction", started)
 
         # If the command is executed as part of a wait loop, we don't want to report it every time
-        self._is_webdriverwait = False
-
-        # See if the command is executed inside a wait loop
-        for frame in inspect.stack().__reversed__():
-            if str(frame.filename).find("wait.py") > 0:
-                self._is_webdriverwait = True
-                break
+        self._is_webdriverwait = WaitContext.active()
 
         # Handle step result and message.
         passed, step_message = self.step_helper.handle_step_result(
@@ -182,11 +243,12 @@ class ReportingCommandExecutor:
             invert_result=self.settings.invert_result,
             always_pass=self.settings.always_pass,
         )
-        screenshot = (
-            self.create_screenshot()
-            if self.step_helper.take_screenshot(self.settings.screenshot_condition, passed)
-            else None
-        )
+        if self.step_helper.take_screenshot(self.settings.screenshot_condition, passed):
+            started = time.perf_counter()
+            screenshot = self.request_screenshot()
+            self._stats.lap("screenshot", started)
+        else:
+            screenshot = None
 
         driver_command_report = DriverCommandReport(command, params, result, passed, screenshot, step_message)
 
@@ -199,10 +261,10 @@ class ReportingCommandExecutor:
         if not self._disable_reports and not self.disable_command_reports:
             if self._stashed_command is not None:
                 # report the stashed command and clear it
-                self.agent_client.report_driver_command(self._stashed_command)
+                self.__submit_command_report(self._stashed_command)
                 self._stashed_command = None
             # report the current command
-            self.agent_client.report_driver_command(driver_command_report)
+            self.__submit_command_report(driver_command_report)
 
     def update_known_test_name(self):
         """Infers the current test name and if different from the latest known test name, reports a test"""
@@ -216,6 +278,10 @@ class ReportingCommandExecutor:
             # so we need to report a test
             if not self.disable_auto_test_reports:
                 self.report_test()
+            elif not self._disable_reports:
+                # the test is not reported, but its buffered driver commands must not be attributed to the next one
+                passed, _ = ReportHelper.get_test_result(self._latest_known_test_name)
+                self.end_test_command_reports(passed)
             # update the latest known test name for future reports
             self._latest_known_test_name = current_test_name
 
@@ -225,19 +291,61 @@ class ReportingCommandExecutor:
         if not self._latest_known_test_name == "Unnamed Test":
 
             # only report those tests that have been identified as one when their names were inferred
+            # the result is recorded by the pytest plugin, tests are considered passed otherwise
+            passed, message = ReportHelper.get_test_result(self._latest_known_test_name)
+
             if self._disable_reports:
                 # test reporting has been disabled by the user
-                logging.debug(f"Test [{self._latest_known_test_name}] - [Passed]")
+                logging.debug(f"Test [{self._latest_known_test_name}] - [{'Passed' if passed else 'Failed'}]")
                 return
 
+            self.end_test_command_reports(passed)
+
             if self._latest_known_test_name in self._excluded_test_names:
                 # test has been marked as 'to be excluded, so do not report it
                 logging.debug(f"Test [{self._latest_known_test_name}] - Reporting skipped (marked as 'To be excluded')")
                 return
 
-            custom_test_report = CustomTestReport(name=self._latest_known_test_name, passed=True)
+            custom_test_report = CustomTestReport(name=self._latest_known_test_name, passed=passed, message=message)
             self.agent_client.report_test(custom_test_report)
 
+    def __submit_command_report(self, driver_command_report: DriverCommandReport):
+        """Sends a driver command report to the Agent, or buffers it until a failure occurs
+
+        Args:
+            driver_command_report (DriverCommandReport): The driver command report to send
+        """
+        started = time.perf_counter()
+        if self._command_reports is None:
+            self.agent_client.report_driver_command(driver_command_report)
+        elif driver_command_report.passed:
+            self._command_reports.add(driver_command_report)
+        else:
+            # Send the commands leading to the failure along with the failed command
+            self.flush_command_reports()
+            self.agent_client.report_driver_command(driver_command_report)
+        self._stats.lap("report", started)
+
+    def flush_command_reports(self):
+        """Sends the buffered driver command reports, called when a failure occurs"""
+        if self._command_reports is not None:
+            for driver_command_report in self._command_reports.flush():
+                self.agent_client.report_driver_command(driver_command_report)
+
+    def end_test_command_reports(self, passed: bool):
+        """Sends the buffered driver command reports if the test failed, and a summary of the unreported ones
+
+        Args:
+            passed (bool): True if the test passed, False otherwise
+        """
+        if self._command_reports is None:
+            return
+        if not passed:
+            self.flush_command_reports()
+        summary = self._command_reports.discard()
+        if summary is not None:
+            self.agent_client.report_step(summary)
+
     def create_screenshot(self) -> str:
         """Creates a screenshot (PNG) and returns it as a base64 encoded string
 
@@ -245,7 +353,44 @@ class ReportingCommandExecutor:
             str: The base64 encoded screenshot in PNG format (or None if screenshot taking fails)
         """
         create_screenshot_params = {"sessionId": self.agent_client.agent_session.session_id}
-        create_screenshot_response = self._command_executor.execute(Command.SCREENSHOT, create_screenshot_params, True)
+        with Tracer.span("screenshot", "screenshot"):
+            create_screenshot_response = self._command_executor.execute(
+                Command.SCREENSHOT, create_screenshot_params, True
+            )
+        try:
+            return create_screenshot_response["value"]
+        except KeyError as ke:
+            logging.error(f"Error occurred creating a screenshot: {ke}")
+            logging.error(f"Response from RemoteWebDriver: {create_screenshot_response}")
+            return None
+
+    def request_screenshot(self) -> Union[ScreenshotHandle, str, None]:
+        """Requests a screenshot to be included in a report, without waiting for it to be captured
+
+        Returns:
+            Union[ScreenshotHandle, str, None]: Handle resolved to the screenshot when the report is sent,
+            or the base64 encoded screenshot if screenshots are captured on the test thread
+        """
+        if self._screenshots is None:
+            return self.create_screenshot()
+        return self._screenshots.request()
+
+    def wait_for_screenshots(self):
+        """Waits until the requested screenshots have been captured, called before the page state changes"""
+        if self._screenshots is not None:
+            self._screenshots.wait()
+
+    def __capture_screenshot(self) -> Optional[str]:
+        """Captures a screenshot on the screenshot pipeline thread, bypassing step settings and reporting
+
+        Returns:
+            str: The base64 encoded screenshot in PNG format (or None if screenshot taking fails)
+        """
+        started = time.perf_counter()
+        create_screenshot_params = {"sessionId": self.agent_client.agent_session.session_id}
+        with Tracer.span("screenshot", "screenshot"):
+            create_screenshot_response = self.step_helper.executor.execute(Command.SCREENSHOT, create_screenshot_params)
+        self._stats.lap("screenshot_capture", started)
         try:
             return create_screenshot_response["value"]
         except KeyError as ke:
@@ -260,7 +405,7 @@ class ReportingCommandExecutor:
         if not self._disable_reports and not self.disable_command_reports:
             if self._stashed_command is not None:
                 # report the stashed command and clear it
-                self.agent_client.report_driver_command(self._stashed_command)
+                self.__submit_command_report(self._stashed_command)
                 self._stashed_command = None
 
     @staticmethod
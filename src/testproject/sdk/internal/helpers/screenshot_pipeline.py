@@ -0,0 +1,141 @@
+# Copyright 2021 TestProject (https://testproject.io)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import base64
+import binascii
+import logging
+import queue
+import threading
+from typing import Callable, Optional
+
+
+class ScreenshotHandle:
+    """Screenshot captured in the background, carried by a report in place of the base64 encoded image
+
+    The image is held as PNG bytes and is encoded to base64 only when the report holding it is serialized.
+
+    Attributes:
+        _captured (threading.Event): Set once the screenshot capture has completed, successfully or not
+        _png (Optional[bytes]): The captured image, None if the capture failed
+    """
+
+    def __init__(self):
+        self._captured = threading.Event()
+        self._png = None
+
+    @property
+    def captured(self) -> bool:
+        """Getter indicating whether the screenshot capture has completed"""
+        return self._captured.is_set()
+
+    @property
+    def png(self) -> Optional[bytes]:
+        """Getter for the captured image, waits until the capture has completed"""
+        self.wait()
+        return self._png
+
+    def wait(self):
+        """Waits until the capture has completed"""
+        self._captured.wait()
+
+    def set_result(self, png: Optional[bytes]):
+        """Completes the capture
+
+        Args:
+            png (Optional[bytes]): The captured image, None if the capture failed
+        """
+        self._png = png
+        self._captured.set()
+
+    def resolve(self) -> Optional[str]:
+        """Returns the screenshot as sent to the Agent, waits until the capture has completed
+
+        Returns:
+            str: The base64 encoded screenshot in PNG format (or None if screenshot taking failed)
+        """
+        png = self.png
+        return base64.b64encode(png).decode("ascii") if png is not None else None
+
+
+class ScreenshotPipeline:
+    """Captures screenshots on a background thread, so the test thread does not wait for them
+
+    Captures are taken one at a time, in the order they were requested.
+
+    Args:
+        capture (Callable[[], Optional[str]]): Takes a screenshot and returns it base64 encoded, None if it failed
+        max_in_flight (int): Maximum number of requested captures not completed yet, requesting another one
+            blocks until a capture completes
+
+    Attributes:
+        _capture (Callable[[], Optional[str]]): Takes a screenshot and returns it base64 encoded
+        _slots (threading.BoundedSemaphore): Limits the number of captures in flight
+        _requests (queue.Queue): Handles of the requested captures
+        _latest (ScreenshotHandle): Handle of the latest requested capture
+        _worker (threading.Thread): Thread capturing the screenshots, started on the first request
+    """
+
+    def __init__(self, capture: Callable[[], Optional[str]], max_in_flight: int):
+        self._capture = capture
+        self._slots = threading.BoundedSemaphore(max(1, max_in_flight))
+        self._requests = queue.Queue()
+        self._latest = None
+        self._worker = None
+
+    def request(self) -> ScreenshotHandle:
+        """Requests a screenshot capture
+
+        Returns:
+            ScreenshotHandle: handle resolved to the screenshot once it has been captured
+        """
+        self._slots.acquire()
+        if self._worker is None:
+            self._worker = threading.Thread(target=self.__capture_worker, name="screenshot-pipeline", daemon=True)
+            self._worker.start()
+        handle = ScreenshotHandle()
+        self._latest = handle
+        self._requests.put(handle)
+        return handle
+
+    def wait(self):
+        """Waits until all requested captures have completed, before the page state changes"""
+        latest = self._latest
+        if latest is not None:
+            latest.wait()
+
+    def close(self):
+        """Completes the requested captures and stops the background thread"""
+        if self._worker is not None:
+            self._requests.put(None)
+            self._worker.join()
+            self._worker = None
+
+    def __capture_worker(self):
+        """Worker method capturing the requested screenshots"""
+        while True:
+            handle = self._requests.get()
+            if handle is None:
+                return
+            png = None
+            try:
+                screenshot = self._capture()
+                if screenshot is not None:
+                    png = base64.b64decode(screenshot)
+            except (binascii.Error, ValueError) as e:
+                logging.error(f"Screenshot returned by the driver is not valid base64: {e}")
+            except Exception as e:
+                logging.error(f"Error occurred creating a screenshot: {e}")
+            handle.set_result(png)
+            self._slots.release()
@@ -60,11 +60,15 @@ class Reporter:
 
         if not self._command_executor.disable_reports:
 
+            if not passed:
+                # Send the driver commands leading to the failed step first
+                self._command_executor.flush_command_reports()
+
             step_report = StepReport(
                 description,
                 message,
                 passed,
-                self._command_executor.create_screenshot() if screenshot else None,
+                self._command_executor.request_screenshot() if screenshot else None,
                 element,
                 inputs,
                 outputs,
@@ -92,6 +96,8 @@ class Reporter:
                         "when creating a driver instance to avoid duplicates in the report"
                     )
 
+            self._command_executor.end_test_command_reports(passed)
+
             test_report = CustomTestReport(
                 name=name,
                 passed=passed,
@@ -142,3 +148,12 @@ class Reporter:
             excluded_test_names: list of strings containing tests that should not be reported.
         """
         self._command_executor.excluded_test_names = excluded_test_names
+
+    def stats(self) -> dict:
+        """Returns the time spent in each phase of the driver command execution so far
+
+        Returns:
+            dict: For each phase, the number of times it was recorded, its total duration and its 50th, 95th and
+            99th percentile durations in milliseconds
+        """
+        return self._command_executor.stats.summary()
@@ -1,3 +1,4 @@
 from .agent_session import AgentSession
+from .session_registry import SessionRegistry
 
-__all__ = ["AgentSession"]
+__all__ = ["AgentSession", "SessionRegistry"]
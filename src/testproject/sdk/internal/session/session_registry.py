@@ -0,0 +1,118 @@
+# Copyright 2021 TestProject (https://testproject.io)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import threading
+
+
+class SessionRegistry:
+    """Keeps track of the driver sessions running in the process and of the driver each thread works with.
+
+    Each driver has its own Agent client, reports queue and development socket, so drivers created by different
+    threads run concurrently. A driver is bound to the thread creating it, other threads can work with it after
+    binding it. Threads without a bound driver resolve to the most recently created active driver, as helper
+    threads of a single driver test always did.
+
+    Attributes:
+        _drivers (list): The active drivers, in creation order
+        _bound (threading.local): The drivers bound to each thread
+    """
+
+    _drivers = []
+    _lock = threading.Lock()
+    _bound = threading.local()
+
+    @classmethod
+    def register(cls, driver):
+        """Adds a newly created driver to the active drivers and binds it to the current thread
+
+        Args:
+            driver: The driver whose session was started
+        """
+        with cls._lock:
+            cls._drivers.append(driver)
+        cls.bind(driver)
+
+    @classmethod
+    def unregister(cls, driver):
+        """Removes a driver that quit from the active drivers, other threads it was bound to no longer resolve to it
+
+        Args:
+            driver: The driver whose session ended
+        """
+        with cls._lock:
+            cls._drivers = [active for active in cls._drivers if active is not driver]
+        cls._bound.drivers = [bound for bound in cls.__bound_drivers() if bound is not driver]
+
+    @classmethod
+    def bind(cls, driver):
+        """Binds a driver to the current thread, reports of the thread are sent through it
+
+        Args:
+            driver: The driver to use in the current thread
+        """
+        bound_drivers = cls.__bound_drivers()
+        if all(bound is not driver for bound in bound_drivers):
+            bound_drivers.append(driver)
+
+    @classmethod
+    def bound(cls, *driver_types):
+        """Returns the active driver of the given types bound to the current thread
+
+        Args:
+            driver_types: The driver classes to look for, in order of preference
+
+        Returns:
+            The driver bound to the current thread, None if there is none
+        """
+        with cls._lock:
+            active = {id(driver) for driver in cls._drivers}
+        # Drivers that quit in another thread are only dropped from the bindings of this thread now
+        bound_drivers = cls._bound.drivers = [driver for driver in cls.__bound_drivers() if id(driver) in active]
+        return next(
+            (driver for driver_type in driver_types for driver in bound_drivers if isinstance(driver, driver_type)),
+            None,
+        )
+
+    @classmethod
+    def current(cls, *driver_types):
+        """Returns the active driver of the given types the current thread works with
+
+        Args:
+            driver_types: The driver classes to look for, in order of preference
+
+        Returns:
+            The driver bound to the current thread, or else the most recently created driver, None if there is none
+        """
+        driver = cls.bound(*driver_types)
+        if driver is not None:
+            return driver
+        with cls._lock:
+            active = list(reversed(cls._drivers))
+        return next(
+            (driver for driver_type in driver_types for driver in active if isinstance(driver, driver_type)),
+            None,
+        )
+
+    @classmethod
+    def active(cls) -> list:
+        """Returns the active drivers, in creation order"""
+        with cls._lock:
+            return list(cls._drivers)
+
+    @classmethod
+    def __bound_drivers(cls) -> list:
+        """Returns the drivers bound to the current thread, the list is kept per thread"""
+        if not hasattr(cls._bound, "drivers"):
+            cls._bound.drivers = []
+        return cls._bound.drivers
@@ -15,6 +15,8 @@
 import logging
 import socket
 import select
+import threading
+from typing import Callable
 
 from src.testproject.sdk.exceptions import AgentConnectException
 
@@ -22,34 +24,51 @@ from src.testproject.sdk.exceptions import AgentConnectException
 class SocketManager:
     """Class used to manage the development TCP socket connection.
 
+    Each thread has its own instance, holding the development socket of the driver session started by the thread.
+
     Attributes:
-        __instance (SocketManager): The singleton instance of this class
+        __local (threading.local): Holds the instance of each thread
+        __socket (socket.socket): The connection to the Agent development socket
+        __lock (threading.RLock): Serializes the use of the socket between the session and the heartbeat thread
+        __heartbeat (threading.Thread): Checks the connection in the background, None if not started
+        __heartbeat_stopped (threading.Event): Set to stop the heartbeat thread
+        __on_disconnected (Callable): Called by the heartbeat thread once the Agent disconnected
     """
 
-    __instance = None
-
-    __socket = None
+    __local = threading.local()
 
     # Timeout for validation between the socket and the Agent in seconds.
     _SOCKET_VALIDATION_TIMEOUT = 15
 
     @classmethod
     def instance(cls):
-        """Return the singleton instance of the SocketManager class"""
-        if cls.__instance is None:
-            cls.__instance = SocketManager()
-        return cls.__instance
+        """Return the instance of the SocketManager class used by the current thread"""
+        if not hasattr(cls.__local, "instance"):
+            cls.__local.instance = SocketManager()
+        return cls.__local.instance
+
+    def __init__(self):
+        self.__socket = None
+        self.__lock = threading.RLock()
+        self.__heartbeat = None
+        self.__heartbeat_stopped = None
+        self.__on_disconnected = None
 
     def close_socket(self):
         """Close the connection to the Agent development socket"""
-        if self.is_connected():
+        with self.__lock:
+            self.stop_heartbeat()
+            if self.__socket is None:
+                return
             try:
-                SocketManager.__socket.shutdown(socket.SHUT_RDWR)
-                SocketManager.__socket.close()
-                SocketManager.__socket = None
-                logging.info("Connection to Agent closed successfully")
+                if self.is_connected():
+                    self.__socket.shutdown(socket.SHUT_RDWR)
+                    logging.info("Connection to Agent closed successfully")
+                self.__socket.close()
             except socket.error as msg:
                 logging.error(f"Failed to close socket connection to Agent: {msg}")
+            finally:
+                self.__socket = None
 
     def open_socket(self, socket_address: str, socket_port: int, uuid: str):
         """Opens a connection to the Agent development socket
@@ -60,59 +79,113 @@ class SocketManager:
             agent_version (str): The current agent version in use
             uuid (str): The returned UUID from the agent
         """
-
-        if SocketManager.__socket is not None:
-            logging.debug("open_socket(): Socket already exists")
-            return
-
-        if self.is_connected():
-            logging.debug("open_socket(): Socket is already connected")
-            return
-
-        SocketManager.__socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        SocketManager.__socket.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
-        SocketManager.__socket.connect((socket_address, socket_port))
-
-        if not self.is_connected():
-            raise AgentConnectException("Failed connecting to Agent socket")
-
-        # Validate connection to the Agent by waiting for a message starting from Agent 2.3.0.
-        # Only agent 2.3.0 or greater will return a none empty UUID.
-        if uuid:
-            logging.debug("Validating connection to the Agent...")
-            connected = False
-
-            # Check the agent responded with the correct UUID in both socket and agent response
-            # within the given timeout of 15 seconds
-            ready = select.select([SocketManager.__socket], [], [], self._SOCKET_VALIDATION_TIMEOUT)
-            if ready[0]:
-                # The response is in ASCII, convert it to string
-                # Take only from the 2nd index as the first 2 bytes represent a header
-                message = SocketManager.__socket.recv(36).decode()[2:]
-                if message == uuid:
-                    connected = True
-
-            if not connected:
-                raise AgentConnectException(
-                    f"SDK failed to connect to the Agent via a TCP socket on port {socket_port}.\n"
-                    + "Please check if you have any interfering software installed, and disable it."
-                )
-
-        logging.info(f"Socket connection to {socket_address}:{socket_port} established successfully")
-
-    @staticmethod
-    def is_connected() -> bool:
-        """Sends a simple message to the socket to see if it's connected
+        with self.__lock:
+            if self.is_connected():
+                logging.debug("open_socket(): Socket is already connected")
+                return
+
+            if self.__socket is not None:
+                # The Agent closed the connection of a previous session, connect again
+                logging.debug("open_socket(): Socket was disconnected by the Agent")
+                self.close_socket()
+
+            self.__socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            self.__socket.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+            self.__socket.connect((socket_address, socket_port))
+
+            # Validate connection to the Agent by waiting for a message starting from Agent 2.3.0.
+            # Only agent 2.3.0 or greater will return a none empty UUID.
+            if uuid:
+                logging.debug("Validating connection to the Agent...")
+                connected = False
+
+                # Check the agent responded with the correct UUID in both socket and agent response
+                # within the given timeout of 15 seconds
+                ready = select.select([self.__socket], [], [], self._SOCKET_VALIDATION_TIMEOUT)
+                if ready[0]:
+                    # The response is in ASCII, convert it to string
+                    # Take only from the 2nd index as the first 2 bytes represent a header
+                    message = self.__socket.recv(36).decode()[2:]
+                    if message == uuid:
+                        connected = True
+
+                if not connected:
+                    raise AgentConnectException(
+                        f"SDK failed to connect to the Agent via a TCP socket on port {socket_port}.\n"
+                        + "Please check if you have any interfering software installed, and disable it."
+                    )
+
+            # Checked after the validation, as checking the connection discards the data sent by the Agent
+            if not self.is_connected():
+                raise AgentConnectException("Failed connecting to Agent socket")
+
+            logging.info(f"Socket connection to {socket_address}:{socket_port} established successfully")
+
+    def is_connected(self) -> bool:
+        """Checks whether the socket is still connected to the Agent, without sending anything over it
+
+        The socket is polled without blocking. Data the Agent sent is read and discarded, as the SDK never reads it
+        after validating the connection. Once the Agent closes the connection, reading returns no data at all.
 
         Returns:
             bool: True if the socket is connected, False otherwise
         """
-        if SocketManager.__socket is None:
-            return False
-
-        try:
-            SocketManager.__socket.send("test".encode("utf-8"))
-            return True
-        except socket.error as msg:
-            logging.warning(f"Socket not connected: {msg}")
-            return False
+        with self.__lock:
+            connection = self.__socket
+            if connection is None:
+                return False
+
+            try:
+                while select.select([connection], [], [], 0)[0]:
+                    if not connection.recv(4096):
+                        logging.debug("Socket not connected: connection closed by the Agent")
+                        return False
+                return True
+            except (socket.error, ValueError) as msg:
+                logging.debug(f"Socket not connected: {msg}")
+                return False
+
+    def start_heartbeat(self, interval: float, on_disconnected: Callable):
+        """Checks the connection to the Agent on a background thread, until the socket is closed.
+
+        Once the Agent disconnected, the heartbeat closes the socket, notifies once and ends. The socket is
+        connected again, and the heartbeat started again, by the next driver session.
+
+        Args:
+            interval (float): Number of seconds between checks
+            on_disconnected (Callable): Called once the check finds the Agent disconnected
+        """
+        with self.__lock:
+            self.__on_disconnected = on_disconnected
+            if self.__heartbeat is not None:
+                return
+            self.__heartbeat_stopped = threading.Event()
+            self.__heartbeat = threading.Thread(
+                target=self.__check_connection,
+                args=(interval, self.__heartbeat_stopped),
+                name="agent-heartbeat",
+                daemon=True,
+            )
+            self.__heartbeat.start()
+
+    def stop_heartbeat(self):
+        """Stops checking the connection to the Agent in the background"""
+        with self.__lock:
+            if self.__heartbeat is not None:
+                self.__heartbeat_stopped.set()
+                self.__heartbeat = None
+
+    def __check_connection(self, interval: float, stopped: threading.Event):
+        """Heartbeat thread, closing the socket and notifying once the Agent disconnected"""
+        while not stopped.wait(interval):
+            with self.__lock:
+                # The socket may have been closed, or replaced by a new session, since the wait ended
+                if stopped.is_set() or self.is_connected():
+                    continue
+                on_disconnected = self.__on_disconnected
+                # Also stops the heartbeat
+                self.close_socket()
+            try:
+                on_disconnected()
+            except Exception as e:
+                logging.error(f"Failed handling the Agent disconnection: {e}")
@@ -0,0 +1,112 @@
+# Copyright 2021 TestProject (https://testproject.io)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import threading
+
+import pytest
+from selenium.webdriver.support.wait import WebDriverWait
+
+from src.testproject.classes.tracer import Tracer
+from src.testproject.classes.wait_context import WaitContext
+
+
+@pytest.fixture
+def trace(tmp_path):
+    """Starts tracing and returns a function writing and loading the trace events"""
+    Tracer.start()
+
+    def load() -> list:
+        trace_file = tmp_path / "trace.json"
+        Tracer.write(str(trace_file))
+        return read_trace(trace_file)
+
+    yield load
+    Tracer.stop()
+
+
+def read_trace(trace_file) -> list:
+    """Reads the events of a trace file, closing its JSON array as the trace viewers do"""
+    return json.loads(trace_file.read_text().rstrip().rstrip(",") + "]")
+
+
+def spans(events: list) -> list:
+    return [event for event in events if event["ph"] == "X"]
+
+
+def test_nothing_is_recorded_when_tracing_is_disabled(tmp_path):
+    with Tracer.span("findElement", "command"):
+        pass
+    Tracer.write(str(tmp_path / "trace.json"))
+
+    assert not Tracer.enabled()
+    assert not (tmp_path / "trace.json").exists()
+
+
+def test_spans_are_written_as_complete_events(trace):
+    with Tracer.span("findElement", "command"):
+        with Tracer.span("deliver", "report", reports=3):
+            pass
+
+    deliver, find_element = spans(trace())
+
+    assert (find_element["name"], find_element["cat"]) == ("findElement", "command")
+    assert (deliver["name"], deliver["cat"], deliver["args"]) == ("deliver", "report", {"reports": 3})
+    assert find_element["ts"] <= deliver["ts"]
+    assert deliver["ts"] + deliver["dur"] <= find_element["ts"] + find_element["dur"]
+
+
+def test_spans_are_recorded_on_the_thread_track(trace):
+    thread = threading.Thread(target=lambda: Tracer.span("send", "report").__enter__().__exit__(None, None, None))
+    thread.start()
+    thread.join()
+    with Tracer.span("get", "command"):
+        pass
+
+    events = trace()
+
+    tracks = {event["name"]: event["tid"] for event in spans(events)}
+    assert tracks == {"send": thread.ident, "get": threading.get_ident()}
+    thread_names = {event["tid"]: event["args"]["name"] for event in events if event["ph"] == "M"}
+    assert thread_names[thread.ident] == thread.name
+
+
+def test_failed_span_is_marked_with_the_error(trace):
+    with pytest.raises(ValueError):
+        with Tracer.span("click", "command"):
+            raise ValueError()
+
+    assert spans(trace())[0]["args"] == {"error": "ValueError"}
+
+
+def test_wait_loops_are_traced(trace):
+    WaitContext.install_selenium_hook()
+
+    WebDriverWait(driver=None, timeout=1).until(lambda driver: True)
+
+    assert [(event["name"], event["cat"]) for event in spans(trace())] == [("until", "wait")]
+
+
+def test_each_write_appends_the_spans_recorded_since_the_previous_one(trace, tmp_path):
+    with Tracer.span("get", "command"):
+        pass
+    trace()
+    with Tracer.span("click", "command"):
+        pass
+
+    events = trace()
+
+    assert [event["name"] for event in spans(events)] == ["get", "click"]
+    assert [event["tid"] for event in events if event["ph"] == "M"] == [threading.get_ident()]
+    assert Tracer._events == []
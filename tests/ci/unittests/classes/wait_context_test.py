@@ -0,0 +1,48 @@
+# Copyright 2021 TestProject (https://testproject.io)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import threading
+
+from selenium.webdriver.support.wait import WebDriverWait
+
+from src.testproject.classes.wait_context import WaitContext
+
+
+def test_wait_context_is_active_only_within_the_compound_statement():
+    assert not WaitContext.active()
+    with WaitContext():
+        with WaitContext():
+            assert WaitContext.active()
+        assert WaitContext.active()
+    assert not WaitContext.active()
+
+
+def test_wait_context_is_not_shared_between_threads():
+    other_thread_active = []
+    with WaitContext():
+        thread = threading.Thread(target=lambda: other_thread_active.append(WaitContext.active()))
+        thread.start()
+        thread.join()
+    assert other_thread_active == [False]
+
+
+def test_selenium_waits_run_within_a_wait_context():
+    WaitContext.install_selenium_hook()
+    WaitContext.install_selenium_hook()
+
+    wait = WebDriverWait(driver=None, timeout=1)
+
+    assert wait.until(lambda driver: WaitContext.active()) is True
+    assert wait.until_not(lambda driver: not WaitContext.active()) is False
+    assert not WaitContext.active()
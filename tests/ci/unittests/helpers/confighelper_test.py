@@ -44,3 +44,12 @@ def test_undefined_token_env_variable(monkeypatch):
 def test_predefined_token_env_variable_resolves_to_specified_value(monkeypatch):
     monkeypatch.setenv("TP_DEV_TOKEN", "some_token")
     assert ConfigHelper.get_developer_token() == "some_token"
+
+
+def test_reports_are_not_compressed_unless_enabled(monkeypatch):
+    monkeypatch.delenv("TP_REPORTS_COMPRESSION", raising=False)
+    assert ConfigHelper.get_reports_compression() == "none"
+    monkeypatch.setenv("TP_REPORTS_COMPRESSION", "brotli")
+    assert ConfigHelper.get_reports_compression() == "none"
+    monkeypatch.setenv("TP_REPORTS_COMPRESSION", "GZIP")
+    assert ConfigHelper.get_reports_compression() == "gzip"
@@ -12,11 +12,19 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import io
 import os
+import threading
+import types
+import unittest
+
 import pytest
+from selenium.webdriver.remote.remote_connection import RemoteConnection
 
+from benchmarks.fake_agent import FakeAgent
 from src.testproject.enums import ReportNamingElement
 from src.testproject.helpers import ReportHelper
+from src.testproject.sdk.drivers import webdriver
 
 
 def test_test_name_is_inferred_correctly_from_method_name():
@@ -40,3 +48,119 @@ def test_test_name_is_inferred_correctly_from_method_name_and_parameter_values(
         ReportHelper.infer_name_from_pytest_info_for(current_test_info, ReportNamingElement.Test)
         == f"test_test_name_is_inferred_correctly_from_method_name_and_parameter_values[{parameter}]"
     )
+
+
+def test_unittest_test_names_are_tracked_once_unittest_is_detected(monkeypatch):
+    monkeypatch.setattr(ReportHelper, "_ReportHelper__unittest_detected", None)
+    monkeypatch.setattr(ReportHelper, "_ReportHelper__unittest_hooked", False)
+    monkeypatch.setattr(unittest.TestCase, "run", unittest.TestCase.run)
+    monkeypatch.delenv("PYTEST_CURRENT_TEST")
+    observed = []
+
+    class SampleTest(unittest.TestCase):
+        def test_first(self):
+            observed.append((ReportHelper.infer_test_name(), ReportHelper.find_unittest_teardown()))
+
+        def test_second(self):
+            observed.append((ReportHelper.infer_test_name(), ReportHelper.find_unittest_teardown()))
+
+        def tearDown(self):
+            observed.append((ReportHelper.infer_test_name(), ReportHelper.find_unittest_teardown()))
+
+    module = types.ModuleType("sample_tests")
+    module.SampleTest = SampleTest
+    run = unittest.TestCase.run
+    unittest.main(module=module, argv=["sample_tests"], exit=False, testRunner=unittest.TextTestRunner(io.StringIO()))
+
+    # The first test is inferred from the call stack, later ones from the hook installed when unittest was detected
+    assert [in_teardown for _, in_teardown in observed[:2]] == [False, True]
+    assert observed[2:] == [("test_second", False), ("test_second", True)]
+
+    # The hook is removed once the last driver quit
+    assert unittest.TestCase.run is not run
+    ReportHelper.remove_unittest_hook()
+    assert unittest.TestCase.run is run
+
+
+def test_unittest_hook_is_removed_once_the_last_driver_quit(monkeypatch):
+    monkeypatch.setattr(ReportHelper, "_ReportHelper__unittest_detected", None)
+    monkeypatch.setattr(ReportHelper, "_ReportHelper__unittest_hooked", False)
+    monkeypatch.setattr(unittest.TestCase, "run", unittest.TestCase.run)
+    monkeypatch.delenv("PYTEST_CURRENT_TEST")
+    # The SDK version is read from the package metadata, which is missing when running from the source tree
+    monkeypatch.setenv("TP_SDK_VERSION", "0.0.0")
+    # Selenium 3 sends commands with the socket default timeout, which recent urllib3 versions reject
+    monkeypatch.setattr(RemoteConnection, "_timeout", 30)
+    # Names set by the pytest plugin, if enabled, would be used instead of detecting unittest
+    ReportHelper.clear_current_test()
+    agent = FakeAgent()
+    run = unittest.TestCase.run
+    hooked = []
+
+    class SampleTest(unittest.TestCase):
+        def test_driver(self):
+            driver = webdriver.Chrome(token="1234", agent_url=agent.address, project_name="Project", job_name="Job")
+            hooked.append(unittest.TestCase.run is not run)
+            driver.quit()
+            hooked.append(unittest.TestCase.run is not run)
+
+    module = types.ModuleType("sample_tests")
+    module.SampleTest = SampleTest
+    try:
+        unittest.main(
+            module=module, argv=["sample_tests"], exit=False, testRunner=unittest.TextTestRunner(io.StringIO())
+        )
+    finally:
+        agent.shutdown()
+
+    # The quit command infers the test name too, it must not install the hook again
+    assert hooked == [True, False]
+    assert unittest.TestCase.run is run
+
+
+SCRIPT = """
+def first_test():
+    names.append((ReportHelper.infer_test_name(), ReportHelper.infer_job_name()))
+    names.append((ReportHelper.infer_test_name(), ReportHelper.infer_job_name()))
+
+def second_test():
+    names.append((ReportHelper.infer_test_name(), ReportHelper.infer_job_name()))
+
+first_test()
+second_test()
+"""
+
+
+def test_names_are_inferred_from_the_function_called_by_module_level_code_without_a_framework(monkeypatch):
+    monkeypatch.delenv("PYTEST_CURRENT_TEST")
+    monkeypatch.setattr(ReportHelper, "_ReportHelper__unittest_detected", False)
+    names = []
+
+    # Run the script in its own thread, where it is the only module level code in the call stack
+    script = compile(SCRIPT, "sample_script.py", "exec")
+    thread = threading.Thread(target=exec, args=(script, {"ReportHelper": ReportHelper, "names": names}))
+    thread.start()
+    thread.join()
+
+    assert names == [
+        ("first_test", "sample_script"),
+        ("first_test", "sample_script"),
+        ("second_test", "sample_script"),
+    ]
+
+
+def test_test_results_are_kept_per_thread():
+    ReportHelper.set_test_result("test_sample", passed=False, message="Failed")
+    results = []
+
+    def run_test():
+        ReportHelper.set_test_result("test_sample", passed=True)
+        results.append(ReportHelper.get_test_result("test_sample"))
+
+    thread = threading.Thread(target=run_test)
+    thread.start()
+    thread.join()
+
+    assert results == [(True, None)]
+    assert ReportHelper.get_test_result("test_sample") == (False, "Failed")
+    assert ReportHelper.get_test_result("test_other") == (True, None)
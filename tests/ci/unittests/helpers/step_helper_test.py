@@ -0,0 +1,97 @@
+# Copyright 2021 TestProject (https://testproject.io)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from types import SimpleNamespace
+
+import pytest
+from selenium.webdriver.remote.remote_connection import RemoteConnection
+
+from benchmarks.fake_agent import FakeAgent
+from src.testproject.classes import DriverStepSettings, StepSettings
+from src.testproject.helpers.step_helper import StepHelper
+
+
+@pytest.fixture
+def fake_agent(monkeypatch):
+    # Use an explicit request timeout rather than the socket default
+    monkeypatch.setattr(RemoteConnection, "_timeout", 10)
+    agent = FakeAgent(record_requests=True)
+    yield agent
+    agent.shutdown()
+
+
+def sent_timeouts(agent: FakeAgent) -> list:
+    """Returns the (path, parsed JSON body) of every timeouts request received by the stub WebDriver"""
+    return [(path[len(agent.WEBDRIVER_PATH) :], body) for _, path, _, body in agent.requests if "/timeouts" in path]
+
+
+def test_timeout_is_sent_only_when_changed(fake_agent):
+    step_helper = StepHelper(RemoteConnection(fake_agent.webdriver_address), True, "session")
+
+    for timeout in [5000, 5000, 5000, 3000, 3000, 5000]:
+        step_helper.handle_timeout(timeout)
+
+    assert sent_timeouts(fake_agent) == [
+        ("/session/session/timeouts", {"sessionId": "session", "implicit": 5000}),
+        ("/session/session/timeouts", {"sessionId": "session", "implicit": 3000}),
+        ("/session/session/timeouts", {"sessionId": "session", "implicit": 5000}),
+    ]
+
+
+def test_timeout_is_sent_again_after_reset(fake_agent):
+    step_helper = StepHelper(RemoteConnection(fake_agent.webdriver_address), False, "session")
+
+    step_helper.handle_timeout(5000)
+    step_helper.reset_timeout()
+    step_helper.handle_timeout(5000)
+    step_helper.handle_timeout(5000)
+
+    assert (
+        sent_timeouts(fake_agent)
+        == [("/session/session/timeouts/implicit_wait", {"sessionId": "session", "ms": 5000})] * 2
+    )
+
+
+def test_timeout_is_sent_again_after_failure(fake_agent):
+    step_helper = StepHelper(RemoteConnection(fake_agent.webdriver_address), True, "session")
+
+    fake_agent.faults = [500]
+    step_helper.handle_timeout(5000)
+    step_helper.handle_timeout(5000)
+    step_helper.handle_timeout(5000)
+
+    # The failed request is not recorded, the timeout is sent again once afterwards
+    assert len(sent_timeouts(fake_agent)) == 1
+
+
+def test_no_timeout_is_sent_when_not_set(fake_agent):
+    step_helper = StepHelper(RemoteConnection(fake_agent.webdriver_address), True, "session")
+
+    step_helper.handle_timeout(-1)
+    step_helper.handle_timeout(0)
+
+    assert sent_timeouts(fake_agent) == []
+
+
+def test_driver_step_settings_resync_timeout_on_exit(fake_agent):
+    step_helper = StepHelper(RemoteConnection(fake_agent.webdriver_address), True, "session")
+    command_executor = SimpleNamespace(settings=StepSettings(timeout=5000), step_helper=step_helper)
+    driver = SimpleNamespace(command_executor=command_executor)
+
+    step_helper.handle_timeout(command_executor.settings.timeout)
+    with DriverStepSettings(driver, StepSettings(timeout=5000)):
+        step_helper.handle_timeout(command_executor.settings.timeout)
+    step_helper.handle_timeout(command_executor.settings.timeout)
+
+    assert len(sent_timeouts(fake_agent)) == 2
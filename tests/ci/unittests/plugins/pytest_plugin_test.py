@@ -0,0 +1,111 @@
+# Copyright 2021 TestProject (https://testproject.io)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from src.testproject.helpers import ReportHelper, activesessionhelper
+from src.testproject.plugins import pytest_plugin
+from src.testproject.sdk.internal.helpers import ReportingCommandExecutor
+from src.testproject.sdk.internal.session import SessionRegistry
+
+ITEM = SimpleNamespace(name="test_checkout[visa]", nodeid="tests/shop/checkout_test.py::test_checkout[visa]")
+
+
+def logreport(when: str, failed: bool = False) -> SimpleNamespace:
+    """Returns the report pytest logs once a phase of ITEM has completed"""
+    return SimpleNamespace(
+        nodeid=ITEM.nodeid, when=when, failed=failed, longreprtext="AssertionError" if failed else ""
+    )
+
+
+@pytest.fixture()
+def reported_tests(monkeypatch):
+    # Create a command executor without starting a session with the Agent, recording the tests it reports
+    reports = []
+    command_executor = ReportingCommandExecutor.__new__(ReportingCommandExecutor)
+    command_executor._agent_client = SimpleNamespace(report_test=reports.append)
+    command_executor._disable_reports = False
+    command_executor._disable_auto_test_reports = False
+    command_executor._excluded_test_names = []
+    command_executor._latest_known_test_name = ITEM.name
+    command_executor._command_reports = None
+    driver = SimpleNamespace(command_executor=command_executor)
+    monkeypatch.setattr(activesessionhelper, "get_active_driver_instance", lambda: driver)
+    monkeypatch.setattr(SessionRegistry, "active", lambda: [driver])
+    yield reports
+    ReportHelper.clear_current_test()
+
+
+def test_test_identity_is_set_when_the_test_is_set_up():
+    pytest_plugin.pytest_runtest_setup(ITEM)
+
+    assert ReportHelper.infer_test_name() == "test_checkout[visa]"
+    assert ReportHelper.infer_project_name() == "tests.shop"
+    assert ReportHelper.infer_job_name() == "checkout_test"
+
+    ReportHelper.clear_current_test()
+    assert ReportHelper.infer_test_name() == "test_test_identity_is_set_when_the_test_is_set_up"
+
+
+def test_test_identity_is_kept_per_thread():
+    pytest_plugin.pytest_runtest_setup(ITEM)
+    other_thread_names = []
+    thread = threading.Thread(target=lambda: other_thread_names.append(ReportHelper.infer_job_name()))
+    thread.start()
+    thread.join()
+
+    # Other threads infer the names from the test info stored by pytest
+    assert other_thread_names == ["pytest_plugin_test"]
+    assert ReportHelper.infer_job_name() == "checkout_test"
+    ReportHelper.clear_current_test()
+
+
+def test_test_identity_is_cleared_on_teardown_without_a_driver(monkeypatch):
+    monkeypatch.setattr(SessionRegistry, "active", lambda: [])
+    pytest_plugin.pytest_runtest_setup(ITEM)
+    pytest_plugin.pytest_runtest_teardown(ITEM)
+
+    assert ReportHelper.infer_test_name() == "test_test_identity_is_cleared_on_teardown_without_a_driver"
+
+
+def test_failed_test_is_reported_as_failed_on_teardown(reported_tests):
+    pytest_plugin.pytest_runtest_setup(ITEM)
+    pytest_plugin.pytest_runtest_logreport(logreport("setup"))
+    pytest_plugin.pytest_runtest_logreport(logreport("call", failed=True))
+    pytest_plugin.pytest_runtest_teardown(ITEM)
+
+    assert [(report.name, report.passed, report.message) for report in reported_tests] == [
+        ("test_checkout[visa]", False, "AssertionError")
+    ]
+
+
+def test_passed_test_is_reported_once(reported_tests):
+    pytest_plugin.pytest_runtest_setup(ITEM)
+    pytest_plugin.pytest_runtest_logreport(logreport("setup"))
+    pytest_plugin.pytest_runtest_logreport(logreport("call"))
+    pytest_plugin.pytest_runtest_teardown(ITEM)
+    # Quitting the driver afterwards does not report the test again
+    activesessionhelper.get_active_driver_instance().command_executor.report_test()
+
+    assert [(report.name, report.passed) for report in reported_tests] == [("test_checkout[visa]", True)]
+
+
+def test_result_is_recorded_under_the_node_id_of_the_report():
+    # The test identity is not set where tests are run by other processes, such as on a pytest-xdist controller
+    pytest_plugin.pytest_runtest_logreport(logreport("call", failed=True))
+
+    assert ReportHelper.get_test_result("test_checkout[visa]") == (False, "AssertionError")
@@ -0,0 +1,43 @@
+# Copyright 2021 TestProject (https://testproject.io)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from src.testproject.classes import ActionExecutionResponse
+from src.testproject.enums import ExecutionResultType
+from src.testproject.sdk.drivers.actions import Actions
+from src.testproject.sdk.internal.session import SessionRegistry
+
+
+class FakeDriver:
+    def __init__(self, command_executor):
+        self.command_executor = command_executor
+
+
+def test_action_runs_after_pending_screenshots_and_resets_the_applied_timeout(mocker):
+    calls = mocker.MagicMock()
+    agent_client = calls.agent_client
+    agent_client.send_action_execution_request.return_value = ActionExecutionResponse(ExecutionResultType.Passed)
+    command_executor = calls.command_executor
+    command_executor.agent_client = agent_client
+    driver = FakeDriver(command_executor)
+    SessionRegistry.register(driver)
+    try:
+        Actions(agent_client, timeout=10).pause(1)
+    finally:
+        SessionRegistry.unregister(driver)
+
+    assert [call[0] for call in calls.mock_calls] == [
+        "command_executor.wait_for_screenshots",
+        "agent_client.send_action_execution_request",
+        "command_executor.step_helper.reset_timeout",
+    ]
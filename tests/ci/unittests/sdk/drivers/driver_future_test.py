@@ -0,0 +1,154 @@
+# Copyright 2021 TestProject (https://testproject.io)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import threading
+import time
+
+import pytest
+from selenium.webdriver.remote.remote_connection import RemoteConnection
+
+from benchmarks.fake_agent import FakeAgent
+from src.testproject.sdk.drivers import webdriver
+from src.testproject.sdk.drivers.webdriver import DriverFuture, DriverPool
+from src.testproject.sdk.exceptions import SdkException
+from src.testproject.sdk.internal.session import SessionRegistry
+
+
+class FakeDriver:
+    """Driver registering itself like the SDK drivers, once allowed to start its session"""
+
+    start = threading.Event()
+    created = []
+
+    def __init__(self, **kwargs):
+        if not FakeDriver.start.wait(5):
+            raise SdkException("Session not started")
+        self.kwargs = kwargs
+        self.creating_thread = threading.current_thread()
+        self.quit_count = 0
+        FakeDriver.created.append(self)
+        SessionRegistry.register(self)
+
+    def quit(self):
+        self.quit_count += 1
+        SessionRegistry.unregister(self)
+
+
+@pytest.fixture(autouse=True)
+def fake_driver():
+    FakeDriver.start.set()
+    FakeDriver.created = []
+    yield
+    for driver in SessionRegistry.active():
+        SessionRegistry.unregister(driver)
+
+
+def test_driver_is_created_in_the_background_and_bound_to_the_caller():
+    FakeDriver.start.clear()
+    future = DriverFuture(FakeDriver, project_name="Project", job_name="Job")
+    assert not future.done()
+
+    FakeDriver.start.set()
+    driver = future.result(timeout=5)
+
+    assert driver.creating_thread is not threading.current_thread()
+    assert driver.kwargs == {"project_name": "Project", "job_name": "Job"}
+    assert SessionRegistry.bound(FakeDriver) is driver
+
+
+def test_project_and_job_names_are_inferred_by_the_caller(monkeypatch):
+    monkeypatch.delenv("TP_UPDATE_JOB_NAME", raising=False)
+
+    driver = DriverFuture(FakeDriver).result(timeout=5)
+
+    assert driver.kwargs["project_name"].endswith("unittests.sdk.drivers")
+    assert driver.kwargs["job_name"] == "driver_future_test"
+
+
+def test_result_times_out_while_the_session_is_starting():
+    FakeDriver.start.clear()
+    future = DriverFuture(FakeDriver, disable_reports=True)
+
+    with pytest.raises(SdkException, match="not created within"):
+        future.result(timeout=0.01)
+    FakeDriver.start.set()
+    assert future.result(timeout=5) is not None
+
+
+def open_sockets() -> int:
+    """Returns the number of sockets opened by the process"""
+    sockets = 0
+    for fd in os.listdir("/proc/self/fd"):
+        try:
+            sockets += os.readlink(f"/proc/self/fd/{fd}").startswith("socket:")
+        except OSError:
+            pass  # The descriptor of the listing itself is closed already
+    return sockets
+
+
+def test_result_rejects_binding_when_the_thread_already_has_a_driver():
+    driver = FakeDriver()
+    future = DriverFuture(FakeDriver, disable_reports=True)
+
+    with pytest.raises(SdkException, match="already exists"):
+        future.result(timeout=5)
+    assert SessionRegistry.bound(FakeDriver) is driver
+
+    driver.quit()
+    assert future.result(timeout=5) is not driver
+
+
+@pytest.mark.skipif(not os.path.isdir("/proc/self/fd"), reason="Open sockets are counted through /proc")
+def test_drivers_created_in_the_background_release_their_threads_and_sockets(monkeypatch):
+    # The SDK version is read from the package metadata, which is missing when running from the source tree
+    monkeypatch.setenv("TP_SDK_VERSION", "0.0.0")
+    # Selenium 3 sends commands with the socket default timeout, which recent urllib3 versions reject
+    monkeypatch.setattr(RemoteConnection, "_timeout", 30)
+    agent = FakeAgent()
+    try:
+
+        def run_test():
+            driver = DriverFuture(
+                webdriver.Chrome, token="1234", agent_url=agent.address, project_name="Project", job_name="Job"
+            ).result(timeout=10)
+            driver.title
+            driver.quit()
+
+        # Arrange - The first test opens the keep-alive connections shared by all drivers
+        run_test()
+        threads, sockets = threading.active_count(), open_sockets()
+
+        # Act
+        for _ in range(5):
+            run_test()
+
+        # Assert - Threads of the reports queues and the heartbeats take a moment to end once stopped
+        deadline = time.monotonic() + 5
+        while threading.active_count() > threads and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert threading.active_count() <= threads
+        assert open_sockets() <= sockets
+    finally:
+        agent.shutdown()
+
+
+def test_pool_replaces_taken_drivers_and_quits_the_others_when_closed():
+    with DriverPool(FakeDriver, size=2, disable_reports=True) as pool:
+        driver = pool.acquire(timeout=5)
+        driver.quit()
+
+    assert len(FakeDriver.created) == 3
+    assert [created.quit_count for created in FakeDriver.created] == [1, 1, 1]
+    assert SessionRegistry.active() == []
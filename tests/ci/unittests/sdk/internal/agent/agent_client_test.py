@@ -12,15 +12,20 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import time
+
 import pytest
 import responses
 
 from selenium.webdriver.common.by import By
 from src.testproject.classes import ProxyDescriptor
 from src.testproject.sdk.addons import ActionProxy
+from src.testproject.rest.messages import StepReport
 from src.testproject.rest.messages.agentstatusresponse import AgentStatusResponse
+from src.testproject.rest.messages.sessionresponse import SessionResponse
 from src.testproject.sdk.exceptions import SdkException, AgentConnectException
 from src.testproject.sdk.internal.agent import AgentClient
+from src.testproject.sdk.internal.agent.reports_queue import ReportsQueue
 from src.testproject.helpers import ConfigHelper
 
 
@@ -109,3 +114,70 @@ def test_action_proxy_payload_is_correctly_formatted():
     assert payload["className"] == "my_classname"
     assert payload["guid"] == "my_guid"
     assert payload["parameters"] == {"key": "value"}
+
+
+def test_http_session_is_shared_between_calls():
+    assert AgentClient.http_session() is AgentClient.http_session()
+
+
+def test_send_request_reuses_the_agent_connection(fake_agent):
+
+    # Arrange - Create a client without starting a session with the Agent
+    agent_client = AgentClient.__new__(AgentClient)
+    agent_client._token = "1234"
+    agent_client._remote_address = fake_agent.address
+
+    # Act - Execute several actions in a row
+    for _ in range(5):
+        agent_client.send_action_execution_request("my_guid", {"key": "value"})
+
+    # Assert - All requests were sent over a single TCP connection
+    assert len(fake_agent.client_ports) == 5
+    assert len(set(fake_agent.client_ports)) == 1
+
+
+def test_job_name_is_updated_with_the_agent(fake_agent, monkeypatch):
+    monkeypatch.setenv("TP_UPDATE_JOB_NAME", "True")
+    agent_client = AgentClient.__new__(AgentClient)
+    agent_client._token = "1234"
+    agent_client._remote_address = fake_agent.address
+
+    agent_client.update_job_name("Nightly")
+
+    assert [(request[0], request[1], request[3]) for request in fake_agent.requests] == [
+        ("PUT", "/api/development/session", {"jobName": "Nightly"})
+    ]
+
+
+def test_request_timeout_can_be_overridden_per_method(monkeypatch):
+    monkeypatch.setenv("TP_AGENT_POST_TIMEOUT", "2500")
+    assert AgentClient.request_timeout("POST") == 2.5
+    assert AgentClient.request_timeout("GET") == AgentClient.REQUEST_TIMEOUTS["GET"]
+
+
+def test_reports_of_each_driver_session_are_sent_in_order_and_sessions_concurrently(fake_agent):
+    fake_agent.delay = 0.05
+    reports_queue = ReportsQueue(token="1234", workers=2)
+
+    # Arrange - Create clients of two driver sessions sharing a reports queue, without starting them with the Agent
+    agent_clients = []
+    for session_id in ["first", "second"]:
+        agent_client = AgentClient.__new__(AgentClient)
+        agent_client._remote_address = fake_agent.address
+        agent_client._reports_queue = reports_queue
+        agent_client._agent_response = SessionResponse(None, None, session_id, None, {}, None, None, None, None, [])
+        agent_clients.append(agent_client)
+
+    # Act - Report steps of both sessions
+    start_time = time.perf_counter()
+    for i in range(5):
+        for agent_client in agent_clients:
+            description = f"{agent_client._agent_response.session_id} {i}"
+            agent_client.report_step(StepReport(description=description, message="", passed=True))
+    reports_queue.stop()
+
+    # Assert - 10 requests sent one at a time would take at least half a second
+    assert time.perf_counter() - start_time < 0.45
+    steps = [request[3]["description"] for request in fake_agent.requests]
+    for session_id in ["first", "second"]:
+        assert [step for step in steps if step.startswith(session_id)] == [f"{session_id} {i}" for i in range(5)]
@@ -0,0 +1,40 @@
+# Copyright 2021 TestProject (https://testproject.io)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import json
+
+import pytest
+
+from src.testproject.sdk.internal.agent.report_encoder import ReportEncoder
+
+
+@pytest.fixture()
+def restore_encoder():
+    yield
+    ReportEncoder.register(None)
+
+
+def test_encoded_reports_are_joined_into_a_json_array():
+    reports = [{"type": "Command", "passed": True, "screenshot": None}, {"type": "Test", "name": "ünïcode"}]
+
+    payload = ReportEncoder.encode_array([ReportEncoder.encode(report) for report in reports])
+
+    assert json.loads(payload) == reports
+
+
+def test_custom_encoder_can_be_registered(restore_encoder):
+    ReportEncoder.register(lambda obj: json.dumps(obj, sort_keys=True).encode("utf-8"))
+
+    assert ReportEncoder.encode({"b": 1, "a": 2}) == b'{"a": 2, "b": 1}'
@@ -0,0 +1,52 @@
+# Copyright 2021 TestProject (https://testproject.io)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import threading
+
+from src.testproject.sdk.internal.agent.reports_flush import ReportsFlush
+from src.testproject.sdk.internal.agent.reports_queue import ReportsQueue
+
+
+def test_background_delivery_completes_the_handle():
+    release = threading.Event()
+    reports_flush = ReportsFlush.run(lambda: release.wait(5))
+
+    assert not reports_flush.wait(timeout=0.01)
+    release.set()
+    assert reports_flush.wait(timeout=5)
+    assert reports_flush.done()
+
+
+def test_handle_can_be_awaited():
+    reports_flush = ReportsFlush()
+    threading.Timer(0.01, reports_flush.complete).start()
+
+    loop = asyncio.new_event_loop()
+    try:
+        assert loop.run_until_complete(asyncio.wait_for(reports_flush, timeout=5))
+    finally:
+        loop.close()
+
+
+def test_flush_request_completes_once_earlier_reports_are_delivered(fake_agent):
+    reports_queue = ReportsQueue(token="1234")
+
+    for i in range(5):
+        reports_queue.submit(report_as_json={"index": i}, url=f"{fake_agent.address}/report", block=False)
+    reports_flush = reports_queue.flush_async()
+
+    assert reports_flush.wait(timeout=5)
+    assert reports_queue.reports_sent == 5
+    reports_queue.stop()
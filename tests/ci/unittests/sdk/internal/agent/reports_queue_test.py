@@ -0,0 +1,459 @@
+# Copyright 2021 TestProject (https://testproject.io)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+from src.testproject.enums import ReportsOverflowPolicy
+from src.testproject.sdk.internal.agent.report_compressor import ReportCompressor
+from src.testproject.sdk.internal.agent.reports_queue import ReportsQueue, QueueItem
+from src.testproject.sdk.internal.agent.reports_queue_batch import ReportsQueueBatch
+from src.testproject.sdk.internal.agent.retry_policy import RetryPolicy
+
+
+def test_reports_are_sent_over_a_single_connection(fake_agent):
+    reports_queue = ReportsQueue(token="1234")
+
+    for i in range(20):
+        reports_queue.submit(report_as_json={"index": i}, url=f"{fake_agent.address}/report", block=False)
+    reports_queue.stop()
+
+    assert [request[3] for request in fake_agent.requests] == [{"index": i} for i in range(20)]
+    assert len(set(fake_agent.client_ports)) == 1
+    assert reports_queue.reports_sent == 20
+    assert reports_queue.drain_rate > 0
+
+
+def test_batch_reports_queue_counts_every_report_in_a_batch(fake_agent):
+    reports_queue = ReportsQueueBatch(token="1234", url=f"{fake_agent.address}/batch")
+
+    for i in range(20):
+        reports_queue.submit(report_as_json={"index": i}, url=None, block=False)
+    reports_queue.stop()
+
+    assert [report for request in fake_agent.requests for report in request[3]] == [{"index": i} for i in range(20)]
+    assert len(set(fake_agent.client_ports)) == 1
+    assert reports_queue.reports_sent == 20
+
+
+def test_batch_is_sent_when_it_reaches_the_maximum_number_of_reports(fake_agent, monkeypatch):
+    monkeypatch.setenv("TP_MAX_REPORTS_BATCH_SIZE", "25")
+    monkeypatch.setenv("TP_REPORTS_BATCH_LINGER_MS", "10000")
+    reports_queue = ReportsQueueBatch(token="1234", url=f"{fake_agent.address}/batch")
+
+    for i in range(60):
+        reports_queue.submit(report_as_json={"index": i}, url=None, block=False)
+    reports_queue.stop()
+
+    assert [len(request[3]) for request in fake_agent.requests] == [25, 25, 10]
+
+
+def test_batch_is_sent_before_exceeding_the_maximum_payload_size(fake_agent, monkeypatch):
+    monkeypatch.setenv("TP_MAX_REPORTS_BATCH_BYTES", "1000")
+    monkeypatch.setenv("TP_REPORTS_BATCH_LINGER_MS", "10000")
+    reports_queue = ReportsQueueBatch(token="1234", url=f"{fake_agent.address}/batch")
+
+    for i in range(3):
+        reports_queue.submit(report_as_json={"screenshot": "x" * 400}, url=None, block=False)
+    reports_queue.stop()
+
+    assert [len(request[3]) for request in fake_agent.requests] == [2, 1]
+
+
+def test_batch_is_sent_when_the_linger_window_passes(fake_agent, monkeypatch):
+    monkeypatch.setenv("TP_REPORTS_BATCH_LINGER_MS", "50")
+    reports_queue = ReportsQueueBatch(token="1234", url=f"{fake_agent.address}/batch")
+
+    for i in range(5):
+        reports_queue.submit(report_as_json={"index": i}, url=None, block=False)
+    time.sleep(0.5)
+
+    # The reports are sent as a single batch without waiting for the queue to stop
+    assert [len(request[3]) for request in fake_agent.requests] == [5]
+    reports_queue.stop()
+
+
+def test_batches_are_sent_gzip_compressed(fake_agent, monkeypatch):
+    monkeypatch.setenv("TP_REPORTS_BATCH_LINGER_MS", "10000")
+    reports_queue = ReportsQueueBatch(
+        token="1234", url=f"{fake_agent.address}/batch", compressor=ReportCompressor("gzip", level=1)
+    )
+
+    reports = [{"index": i, "screenshot": "iVBORw0KGgo" * 100} for i in range(10)]
+    for report in reports:
+        reports_queue.submit(report_as_json=report, url=None, block=False)
+    reports_queue.stop()
+
+    assert fake_agent.content_encodings == ["gzip"]
+    assert fake_agent.requests[0][3] == reports
+    assert fake_agent.bytes_received < len(json.dumps(reports)) / 10
+
+
+def test_only_reports_large_enough_are_compressed(fake_agent):
+    reports_queue = ReportsQueue(token="1234", compressor=ReportCompressor("deflate"))
+
+    reports_queue.submit(report_as_json={"index": 0}, url=f"{fake_agent.address}/report", block=False)
+    reports_queue.submit(report_as_json={"screenshot": "x" * 2048}, url=f"{fake_agent.address}/report", block=False)
+    reports_queue.stop()
+
+    assert fake_agent.content_encodings == [None, "deflate"]
+    assert [request[3] for request in fake_agent.requests] == [{"index": 0}, {"screenshot": "x" * 2048}]
+
+
+def test_reports_with_different_ordering_keys_are_sent_concurrently(fake_agent):
+    fake_agent.delay = 0.05
+    reports_queue = ReportsQueue(token="1234", workers=4)
+
+    start_time = time.perf_counter()
+    for i in range(5):
+        for session in range(4):
+            reports_queue.submit(
+                report_as_json={"session": session, "index": i},
+                url=f"{fake_agent.address}/report",
+                block=False,
+                ordering_key=session,
+            )
+    reports_queue.stop()
+
+    # 20 requests sent one at a time would take at least a second
+    assert time.perf_counter() - start_time < 0.6
+    assert reports_queue.reports_sent == 20
+    for session in range(4):
+        reports = [request[3] for request in fake_agent.requests if request[3]["session"] == session]
+        assert reports == [{"session": session, "index": i} for i in range(5)]
+
+
+def test_reports_sharing_an_ordering_key_are_sent_in_order_by_a_worker_pool(fake_agent):
+    reports_queue = ReportsQueueBatch(token="1234", url=f"{fake_agent.address}/batch", workers=4)
+
+    for i in range(50):
+        reports_queue.submit(report_as_json={"index": i}, url=None, block=False)
+    reports_queue.stop()
+
+    assert [report for request in fake_agent.requests for report in request[3]] == [{"index": i} for i in range(50)]
+    assert reports_queue.reports_sent == 50
+
+
+def test_report_is_retried_after_server_errors_and_connection_resets(fake_agent):
+    fake_agent.faults = [500, "reset", 503]
+    reports_queue = ReportsQueue(token="1234", retry_policy=RetryPolicy(base_delay=0.001))
+
+    reports_queue.submit(report_as_json={"index": 0}, url=f"{fake_agent.address}/report", block=False)
+    reports_queue.stop()
+
+    assert [request[3] for request in fake_agent.requests] == [{"index": 0}]
+    assert reports_queue.retry_policy.retry_tokens == 50 - 3 + 0.1
+
+
+def test_report_rejected_by_the_agent_is_not_retried(fake_agent):
+    fake_agent.faults = [400]
+    reports_queue = ReportsQueue(token="1234", retry_policy=RetryPolicy(base_delay=0.001))
+
+    reports_queue.submit(report_as_json={"index": 0}, url=f"{fake_agent.address}/report", block=False)
+    reports_queue.submit(report_as_json={"index": 1}, url=f"{fake_agent.address}/report", block=False)
+    reports_queue.stop()
+
+    assert [request[3] for request in fake_agent.requests] == [{"index": 1}]
+    assert reports_queue.reports_sent == 1
+
+
+def test_retries_stop_when_the_retry_budget_is_exhausted(fake_agent):
+    fake_agent.faults = [500, 500]
+    retry_policy = RetryPolicy(base_delay=0.001, retry_budget=1, failure_threshold=10)
+    reports_queue = ReportsQueue(token="1234", retry_policy=retry_policy)
+
+    reports_queue.submit(report_as_json={"index": 0}, url=f"{fake_agent.address}/report", block=False)
+    reports_queue.submit(report_as_json={"index": 1}, url=f"{fake_agent.address}/report", block=False)
+    reports_queue.stop()
+
+    # The first report used up the only retry token, so it is dropped after its second attempt
+    assert [request[3] for request in fake_agent.requests] == [{"index": 1}]
+
+
+def test_reports_are_parked_while_the_circuit_is_open_and_keep_their_order(fake_agent):
+    fake_agent.faults = [500, 500, 500, 500]
+    retry_policy = RetryPolicy(max_attempts=1, failure_threshold=2, reset_timeout=0.2)
+    reports_queue = ReportsQueue(token="1234", retry_policy=retry_policy)
+
+    for i in range(5):
+        reports_queue.submit(report_as_json={"index": i}, url=f"{fake_agent.address}/report", block=False)
+    reports_queue.stop()
+
+    # The first report is dropped, the second one opens the circuit and is delivered once the Agent recovers
+    assert [request[3] for request in fake_agent.requests] == [{"index": i} for i in range(1, 5)]
+    assert not retry_policy.circuit_open
+
+
+@pytest.fixture()
+def blocked_reports_queue(fake_agent, tmp_path, monkeypatch):
+    # Create reports queues whose reporting thread is held up until the test releases it
+    monkeypatch.setenv("TP_REPORTS_SPOOL_DIR", str(tmp_path))
+    release = threading.Event()
+
+    def create(capacity, overflow_policy):
+        reports_queue = ReportsQueue(token="1234", capacity=capacity, overflow_policy=overflow_policy)
+        reports_queue.submit(
+            report_as_json={"type": "Step", "hold": True}, url=f"{fake_agent.address}/report", block=False
+        )
+        time.sleep(0.1)
+        return reports_queue
+
+    original_send = QueueItem.send
+
+    def held_send(item, session, retry_policy, compressor=None):
+        if item.report_as_json and item.report_as_json.get("hold"):
+            release.wait()
+        return original_send(item, session, retry_policy, compressor)
+
+    monkeypatch.setattr(QueueItem, "send", held_send)
+    yield create, release
+    release.set()
+
+
+def spooled_files(spool_dir) -> list:
+    """Returns the spool and journal files kept in a spool directory"""
+    return sorted(path for path in spool_dir.rglob("*") if path.is_file())
+
+
+def submit_reports(reports_queue, url):
+    reports_queue.submit(report_as_json={"type": "Command", "screenshot": "a"}, url=url, block=False)
+    reports_queue.submit(report_as_json={"type": "Step", "screenshot": "b"}, url=url, block=False)
+    reports_queue.submit(report_as_json={"type": "Command", "screenshot": "c"}, url=url, block=False)
+
+
+def test_command_reports_are_dropped_when_the_queue_is_full(fake_agent, blocked_reports_queue):
+    create, release = blocked_reports_queue
+    reports_queue = create(capacity=1, overflow_policy=ReportsOverflowPolicy.DropCommands)
+
+    start_time = time.monotonic()
+    reports_queue.submit(report_as_json={"type": "Test"}, url=f"{fake_agent.address}/report", block=False)
+    submit_reports(reports_queue, f"{fake_agent.address}/report")
+    # Step and test reports are queued beyond the capacity instead of waiting for room
+    assert time.monotonic() - start_time < 0.1
+    release.set()
+    reports_queue.stop()
+
+    reported = [request[3]["type"] for request in fake_agent.requests]
+    assert reported == ["Step", "Test", "Step"]
+    assert reports_queue.overflow_counts[ReportsOverflowPolicy.DropCommands] == 2
+    assert reports_queue.overflow_counts[ReportsOverflowPolicy.Block] == 0
+
+
+def test_screenshots_are_stripped_when_the_queue_is_full(fake_agent, blocked_reports_queue):
+    create, release = blocked_reports_queue
+    reports_queue = create(capacity=1, overflow_policy=ReportsOverflowPolicy.StripScreenshots)
+
+    submit_reports(reports_queue, f"{fake_agent.address}/report")
+    release.set()
+    reports_queue.stop()
+
+    assert [request[3].get("screenshot") for request in fake_agent.requests] == [None, "a", None, None]
+    assert reports_queue.overflow_counts[ReportsOverflowPolicy.StripScreenshots] == 2
+
+
+def test_reports_are_spilled_to_disk_when_the_queue_is_full(fake_agent, blocked_reports_queue, tmp_path):
+    create, release = blocked_reports_queue
+    reports_queue = create(capacity=1, overflow_policy=ReportsOverflowPolicy.SpillToDisk)
+
+    submit_reports(reports_queue, f"{fake_agent.address}/report")
+    assert len(spooled_files(tmp_path)) == 1
+    release.set()
+    reports_queue.stop()
+
+    assert [request[3].get("screenshot") for request in fake_agent.requests] == [None, "a", "b", "c"]
+    assert reports_queue.overflow_counts[ReportsOverflowPolicy.SpillToDisk] == 2
+    assert spooled_files(tmp_path) == []
+
+
+def test_reports_are_kept_in_memory_when_they_cannot_be_spilled_to_disk(
+    fake_agent, blocked_reports_queue, tmp_path, monkeypatch
+):
+    create, release = blocked_reports_queue
+    # The spool directory cannot be created below a regular file
+    blocker = tmp_path / "blocker"
+    blocker.write_text("")
+    monkeypatch.setenv("TP_REPORTS_SPOOL_DIR", str(blocker))
+    reports_queue = create(capacity=1, overflow_policy=ReportsOverflowPolicy.SpillToDisk)
+
+    submit_reports(reports_queue, f"{fake_agent.address}/report")
+    release.set()
+    reports_queue.stop()
+
+    assert [request[3].get("screenshot") for request in fake_agent.requests] == [None, "a", "b", "c"]
+    assert reports_queue.overflow_counts[ReportsOverflowPolicy.SpillToDisk] == 0
+
+
+def test_queue_is_unbounded_by_default(fake_agent, blocked_reports_queue, monkeypatch):
+    monkeypatch.delenv("TP_REPORTS_QUEUE_CAPACITY", raising=False)
+    create, release = blocked_reports_queue
+    reports_queue = create(capacity=None, overflow_policy=ReportsOverflowPolicy.Block)
+
+    start_time = time.monotonic()
+    for _ in range(5):
+        submit_reports(reports_queue, f"{fake_agent.address}/report")
+    assert time.monotonic() - start_time < 0.1
+    release.set()
+    reports_queue.stop()
+
+    assert len(fake_agent.requests) == 16
+    assert all(count == 0 for count in reports_queue.overflow_counts.values())
+
+
+def test_test_thread_is_blocked_until_the_queue_has_room(fake_agent, blocked_reports_queue):
+    create, release = blocked_reports_queue
+    reports_queue = create(capacity=1, overflow_policy=ReportsOverflowPolicy.Block)
+
+    threading.Timer(0.2, release.set).start()
+    start_time = time.monotonic()
+    submit_reports(reports_queue, f"{fake_agent.address}/report")
+    assert time.monotonic() - start_time >= 0.2
+    reports_queue.stop()
+
+    assert len(fake_agent.requests) == 4
+    assert reports_queue.overflow_counts[ReportsOverflowPolicy.Block] >= 1
+
+
+def test_undelivered_reports_are_journaled_on_stop_and_replayed_by_the_next_queue(fake_agent, tmp_path, monkeypatch):
+    monkeypatch.setenv("TP_REPORTS_SPOOL_DIR", str(tmp_path))
+    monkeypatch.setattr(ReportsQueue, "REPORTS_QUEUE_TIMEOUT", 0.5)
+    fake_agent.faults = [500] * 10
+    retry_policy = RetryPolicy(max_attempts=1, failure_threshold=1, reset_timeout=60)
+    reports_queue = ReportsQueueBatch(token="1234", url=f"{fake_agent.address}/batch", retry_policy=retry_policy)
+
+    # The first batch opens the circuit, the reports submitted afterwards are spooled to disk
+    reports_queue.submit(report_as_json={"index": 0}, url=None, block=False)
+    time.sleep(0.3)
+    for i in range(1, 4):
+        reports_queue.submit(report_as_json={"index": i}, url=None, block=False)
+    reports_queue.stop()
+
+    assert fake_agent.requests == []
+    assert [path.suffix for path in spooled_files(tmp_path)] == [".journal"]
+
+    fake_agent.faults = []
+    next_queue = ReportsQueueBatch(token="1234", url=f"{fake_agent.address}/batch")
+    next_queue.replay_journals()
+    next_queue.stop()
+
+    assert [request[3] for request in fake_agent.requests] == [[{"index": i} for i in range(4)]]
+    assert spooled_files(tmp_path) == []
+
+
+def journal_reports(fake_agent, tmp_path, monkeypatch, reports):
+    """Journals reports to the spool directory, as a batch reports queue does when the Agent is unreachable"""
+    monkeypatch.setenv("TP_REPORTS_SPOOL_DIR", str(tmp_path))
+    monkeypatch.setattr(ReportsQueue, "REPORTS_QUEUE_TIMEOUT", 0.1)
+    retry_policy = RetryPolicy(max_attempts=1, failure_threshold=1, reset_timeout=60)
+    retry_policy.open_circuit("Agent is unreachable")
+    reports_queue = ReportsQueueBatch(
+        token="1234", url=f"{fake_agent.address}/batch", retry_policy=retry_policy, agent_url=fake_agent.address
+    )
+    for report in reports:
+        reports_queue.submit(report_as_json=report, url=f"{fake_agent.address}/{report['type']}", block=False)
+    reports_queue.stop()
+    return spooled_files(tmp_path)
+
+
+def test_journals_are_only_replayed_with_the_same_token_and_agent(fake_agent, tmp_path, monkeypatch):
+    journals = journal_reports(fake_agent, tmp_path, monkeypatch, [{"type": "step"}])
+
+    other_user = ReportsQueueBatch(token="5678", url=f"{fake_agent.address}/batch", agent_url=fake_agent.address)
+    other_user.replay_journals()
+    other_user.stop()
+    other_agent = ReportsQueueBatch(token="1234", url=f"{fake_agent.address}/batch", agent_url="http://other:8585")
+    other_agent.replay_journals()
+    other_agent.stop()
+
+    assert fake_agent.requests == []
+    assert spooled_files(tmp_path) == journals
+
+
+def test_journals_are_replayed_one_report_at_a_time_by_agents_without_batch_support(fake_agent, tmp_path, monkeypatch):
+    journal_reports(fake_agent, tmp_path, monkeypatch, [{"type": "step", "index": 0}, {"type": "test", "index": 1}])
+
+    reports_queue = ReportsQueue(token="1234", agent_url=fake_agent.address)
+    reports_queue.replay_journals()
+    reports_queue.stop()
+
+    assert [(request[1], request[3]) for request in fake_agent.requests] == [
+        ("/step", {"type": "step", "index": 0}),
+        ("/test", {"type": "test", "index": 1}),
+    ]
+    assert spooled_files(tmp_path) == []
+
+
+def ended_process_id() -> int:
+    """Returns the ID of a process that ended"""
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    process.wait()
+    return process.pid
+
+
+def test_spools_and_claims_left_by_ended_processes_are_replayed(fake_agent, tmp_path, monkeypatch):
+    reports = [{"type": "step", "index": 0}, {"type": "step", "index": 1}]
+    (journal,) = journal_reports(fake_agent, tmp_path, monkeypatch, reports)
+    lines = journal.read_bytes().splitlines(keepends=True)
+    journal.unlink()
+    ended_pid = ended_process_id()
+    # A process that crashed while the Agent was unreachable, and a process that crashed while replaying a journal
+    (journal.parent / f"reports-{ended_pid}-crashed.spool").write_bytes(lines[0])
+    (journal.parent / f"reports-{ended_pid}-replaying.journal.{ended_pid}").write_bytes(lines[1])
+    # Files of running processes are left to them
+    running = [
+        journal.parent / f"reports-{os.getpid()}-running.spool",
+        journal.parent / f"reports-{ended_pid}-claimed.journal.{os.getpid()}",
+    ]
+    for path in running:
+        path.write_bytes(lines[0])
+
+    reports_queue = ReportsQueue(token="1234", agent_url=fake_agent.address)
+    reports_queue.replay_journals()
+    reports_queue.stop()
+
+    assert sorted(request[3]["index"] for request in fake_agent.requests) == [0, 1]
+    assert spooled_files(tmp_path) == sorted(running)
+
+
+def test_invalid_journal_lines_are_skipped(fake_agent, tmp_path, monkeypatch):
+    (journal,) = journal_reports(fake_agent, tmp_path, monkeypatch, [{"type": "step"}, {"type": "test"}])
+    lines = journal.read_bytes().splitlines(keepends=True)
+    journal.write_bytes(lines[0] + b"not a report\n" + lines[1] + lines[1][:5])
+
+    reports_queue = ReportsQueue(token="1234", agent_url=fake_agent.address)
+    reports_queue.replay_journals()
+    reports_queue.stop()
+
+    assert [request[3] for request in fake_agent.requests] == [{"type": "step"}, {"type": "test"}]
+
+
+def test_flush_delivers_held_batches_and_keeps_the_queue_running(fake_agent, monkeypatch):
+    monkeypatch.setenv("TP_REPORTS_BATCH_LINGER_MS", "10000")
+    reports_queue = ReportsQueueBatch(token="1234", url=f"{fake_agent.address}/batch", workers=2)
+
+    reports_queue.submit(report_as_json={"index": 0}, url=None, block=False)
+    assert reports_queue.flush(timeout=5)
+    assert reports_queue.reports_sent == 1
+
+    reports_queue.submit(report_as_json={"index": 1}, url=None, block=False)
+    assert reports_queue.running
+    reports_queue.stop()
+
+    assert [report for request in fake_agent.requests for report in request[3]] == [{"index": 0}, {"index": 1}]
@@ -0,0 +1,119 @@
+# Copyright 2021 TestProject (https://testproject.io)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from types import SimpleNamespace
+
+import pytest
+from selenium.webdriver.remote.command import Command
+
+from src.testproject.rest.messages import CustomTestReport, DriverCommandReport, StepReport
+from src.testproject.sdk.internal.helpers.command_report_buffer import CommandReportBuffer
+from src.testproject.sdk.internal.helpers.custom_command_executor import CustomCommandExecutor
+
+
+def command_report(command: str, passed: bool = True) -> DriverCommandReport:
+    return DriverCommandReport(command, {}, None, passed)
+
+
+def test_buffer_keeps_the_latest_reports():
+    buffer = CommandReportBuffer(size=3)
+
+    for index in range(5):
+        buffer.add(command_report(f"command{index}"))
+
+    assert [report.command for report in buffer.flush()] == ["command2", "command3", "command4"]
+    assert buffer.flush() == []
+
+
+def test_discarding_summarizes_the_unreported_commands():
+    buffer = CommandReportBuffer(size=3)
+
+    for index in range(5):
+        buffer.add(command_report(f"command{index}"))
+    buffer.flush()
+    buffer.add(command_report("command5"))
+    summary = buffer.discard()
+
+    # 2 commands dropped from the buffer before the flush and 1 discarded
+    assert summary.to_json()["description"] == "3 passed driver command(s) not reported"
+    assert summary.to_json()["passed"] is True
+    assert buffer.discard() is None
+
+
+@pytest.fixture
+def executor(monkeypatch):
+    """Command executor in OnFailure mode, failing the commands in its 'failing' set and recording the reports"""
+    monkeypatch.setenv("TP_COMMAND_REPORTS_MODE", "OnFailure")
+    monkeypatch.setenv("TP_COMMAND_REPORTS_BUFFER_SIZE", "2")
+    reports = []
+    agent_client = SimpleNamespace(
+        agent_session=SimpleNamespace(dialect="W3C", session_id="session"),
+        report_driver_command=reports.append,
+        report_step=reports.append,
+        report_test=reports.append,
+    )
+    command_executor = CustomCommandExecutor(agent_client, "http://localhost:4444")
+    command_executor.reports = reports
+    command_executor.failing = set()
+    command_executor._request = lambda method, url, body=None: (
+        {"status": 13, "value": "error"} if url.rsplit("/", 1)[-1] in command_executor.failing else {"value": None}
+    )
+    command_executor.update_known_test_name = lambda: None
+    command_executor.test_name = "test_buffered"
+    return command_executor
+
+
+def reported(executor) -> list:
+    return [
+        report.command if isinstance(report, DriverCommandReport) else type(report).__name__
+        for report in executor.reports
+    ]
+
+
+def test_commands_are_sent_when_a_command_fails(executor):
+    executor.failing.add("url")
+    for command in [Command.GET_TITLE, Command.GET_PAGE_SOURCE, Command.GET_CURRENT_URL]:
+        executor.execute(command, {"sessionId": "session"})
+    executor.execute(Command.GET_CURRENT_URL, {"sessionId": "session"})
+    executor.report_test()
+
+    assert reported(executor) == [
+        Command.GET_TITLE,
+        Command.GET_PAGE_SOURCE,
+        Command.GET_CURRENT_URL,
+        Command.GET_CURRENT_URL,
+        "CustomTestReport",
+    ]
+
+
+def test_only_a_summary_is_sent_for_a_passed_test(executor):
+    for command in [Command.GET_TITLE, Command.GET_PAGE_SOURCE, Command.GET_CURRENT_URL]:
+        executor.execute(command, {"sessionId": "session"})
+    executor.report_test()
+
+    assert reported(executor) == ["StepReport", "CustomTestReport"]
+    assert executor.reports[0].to_json()["description"] == "3 passed driver command(s) not reported"
+
+
+def test_buffered_commands_are_sent_for_a_failed_test(executor, monkeypatch):
+    monkeypatch.setattr(
+        "src.testproject.helpers.ReportHelper.get_test_result", classmethod(lambda cls, test: (False, "Failed"))
+    )
+    for command in [Command.GET_TITLE, Command.GET_PAGE_SOURCE, Command.GET_CURRENT_URL]:
+        executor.execute(command, {"sessionId": "session"})
+    executor.report_test()
+
+    assert reported(executor) == [Command.GET_PAGE_SOURCE, Command.GET_CURRENT_URL, "StepReport", "CustomTestReport"]
+    assert isinstance(executor.reports[-1], CustomTestReport)
+    assert isinstance(executor.reports[-2], StepReport)
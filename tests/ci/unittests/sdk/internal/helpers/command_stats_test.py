@@ -0,0 +1,90 @@
+# Copyright 2021 TestProject (https://testproject.io)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import time
+import tracemalloc
+
+import pytest
+
+from src.testproject.sdk.internal.helpers.command_stats import CommandStats
+
+
+def test_durations_are_aggregated_by_phase():
+    stats = CommandStats()
+    for duration in range(1, 101):
+        stats.record("selenium", duration / 1000)
+    stats.record("sleep", 0.5)
+
+    summary = stats.summary()
+
+    assert summary["selenium"] == {
+        "count": 100,
+        "total_ms": 5050.0,
+        "p50_ms": pytest.approx(50.0, rel=0.05),
+        "p95_ms": pytest.approx(95.0, rel=0.05),
+        "p99_ms": pytest.approx(99.0, rel=0.05),
+    }
+    assert summary["sleep"] == {"count": 1, "total_ms": 500.0, "p50_ms": 500.0, "p95_ms": 500.0, "p99_ms": 500.0}
+
+
+def test_durations_out_of_the_histogram_range_are_reported_as_recorded():
+    stats = CommandStats()
+    stats.record("sleep", 0.0)
+    stats.record("selenium", 7200.0)
+
+    summary = stats.summary()
+
+    assert summary["sleep"]["p99_ms"] == 0.0
+    assert summary["selenium"]["p50_ms"] == 7200000.0
+
+
+def test_memory_used_does_not_grow_with_the_number_of_commands():
+    stats = CommandStats()
+    stats.record("selenium", 0.001)
+
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        for i in range(10000):
+            stats.record("selenium", i / 1000)
+        grown = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+
+    assert grown < 1000
+    assert stats.summary()["selenium"]["count"] == 10001
+
+
+def test_lap_records_the_time_since_the_start_of_the_phase():
+    stats = CommandStats()
+
+    started = time.perf_counter()
+    time.sleep(0.01)
+    lap = stats.lap("selenium", started)
+    stats.lap("sleep", lap)
+
+    summary = stats.summary()
+    assert summary["selenium"]["total_ms"] >= 10
+    assert summary["sleep"]["total_ms"] < 10
+
+
+def test_stats_are_written_as_json(tmp_path):
+    stats = CommandStats()
+    stats.record("selenium", 0.002)
+    stats_file = tmp_path / "stats.json"
+
+    stats.dump(str(stats_file))
+
+    assert json.loads(stats_file.read_text()) == stats.summary()
@@ -0,0 +1,102 @@
+# Copyright 2021 TestProject (https://testproject.io)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from types import SimpleNamespace
+
+import pytest
+from selenium.webdriver.remote.command import Command
+
+from src.testproject.classes import StepSettings
+from src.testproject.enums import SleepTimingType
+from src.testproject.sdk.internal.helpers.custom_command_executor import CustomCommandExecutor
+
+
+@pytest.fixture
+def executor():
+    """Command executor answering every command without a driver, recording the requests and reported commands"""
+    agent_client = SimpleNamespace(agent_session=SimpleNamespace(dialect="W3C", session_id="session"))
+    command_executor = CustomCommandExecutor(agent_client, "http://localhost:4444")
+    command_executor.requests = []
+    command_executor.reported = []
+
+    def request(method, url, body=None):
+        command_executor.requests.append(url)
+        return {"status": 0, "value": None}
+
+    command_executor._request = request
+    command_executor._report_command = lambda command, *args: command_executor.reported.append(command)
+    command_executor.update_known_test_name = lambda: pytest.fail("Test name inferred")
+    return command_executor
+
+
+def test_commands_bypass_the_sdk_when_reports_are_disabled(executor):
+    executor.disable_reports = True
+
+    executor.execute(Command.GET_TITLE, {"sessionId": "session"})
+
+    assert executor.requests == ["http://localhost:4444/session/session/title"]
+    assert executor.reported == []
+
+
+@pytest.mark.parametrize(
+    "settings",
+    [StepSettings(timeout=5000), StepSettings(sleep_time=100, sleep_timing_type=SleepTimingType.After)],
+)
+def test_commands_are_handled_when_step_settings_are_set(executor, settings):
+    executor.update_known_test_name = lambda: None
+    executor.step_helper.handle_sleep = lambda *args: None
+    executor.disable_reports = True
+    executor.settings = settings
+
+    executor.execute(Command.GET_TITLE, {"sessionId": "session"})
+
+    assert executor.reported == [Command.GET_TITLE]
+
+
+def test_commands_are_handled_when_reports_are_enabled_again(executor):
+    executor.disable_reports = True
+    executor.disable_reports = False
+    executor.update_known_test_name = lambda: None
+
+    executor.execute(Command.GET_TITLE, {"sessionId": "session"})
+
+    assert executor.reported == [Command.GET_TITLE]
+
+
+def test_quit_is_handled_when_reports_are_disabled(executor):
+    executor.disable_reports = True
+    executor.update_known_test_name = lambda: None
+
+    executor.execute(Command.QUIT, {"sessionId": "session"})
+
+    assert executor.reported == [Command.QUIT]
+
+
+def test_command_phases_are_timed(executor):
+    executor.update_known_test_name = lambda: None
+
+    executor.execute(Command.GET_TITLE, {"sessionId": "session"})
+
+    stats = executor.stats.summary()
+    assert set(stats) == {"screenshot_wait", "test_name", "timeout", "sleep", "selenium", "total"}
+    assert stats["sleep"]["count"] == 2
+    assert stats["total"]["count"] == 1
+
+
+def test_bypassed_commands_are_not_timed(executor):
+    executor.disable_reports = True
+
+    executor.execute(Command.GET_TITLE, {"sessionId": "session"})
+
+    assert executor.stats.summary() == {}
@@ -0,0 +1,135 @@
+# Copyright 2021 TestProject (https://testproject.io)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from types import SimpleNamespace
+
+from selenium.webdriver.remote.command import Command
+
+from src.testproject.sdk.internal.helpers.redact_helper import RedactHelper
+
+W3C_ELEMENT_KEY = "element-6066-11e4-a52e-4f735466cecf"
+
+
+class FakeCommandExecutor:
+    """Answers element attribute requests and counts them"""
+
+    def __init__(self, element_types: dict, platform_name: str = "Linux", browser_name: str = "chrome"):
+        self.element_types = element_types
+        self.attribute_requests = 0
+        self.agent_client = SimpleNamespace(
+            agent_session=SimpleNamespace(
+                session_id="session",
+                capabilities={"platformName": platform_name, "browserName": browser_name},
+            )
+        )
+
+    def execute(self, command: str, params: dict, skip_reporting: bool = False):
+        assert command == Command.GET_ELEMENT_ATTRIBUTE
+        assert skip_reporting
+        self.attribute_requests += 1
+        return {"value": self.element_types.get(params["id"])}
+
+
+def send_keys(element_id: str, text: str = "secret") -> dict:
+    return {"id": element_id, "text": text, "value": list(text)}
+
+
+def test_each_element_is_checked_once():
+    executor = FakeCommandExecutor({"password": "password", "username": "text"})
+    redact_helper = RedactHelper(executor)
+
+    for _ in range(3):
+        assert redact_helper.redact_command(Command.SEND_KEYS_TO_ELEMENT, send_keys("password"))["text"] == "***"
+        assert redact_helper.redact_command(Command.SEND_KEYS_TO_ELEMENT, send_keys("username"))["text"] == "secret"
+
+    assert executor.attribute_requests == 2
+
+
+def test_only_unsecured_elements_are_checked_again_after_a_script():
+    executor = FakeCommandExecutor({"password": "password", "username": "text"})
+    redact_helper = RedactHelper(executor)
+    redact_helper.redact_command(Command.SEND_KEYS_TO_ELEMENT, send_keys("password"))
+    redact_helper.redact_command(Command.SEND_KEYS_TO_ELEMENT, send_keys("username"))
+
+    redact_helper.invalidate_unsecured()
+    redact_helper.redact_command(Command.SEND_KEYS_TO_ELEMENT, send_keys("password"))
+    redact_helper.redact_command(Command.SEND_KEYS_TO_ELEMENT, send_keys("username"))
+
+    assert executor.attribute_requests == 3
+
+
+def test_element_turned_into_a_password_field_is_redacted():
+    executor = FakeCommandExecutor({"field": "text"})
+    redact_helper = RedactHelper(executor, prefetch=True)
+
+    redact_helper.prefetch(Command.FIND_ELEMENT, {W3C_ELEMENT_KEY: "field"}, True)
+    assert redact_helper.redact_command(Command.SEND_KEYS_TO_ELEMENT, send_keys("field"))["text"] == "secret"
+    # A script changes the type of the field, as show/hide password toggles do
+    executor.element_types["field"] = "password"
+    redact_helper.invalidate_unsecured()
+
+    assert redact_helper.redact_command(Command.SEND_KEYS_TO_ELEMENT, send_keys("field"))["text"] == "***"
+
+
+def test_verdicts_are_fetched_again_after_navigation():
+    executor = FakeCommandExecutor({"password": "password"})
+    redact_helper = RedactHelper(executor)
+
+    redact_helper.redact_command(Command.SEND_KEYS_TO_ELEMENT, send_keys("password"))
+    redact_helper.invalidate()
+    redacted = redact_helper.redact_command(Command.SEND_KEYS_TO_ELEMENT, send_keys("password"))
+
+    assert redacted["value"] == list("***")
+    assert executor.attribute_requests == 2
+
+
+def test_found_element_is_checked_when_prefetch_is_enabled():
+    executor = FakeCommandExecutor({"password": "password"})
+    redact_helper = RedactHelper(executor, prefetch=True)
+
+    redact_helper.prefetch(Command.FIND_ELEMENT, {W3C_ELEMENT_KEY: "password"}, True)
+    redact_helper.prefetch(Command.FIND_CHILD_ELEMENT, {"ELEMENT": "child"}, True)
+    assert executor.attribute_requests == 2
+
+    assert redact_helper.redact_command(Command.SEND_KEYS_TO_ELEMENT, send_keys("password"))["text"] == "***"
+    assert redact_helper.redact_command(Command.SEND_KEYS_TO_ELEMENT, send_keys("child"))["text"] == "secret"
+    assert executor.attribute_requests == 2
+
+
+def test_found_element_is_not_checked_when_prefetch_is_disabled():
+    executor = FakeCommandExecutor({"password": "password"})
+    redact_helper = RedactHelper(executor)
+
+    redact_helper.prefetch(Command.FIND_ELEMENT, {W3C_ELEMENT_KEY: "password"}, True)
+
+    assert executor.attribute_requests == 0
+
+
+def test_failed_find_is_not_prefetched():
+    executor = FakeCommandExecutor({})
+    redact_helper = RedactHelper(executor, prefetch=True)
+
+    redact_helper.prefetch(Command.FIND_ELEMENT, {"error": "no such element"}, False)
+
+    assert executor.attribute_requests == 0
+
+
+def test_android_password_verdict_is_cached():
+    executor = FakeCommandExecutor({"pin": "true"}, platform_name="Android", browser_name="")
+    redact_helper = RedactHelper(executor)
+
+    for _ in range(2):
+        assert redact_helper.redact_command(Command.SEND_KEYS_TO_ELEMENT, send_keys("pin"))["text"] == "***"
+
+    assert executor.attribute_requests == 1
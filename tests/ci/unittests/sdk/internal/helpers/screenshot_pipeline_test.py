@@ -0,0 +1,86 @@
+# Copyright 2021 TestProject (https://testproject.io)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import base64
+import threading
+import time
+
+from src.testproject.sdk.internal.agent.report_encoder import ReportEncoder
+from src.testproject.sdk.internal.helpers.screenshot_pipeline import ScreenshotPipeline
+
+PNG = b"\x89PNG\r\n\x1a\n" + b"\x00" * 64
+
+
+def slow_capture(delay: float):
+    def capture():
+        time.sleep(delay)
+        return base64.b64encode(PNG).decode("ascii")
+
+    return capture
+
+
+def test_screenshot_is_captured_without_blocking_the_caller():
+    pipeline = ScreenshotPipeline(slow_capture(0.2), max_in_flight=4)
+
+    start_time = time.perf_counter()
+    handle = pipeline.request()
+    assert time.perf_counter() - start_time < 0.1
+    assert not handle.captured
+
+    pipeline.wait()
+    assert handle.captured
+    assert handle.png == PNG
+    pipeline.close()
+
+
+def test_screenshot_handle_is_resolved_when_the_report_is_serialized():
+    pipeline = ScreenshotPipeline(slow_capture(0), max_in_flight=4)
+
+    report = {"type": "Step", "screenshot": pipeline.request()}
+
+    assert ReportEncoder.encode(report) == f'{{"type":"Step","screenshot":"{base64.b64encode(PNG).decode()}"}}'.encode()
+    pipeline.close()
+
+
+def test_failed_capture_is_resolved_to_no_screenshot():
+    def capture():
+        raise ConnectionError("driver is gone")
+
+    pipeline = ScreenshotPipeline(capture, max_in_flight=4)
+
+    assert pipeline.request().resolve() is None
+    pipeline.close()
+
+
+def test_requests_block_once_the_in_flight_cap_is_reached():
+    release = threading.Event()
+
+    def capture():
+        release.wait()
+        return base64.b64encode(PNG).decode("ascii")
+
+    pipeline = ScreenshotPipeline(capture, max_in_flight=2)
+    pipeline.request()
+    pipeline.request()
+
+    third = []
+    requester = threading.Thread(target=lambda: third.append(pipeline.request()))
+    requester.start()
+    requester.join(timeout=0.2)
+    assert requester.is_alive()
+
+    release.set()
+    requester.join(timeout=1)
+    assert len(third) == 1
+    pipeline.close()
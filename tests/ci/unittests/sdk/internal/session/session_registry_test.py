@@ -0,0 +1,88 @@
+# Copyright 2021 TestProject (https://testproject.io)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import threading
+
+import pytest
+
+from src.testproject.sdk.internal.session import SessionRegistry
+
+
+class WebDriver:
+    pass
+
+
+class MobileDriver:
+    pass
+
+
+@pytest.fixture(autouse=True)
+def clean_registry():
+    yield
+    for driver in SessionRegistry.active():
+        SessionRegistry.unregister(driver)
+
+
+def in_thread(function):
+    """Runs a function in a new thread and returns its result"""
+    result = []
+    thread = threading.Thread(target=lambda: result.append(function()))
+    thread.start()
+    thread.join()
+    return result[0]
+
+
+def test_each_thread_resolves_to_the_driver_it_created():
+    driver = WebDriver()
+    SessionRegistry.register(driver)
+
+    def create_other_driver():
+        other_driver = WebDriver()
+        SessionRegistry.register(other_driver)
+        return other_driver, SessionRegistry.current(WebDriver)
+
+    other_driver, other_current = in_thread(create_other_driver)
+
+    assert other_current is other_driver
+    assert SessionRegistry.current(WebDriver) is driver
+    assert SessionRegistry.active() == [driver, other_driver]
+
+
+def test_threads_without_a_driver_resolve_to_the_latest_driver():
+    SessionRegistry.register(WebDriver())
+    latest = in_thread(lambda: SessionRegistry.register(WebDriver()) or SessionRegistry.current(WebDriver))
+
+    assert in_thread(lambda: SessionRegistry.bound(WebDriver)) is None
+    assert in_thread(lambda: SessionRegistry.current(WebDriver)) is latest
+
+
+def test_bound_driver_is_preferred_over_the_type_order():
+    web_driver = WebDriver()
+    SessionRegistry.register(web_driver)
+    mobile_driver = in_thread(lambda: SessionRegistry.register(MobileDriver()) or SessionRegistry.active()[-1])
+
+    assert SessionRegistry.current(MobileDriver, WebDriver) is web_driver
+
+    SessionRegistry.bind(mobile_driver)
+    assert SessionRegistry.current(MobileDriver, WebDriver) is mobile_driver
+
+
+def test_driver_that_quit_in_another_thread_is_no_longer_resolved():
+    driver = WebDriver()
+    SessionRegistry.register(driver)
+
+    in_thread(lambda: SessionRegistry.unregister(driver))
+
+    assert SessionRegistry.bound(WebDriver) is None
+    assert SessionRegistry.current(WebDriver) is None
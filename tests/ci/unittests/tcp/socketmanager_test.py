@@ -0,0 +1,108 @@
+# Copyright 2021 TestProject (https://testproject.io)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import socket
+import struct
+import threading
+import time
+
+import pytest
+
+from src.testproject.sdk.internal.agent.retry_policy import RetryPolicy
+from src.testproject.tcp import SocketManager
+
+UUID = "0123456789abcdef0123456789abcdef01"
+
+
+@pytest.fixture
+def agent_socket():
+    """Development socket accepting a single connection, sending the UUID and returning the connection to the test"""
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.bind(("127.0.0.1", 0))
+    server.listen(1)
+    accepted = []
+
+    def accept():
+        connection, _ = server.accept()
+        connection.sendall(struct.pack(">H", len(UUID)) + UUID.encode("ascii"))
+        accepted.append(connection)
+
+    thread = threading.Thread(target=accept)
+    thread.start()
+    socket_manager = SocketManager()
+    socket_manager.open_socket("127.0.0.1", server.getsockname()[1], UUID)
+    thread.join()
+    yield socket_manager, accepted[0]
+    socket_manager.close_socket()
+    accepted[0].close()
+    server.close()
+
+
+def test_liveness_check_sends_nothing_to_the_agent(agent_socket):
+    socket_manager, connection = agent_socket
+
+    assert socket_manager.is_connected()
+    assert socket_manager.is_connected()
+
+    connection.setblocking(False)
+    with pytest.raises(BlockingIOError):
+        connection.recv(16)
+
+
+def test_connection_closed_by_the_agent_is_detected(agent_socket):
+    socket_manager, connection = agent_socket
+
+    connection.close()
+
+    assert not socket_manager.is_connected()
+
+
+def test_data_sent_by_the_agent_is_not_mistaken_for_a_connection(agent_socket):
+    socket_manager, connection = agent_socket
+
+    connection.sendall(b"xx")
+    assert socket_manager.is_connected()
+
+    connection.sendall(b"xx")
+    connection.close()
+
+    assert not socket_manager.is_connected()
+
+
+def test_heartbeat_closes_the_socket_and_opens_the_circuit_once_the_agent_disconnects(agent_socket):
+    socket_manager, connection = agent_socket
+    retry_policy = RetryPolicy(reset_timeout=0.1)
+    disconnections = []
+    disconnected = threading.Event()
+
+    def on_disconnected():
+        retry_policy.open_circuit("Agent closed the development socket")
+        disconnections.append(time.monotonic())
+        disconnected.set()
+
+    socket_manager.start_heartbeat(0.01, on_disconnected)
+    assert not disconnected.wait(0.05)
+
+    connection.sendall(b"xx")
+    connection.close()
+
+    assert disconnected.wait(5)
+    assert retry_policy.circuit_open
+    assert not socket_manager.is_connected()
+
+    # Assert - The circuit is not opened again, the reports queue probes the Agent once the reset timeout passed
+    start_time = time.monotonic()
+    retry_policy.wait_while_open()
+    assert time.monotonic() - start_time < 0.2
+    assert len(disconnections) == 1